@@ -1,9 +1,9 @@
 import argparse
+import os
+import sys
 
-from dbexplorer.extracting.postgres_like import PostgresLikeDbExtractor
-from dbexplorer.extracting.mysql import MysqlDbExtractor
-from dbexplorer.extracting.teradata import TeradataDbExtractor
-
+from dbexplorer.config import create_extractor
+from dbexplorer.extracting.progress import ExtractionProgress
 from dbexplorer.visualizing import DbVisualizer
 
 parser = argparse.ArgumentParser(description='Database explorer')
@@ -13,48 +13,108 @@ parser.add_argument('-p', '--port', help='Server\'s port', type=int)
 parser.add_argument('-n', '--database_name', help='Database name', type=str, required=True)
 parser.add_argument('-u', '--user', help='Username', type=str, required=True)
 parser.add_argument('-pass', '--password', help='Password', type=str, required=True)
-parser.add_argument('-t', '--database_type', help='Database type (Postgres, MySQL, Redshift, Teradata', type=str,
+parser.add_argument('-t', '--database_type',
+                    help='Database type (Postgres, MySQL, Redshift, Teradata or installed backend)', type=str,
                     required=True)
 parser.add_argument('-o', '--output', help='Output HTML path', type=str, required=True)
 parser.add_argument('-top', '--top_number', help='Number of desired most frequent values', type=int, default=5)
 parser.add_argument('-m', '--max_text_length',
-                    help='Max length of text in given column that will be taken into account', type=int, default=100)
+                    help='Max displayed length of top values of text columns (longer texts are grouped by hashes)',
+                    type=int, default=100)
 parser.add_argument('-sc', '--schema', help='Schema for postgres', type=str, default='public')
 parser.add_argument('-d', '--odbc_driver', help='ODBC driver name for teradata', type=str)
-
-args = parser.parse_args()
+parser.add_argument('-cs', '--catalog_stats', action='store_true',
+                    help='Read statistics collected by database instead of scanning tables (MySQL, Teradata)')
+parser.add_argument('-it', '--include_tables', help='Extract only tables matching SQL LIKE patterns', nargs='+')
+parser.add_argument('-et', '--exclude_tables', help='Skip tables matching SQL LIKE patterns', nargs='+')
+parser.add_argument('-ic', '--include_columns', help='Extract only columns matching SQL LIKE patterns', nargs='+')
+parser.add_argument('-ec', '--exclude_columns', help='Skip columns matching SQL LIKE patterns', nargs='+')
+parser.add_argument('-ity', '--include_types', help='Extract only columns of SQL types matching SQL LIKE patterns',
+                    nargs='+')
+parser.add_argument('-ety', '--exclude_types', help='Skip columns of SQL types matching SQL LIKE patterns', nargs='+')
+parser.add_argument('-mr', '--max_rows', help='Skip tables with more rows (according to database estimates)', type=int)
+parser.add_argument('-dr', '--dry_run', action='store_true',
+                    help='Only EXPLAIN statements reading tables and print their estimated costs instead of report')
+parser.add_argument('-mc', '--max_cost', help='Skip tables with higher estimated cost of extraction (EXPLAIN)',
+                    type=float)
+parser.add_argument('-is', '--incremental_state', help='Directory of stored states of incremental profiling',
+                    type=str)
+parser.add_argument('-wc', '--watermark_columns',
+                    help='Profile tables with any of these columns incrementally (only rows past stored watermark '
+                         'are read), requires --incremental_state', nargs='+')
+parser.add_argument('-sh', '--shards', help='Read large tables in this many shards on parallel connections',
+                    type=int)
+parser.add_argument('-shc', '--shard_columns',
+                    help='Columns split into value ranges of shards (primary key is used if none is present)',
+                    nargs='+')
+parser.add_argument('-smr', '--shard_min_rows',
+                    help='Tables with fewer rows by catalog estimate are not read in shards', type=int,
+                    default=1000000)
+parser.add_argument('-dk', '--discover_keys', action='store_true',
+                    help='Discover foreign keys from sketches of columns, the best candidates are verified by queries')
+parser.add_argument('-vk', '--verified_keys', help='Number of candidate foreign keys verified by queries', type=int,
+                    default=100)
+parser.add_argument('-vf', '--value_filters', action='store_true',
+                    help='Embed bloom filters of all values of columns in report, so that value search finds columns '
+                         'which may contain a value (not only among the most common values)')
+parser.add_argument('-vfp', '--value_filter_fpr', help='Target rate of false positives of value filters', type=float,
+                    default=0.01)
+parser.add_argument('-vfd', '--value_filter_max_distinct', type=int, default=100000,
+                    help='Columns with more distinct values get no value filter')
+parser.add_argument('-vfb', '--value_filter_budget', help='Max total size of value filters in report (MB)', type=float,
+                    default=10)
+parser.add_argument('-scr', '--statement_cache_rows',
+                    help='Max number of rows of results kept in memory, repeated statements within extraction '
+                         'of a table are answered from them (0 disables the cache)', type=int, default=100000)
+parser.add_argument('-nsp', '--no_session_profile', action='store_true',
+                    help='Keep session defaults of the server and do not run statements of a table in one read-only '
+                         'snapshot transaction')
+parser.add_argument('-ss', '--session_settings',
+                    help='Session settings (name=value) overriding the profile of the database type, e.g. '
+                         'work_mem=1GB (query band pairs for Teradata)', nargs='+')
+parser.add_argument('-np', '--no_progress', action='store_true', help='Do not print progress of extraction to stderr')
+parser.add_argument('-pfd', '--progress_fd',
+                    help='File descriptor (opened by the parent process) to write progress events to, one JSON '
+                         'object per line', type=int)
+parser.add_argument('-mb', '--memory_budget',
+                    help='Max memory of the process (MB), when it is approached extracted tables are spilled to disk '
+                         'and statement cache is reduced', type=float)
+parser.add_argument('-mt', '--memory_trace', action='store_true',
+                    help='Trace allocations and print memory of extraction, rendering and the largest tables to '
+                         'stderr (slows extraction down)')
+parser.add_argument('-tc', '--throttle_concurrency',
+                    help='Max number of statements running at once on the server, lowered while the server is loaded',
+                    type=int)
+parser.add_argument('-trs', '--throttle_rows_per_second',
+                    help='Max rows per second scanned by statements reading tables (by catalog estimates)', type=float)
+parser.add_argument('-tml', '--throttle_max_load',
+                    help='Server is loaded when it runs more statements of other clients (active sessions, running '
+                         'threads), default: twice the lowest observed number', type=float)
+parser.add_argument('-tlf', '--throttle_latency_factor',
+                    help='Server is loaded when probe statement takes this multiple of its lowest latency',
+                    type=float, default=3.0)
+parser.add_argument('-tpi', '--throttle_probe_interval', help='Seconds between probes of load of the server',
+                    type=float, default=10.0)
 
 
 def main():
-    db_type = args.database_type.lower()
-    if db_type == 'postgres':
-        extractor = PostgresLikeDbExtractor
-    elif db_type == 'mysql':
-        extractor = MysqlDbExtractor
-    elif db_type == 'redshift':
-        extractor = PostgresLikeDbExtractor
-    elif db_type == 'teradata':
-        extractor = TeradataDbExtractor
-    else:
-        raise ValueError
-    if db_type == 'teradata' and args.odbc_driver is None:
-        raise Exception("Please provide odbc driver for teradata")
-    elif db_type != 'teradata' and args.port is None:
-        raise Exception("Please provide port for connection")
-
-    extractor = extractor(server_address=args.server,
-                          port=args.port,
-                          db_name=args.database_name,
-                          user=args.user,
-                          password=args.password,
-                          extended=args.extended,
-                          top_number=args.top_number,
-                          schema=args.schema,
-                          odbc_driver=args.odbc_driver,
-                          max_text_len=args.max_text_length,
-                          )
-    visualizer = DbVisualizer(extractor.extract_to_dict(), args.output)
+    args = parser.parse_args()
+    progress = None
+    if not args.no_progress or args.progress_fd is not None:
+        events = None if args.progress_fd is None else os.fdopen(args.progress_fd, 'w', buffering=1)
+        progress = ExtractionProgress(None if args.no_progress else sys.stderr, events)
+    extractor = create_extractor(vars(args), progress=progress)
+    if args.dry_run:
+        print(extractor.get_cost_report())
+        return
+    visualizer = DbVisualizer(extractor.extract_to_dict(), args.output, extractor.memory)
     visualizer.generate_report()
+    if extractor.statement_cache is not None:
+        print(extractor.statement_cache.report(), file=sys.stderr)
+    if extractor.throttle is not None:
+        print(extractor.throttle.throttle.report(), file=sys.stderr)
+    if extractor.memory is not None:
+        print(extractor.memory.report(), file=sys.stderr)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,280 @@
+"""
+Benchmark of report generation - synthetic extraction data of increasing size (tables x columns per table)
+are rendered by DbVisualizer, times of stages (pretty_floats, columnar payload, JSON, whole report), peak RSS
+and size of report are measured. Every size runs in its own process, so peak RSS is not inherited from
+smaller sizes. If Node is available, initialization of the report (Data and ResultsModule.showTables)
+is timed as well, with DOM replaced by a minimal jQuery stub (browser layout is not measured).
+
+    python -m dbexplorer.benchmark -b baseline.json
+    python -m dbexplorer.benchmark -sz 10x10 100000x10 -b new.json -c baseline.json
+
+Results are written to a JSON baseline file, a previous baseline can be compared with the new results.
+"""
+
+import argparse
+import datetime
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Mapping, Sequence, Tuple
+
+import simplejson as json
+
+from dbexplorer.extracting.db_types import *
+from dbexplorer.visualizing import DbVisualizer, iter_columnar_json, pretty_floats, to_columnar
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows
+    resource = None
+
+DEFAULT_SIZES = ["10x10", "100x20", "1000x20", "10000x20"]
+
+# minimal jQuery replacement - elements are trees of appended strings and objects
+NODE_STUB = """
+class StubElement {
+	constructor(html) { this.html = html; this.children = []; }
+	append(...items) { items.forEach(item => { if (item !== undefined) this.children.push(item); }); return this; }
+	empty() { this.children = []; return this; }
+	val() { return ''; }
+	is() { return false; }
+	on() { return this; }
+	show() { return this; }
+	hide() { return this; }
+}
+var $ = html => new StubElement(html);
+"""
+
+NODE_TIMING = """
+var start = process.hrtime.bigint();
+data = new Data();
+var decoded = process.hrtime.bigint();
+controls = new Controls();
+var results = new ResultsModule(controls, data);
+results.showTables(data.tables);
+var shown = process.hrtime.bigint();
+console.log(JSON.stringify({data_seconds: Number(decoded - start) / 1e9, show_tables_seconds: Number(shown - decoded) / 1e9,
+                            heap_bytes: process.memoryUsage().heapUsed}));
+"""
+
+
+def parse_size(size: str) -> Tuple[int, int]:
+    """
+    :param size: size as "TABLESxCOLUMNS" (columns per table)
+    :return: number of tables and columns per table
+    """
+    tables, columns = size.lower().split("x")
+    return int(tables), int(columns)
+
+
+def synthetic_column(rnd: random.Random, i: int, extended: bool) -> Column:
+    """
+    :param rnd: random generator
+    :param i: position of column in table
+    :param extended: if extended column should be created
+    :return: column with random statistics, types cycle through numeric, text, datetime and other
+    """
+    name = f"column_{i}"
+    nulls = rnd.random() * 100
+    distinct = rnd.randint(1, 100000)
+    kind = i % 4
+    if kind == 0:
+        minimum, maximum = sorted([rnd.random() * 1000, rnd.random() * 1000])
+        mean = (minimum + maximum) / 2
+        if not extended:
+            return NumericColumn(name, "numeric", maximum, minimum, mean)
+        quartiles = sorted(rnd.uniform(minimum, maximum) for _ in range(3))
+        return ExtendedNumericColumn(name, "numeric", maximum, minimum, mean, True, nulls, distinct, quartiles,
+                                     [rnd.randint(0, 1000) for _ in range(20)])
+    if kind == 1:
+        top = [f"value {rnd.randint(0, 10 ** 6)}" for _ in range(5)]
+        counts = sorted((rnd.randint(1, 1000) for _ in range(5)), reverse=True)
+        if not extended:
+            return TextColumn(name, "character varying", top, counts)
+        return ExtendedTextColumn(name, "character varying", top, counts, True, nulls, distinct)
+    if kind == 2:
+        minimum = str(datetime.datetime(2000, 1, 1) + datetime.timedelta(seconds=rnd.randint(0, 10 ** 8)))
+        maximum = str(datetime.datetime(2020, 1, 1) + datetime.timedelta(seconds=rnd.randint(0, 10 ** 8)))
+        if not extended:
+            return DatetimeColumn(name, "timestamp", maximum, minimum)
+        return ExtendedDatetimeColumn(name, "timestamp", maximum, minimum, True, nulls, distinct,
+                                      [rnd.randint(0, 1000) for _ in range(20)])
+    if not extended:
+        return Column(name, "bytea")
+    return ExtendedNoneTypeColumn(name, "bytea", True, nulls, distinct)
+
+
+def synthetic_data(tables: int, columns: int, extended: bool = True, seed: int = 0) -> Mapping:
+    """
+    :param tables: number of tables
+    :param columns: number of columns per table
+    :param extended: if columns should be extended
+    :param seed: seed of random generator
+    :return: extraction data as given by extract_to_dict
+    """
+    rnd = random.Random(seed)
+    return {
+        "scheme": "SchemeName",
+        "database": "benchmark",
+        "tables": [Table(f"table_{t}", rnd.randint(0, 10 ** 7),
+                         [synthetic_column(rnd, i, extended) for i in range(columns)]).to_dict()
+                   for t in range(tables)]
+    }
+
+
+def peak_rss() -> int:
+    """
+    :return: peak resident set size of this process in bytes (None if it is not available)
+    """
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def timed(function, *args) -> Tuple[Any, float]:
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def time_node(node: str, data: Mapping, work_dir: str) -> Mapping[str, Any]:
+    """
+    Timing initialization of report in Node
+    :param node: path of node executable
+    :param data: extraction data
+    :param work_dir: directory of temporary script
+    :return: seconds of Data decoding and ResultsModule.showTables, heap used and seconds of the whole run
+    (including parsing of the payload)
+    """
+    files = ['template/controls.js', 'template/table.js', 'template/resultsModule.js', 'template/searchModule.js']
+    data_js = DbVisualizer._get_template_file('template/data.js').replace('{{data}}',
+                                                                          "".join(iter_columnar_json(data)))
+    script = NODE_STUB + data_js + "".join(DbVisualizer._get_template_file(f) for f in files) + NODE_TIMING
+    script_path = os.path.join(work_dir, "report_benchmark.js")
+    with open(script_path, 'w', encoding='utf-8') as fh:
+        fh.write(script)
+    start = time.perf_counter()
+    output = subprocess.run([node, "--max-old-space-size=8192", script_path], stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE, universal_newlines=True)
+    seconds = time.perf_counter() - start
+    os.remove(script_path)
+    if output.returncode != 0:
+        return {"error": output.stderr.strip().splitlines()[-1] if output.stderr.strip() else "failed"}
+    ret = json.loads(output.stdout.strip().splitlines()[-1])
+    ret["total_seconds"] = seconds
+    return ret
+
+
+def run_size(size: str, extended: bool, node: str = None) -> Mapping[str, Any]:
+    """
+    Measuring report generation of one size (in this process)
+    :param size: size as "TABLESxCOLUMNS"
+    :param extended: if columns should be extended
+    :param node: path of node executable (Node is not timed if not given)
+    :return: measurements
+    """
+    tables, columns = parse_size(size)
+    data, build_seconds = timed(synthetic_data, tables, columns, extended)
+    # same order as in DbVisualizer.render
+    columnar, columnar_seconds = timed(to_columnar, data)
+    pretty, pretty_seconds = timed(pretty_floats, columnar)
+    _, json_seconds = timed(lambda: json.dumps(pretty, ensure_ascii=False, use_decimal=True, separators=(',', ':')))
+    del columnar, pretty
+    with tempfile.TemporaryDirectory() as work_dir:
+        out_path = os.path.join(work_dir, "report.html")
+        _, report_seconds = timed(DbVisualizer(data, out_path).generate_report)
+        ret = {
+            "size": size,
+            "tables": tables,
+            "columns": tables * columns,
+            "build_seconds": build_seconds,
+            "pretty_floats_seconds": pretty_seconds,
+            "columnar_seconds": columnar_seconds,
+            "json_seconds": json_seconds,
+            "generate_report_seconds": report_seconds,
+            "report_bytes": os.path.getsize(out_path),
+            "peak_rss_bytes": peak_rss()
+        }
+        if node is not None:
+            ret["node"] = time_node(node, data, work_dir)
+    return ret
+
+
+def compare(baseline: Mapping, results: Sequence[Mapping]) -> str:
+    """
+    :param baseline: previous results (as written to baseline file)
+    :param results: new results
+    :return: text report of ratios of new to previous values for sizes present in both
+    """
+    previous = {result["size"]: result for result in baseline["results"]}
+    keys = ["generate_report_seconds", "report_bytes", "peak_rss_bytes"]
+    lines = []
+    for result in results:
+        old = previous.get(result["size"])
+        if old is None or "error" in result or "error" in old:
+            continue
+        ratios = [f"{key}: {result[key] / old[key]:.2f}x" for key in keys if result.get(key) and old.get(key)]
+        old_node, new_node = old.get("node") or {}, result.get("node") or {}
+        if new_node.get("total_seconds") and old_node.get("total_seconds"):
+            ratios.append(f"node total_seconds: {new_node['total_seconds'] / old_node['total_seconds']:.2f}x")
+        lines.append(f"{result['size']}: " + ", ".join(ratios))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Database explorer report generation benchmark')
+    parser.add_argument('-sz', '--sizes', help='Sizes as TABLESxCOLUMNS (columns per table), e.g. 100000x10',
+                        nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('-bs', '--basic', action='store_true', help='Benchmark basic instead of extended report')
+    parser.add_argument('-nn', '--no_node', action='store_true', help='Do not time report initialization in Node')
+    parser.add_argument('-b', '--baseline', help='Path of JSON file the results are written to', type=str)
+    parser.add_argument('-c', '--compare', help='Path of previous baseline file to compare results with', type=str)
+    parser.add_argument('--single', help=argparse.SUPPRESS, type=str)
+    args = parser.parse_args()
+
+    node = None if args.no_node else shutil.which("node")
+    if args.single is not None:
+        print(json.dumps(run_size(args.single, not args.basic, node)))
+        return
+
+    results = []
+    for size in args.sizes:
+        command = [sys.executable, "-m", "dbexplorer.benchmark", "--single", size]
+        command += ["--basic"] if args.basic else []
+        command += ["--no_node"] if args.no_node else []
+        output = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+        if output.returncode != 0:
+            result = {"size": size, "error": output.stderr.strip().splitlines()[-1] if output.stderr.strip()
+                      else "failed"}
+        else:
+            result = json.loads(output.stdout.strip().splitlines()[-1])
+        results.append(result)
+        print(json.dumps(result), flush=True)
+
+    baseline = {
+        "created": datetime.datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "node": None if node is None else subprocess.run([node, "--version"], stdout=subprocess.PIPE,
+                                                         universal_newlines=True).stdout.strip(),
+        "extended": not args.basic,
+        "results": results
+    }
+    if args.baseline is not None:
+        with open(args.baseline, 'w', encoding='utf-8') as fh:
+            json.dump(baseline, fh, indent=2)
+    if args.compare is not None:
+        with open(args.compare, 'r', encoding='utf-8') as fh:
+            print(compare(json.load(fh), results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+creating extractors from options named as command line arguments (parsed arguments or configuration files)
+"""
+
+import importlib
+from typing import Mapping, Any, Type, Union
+
+from dbexplorer.extracting.base_extractors import DbExtractor
+from dbexplorer.extracting.filters import ExtractionFilter
+from dbexplorer.extracting.memo import DEFAULT_CACHE_ROWS
+
+# entry point group of third-party backends, e.g. in setup.py of a plugin:
+# entry_points={'dbexplorer.backends': ['oracle = dbexplorer_oracle:OracleDbExtractor']}
+BACKENDS_ENTRY_POINT = 'dbexplorer.backends'
+
+# backends are imported only when selected, so missing drivers of other databases do not matter
+EXTRACTORS = {
+    'postgres': 'dbexplorer.extracting.postgres_like:PostgresLikeDbExtractor',
+    'mysql': 'dbexplorer.extracting.mysql:MysqlDbExtractor',
+    'redshift': 'dbexplorer.extracting.redshift:RedshiftDbExtractor',
+    'teradata': 'dbexplorer.extracting.teradata:TeradataDbExtractor',
+}
+
+
+def register_backend(db_type: str, extractor: Union[str, Type[DbExtractor]]) -> None:
+    """
+    Registering backend (overrides built-in or installed backend of the same database type)
+    :param db_type: database type (case insensitive)
+    :param extractor: extractor class or its path in form 'module:Class' (imported when selected)
+    """
+    EXTRACTORS[db_type.lower()] = extractor
+
+
+def _find_entry_point(db_type: str) -> Any:
+    # entry points are only searched for unknown database types, it is slower than importing a backend
+    try:
+        from importlib.metadata import entry_points
+        if hasattr(entry_points(), 'select'):
+            found = entry_points().select(group=BACKENDS_ENTRY_POINT)
+        else:
+            found = entry_points().get(BACKENDS_ENTRY_POINT, [])
+    except ImportError:
+        import pkg_resources
+        found = pkg_resources.iter_entry_points(BACKENDS_ENTRY_POINT)
+    return next((entry_point for entry_point in found if entry_point.name.lower() == db_type), None)
+
+
+def get_extractor_class(db_type: str) -> Type[DbExtractor]:
+    """
+    Importing backend of database type
+    :param db_type: database type (case insensitive) - built-in, registered or installed (entry point)
+    :return: extractor class
+    """
+    db_type = db_type.lower()
+    if db_type not in EXTRACTORS:
+        entry_point = _find_entry_point(db_type)
+        if entry_point is None:
+            raise ValueError(f"Unknown database type {db_type}")
+        EXTRACTORS[db_type] = entry_point.load()
+
+    extractor = EXTRACTORS[db_type]
+    if isinstance(extractor, str):
+        module_name, class_name = extractor.split(':')
+        extractor = getattr(importlib.import_module(module_name), class_name)
+        EXTRACTORS[db_type] = extractor
+    return extractor
+
+
+def parse_settings(settings: Any) -> Mapping[str, str]:
+    """
+    :param settings: settings as mapping (configuration files) or list of name=value (command line)
+    :return: settings by name
+    """
+    if settings is None or isinstance(settings, Mapping):
+        return settings
+    return dict(setting.split('=', 1) for setting in settings)
+
+
+def create_extractor(options: Mapping[str, Any], **kwargs) -> DbExtractor:
+    """
+    Creating (and connecting) extractor
+    :param options: options named as command line arguments (database_type, server, port, database_name, ...),
+    not given options take default values of command line arguments
+    :param kwargs: additional arguments of extractor
+    :return: extractor for database type
+    """
+    extractor_class = get_extractor_class(options['database_type'])
+    db_type = options['database_type'].lower()
+    if db_type == 'teradata' and options.get('odbc_driver') is None:
+        raise Exception("Please provide odbc driver for teradata")
+    elif db_type != 'teradata' and options.get('port') is None:
+        raise Exception("Please provide port for connection")
+
+    return extractor_class(server_address=options['server'],
+                           port=options.get('port'),
+                           db_name=options['database_name'],
+                           user=options['user'],
+                           password=options['password'],
+                           extended=options.get('extended', False),
+                           top_number=options.get('top_number', 5),
+                           schema=options.get('schema', 'public'),
+                           odbc_driver=options.get('odbc_driver'),
+                           max_text_len=options.get('max_text_length', 100),
+                           catalog_stats=options.get('catalog_stats', False),
+                           filters=ExtractionFilter(include_tables=options.get('include_tables'),
+                                                    exclude_tables=options.get('exclude_tables'),
+                                                    include_columns=options.get('include_columns'),
+                                                    exclude_columns=options.get('exclude_columns'),
+                                                    include_types=options.get('include_types'),
+                                                    exclude_types=options.get('exclude_types'),
+                                                    max_rows=options.get('max_rows')),
+                           dry_run=options.get('dry_run', False),
+                           max_cost=options.get('max_cost'),
+                           incremental_state=options.get('incremental_state'),
+                           watermark_columns=options.get('watermark_columns'),
+                           shards=options.get('shards'),
+                           shard_columns=options.get('shard_columns'),
+                           shard_min_rows=options.get('shard_min_rows', 1000000),
+                           discover_keys=options.get('discover_keys', False),
+                           verified_keys=options.get('verified_keys', 100),
+                           value_filters=options.get('value_filters', False),
+                           value_filter_fpr=options.get('value_filter_fpr', 0.01),
+                           value_filter_max_distinct=options.get('value_filter_max_distinct', 100000),
+                           value_filter_budget=int(options.get('value_filter_budget', 10) * 1024 * 1024),
+                           statement_cache_rows=options.get('statement_cache_rows', DEFAULT_CACHE_ROWS),
+                           session_profile=not options.get('no_session_profile', False),
+                           session_settings=parse_settings(options.get('session_settings')),
+                           memory_budget=None if options.get('memory_budget') is None
+                           else int(options['memory_budget'] * 1024 * 1024),
+                           memory_trace=options.get('memory_trace', False),
+                           throttle_concurrency=options.get('throttle_concurrency'),
+                           throttle_rows_per_second=options.get('throttle_rows_per_second'),
+                           throttle_max_load=options.get('throttle_max_load'),
+                           throttle_latency_factor=options.get('throttle_latency_factor', 3.0),
+                           throttle_probe_interval=options.get('throttle_probe_interval', 10.0),
+                           **kwargs)
@@ -0,0 +1,309 @@
+"""
+Distributed extraction - a coordinator enumerates tables into a durable work queue (SQLite file, e.g. on shared
+storage) and workers on several hosts claim tables with leases and write per-table results to the queue.
+Leases of working workers are renewed, tables whose lease expired (worker died or hung) are queued again
+by the coordinator, which assembles the report when all tables are finished.
+
+    # coordinator (options of extraction as for dbexplorer), 4 local workers
+    dbexplorer-distributed coordinator -q /shared/queue.sqlite -w 4 -t teradata -s 192.168.44.128 ... -o report.html
+    # worker on another host (options are read from the queue, password from argument or DBEXPLORER_PASSWORD)
+    dbexplorer-distributed worker -q /shared/queue.sqlite
+
+Lease times are compared across hosts, so clocks of hosts need to be synchronized (e.g. by NTP).
+Foreign keys are not discovered in distributed mode, signatures of columns would be spread over workers.
+Value filters are computed by workers, the size budget of filters applies to each worker.
+"""
+
+import argparse
+import logging
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Mapping, Sequence
+
+import simplejson as json
+
+from dbexplorer.config import create_extractor
+
+# password is not stored in the queue, workers get it from argument or this environment variable
+PASSWORD_ENV = "DBEXPLORER_PASSWORD"
+DEFAULT_LEASE_SECONDS = 300
+DEFAULT_MAX_ATTEMPTS = 3
+
+QUEUED, LEASED, DONE, FAILED = "queued", "leased", "done", "failed"
+
+
+class WorkQueue:
+    """
+    Tables of extraction in SQLite file, every claim and update is a separate (immediate) transaction,
+    so the file can be shared by processes of several hosts
+    """
+
+    def __init__(self, path: str, timeout: float = 60.0):
+        """
+        :param path: path of SQLite file
+        :param timeout: seconds of waiting for lock of the file held by other process
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+
+    def _transaction(self, statements: Sequence[Any]) -> None:
+        cursor = self.connection.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            for sql, params in statements:
+                cursor.execute(sql, params)
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+
+    def create(self, names: Sequence[str], options: Mapping[str, Any]) -> None:
+        """
+        Creating (or replacing) queue of tables
+        :param names: names of tables in order of claiming
+        :param options: options of extraction named as command line arguments (without password)
+        """
+        statements = [("DROP TABLE IF EXISTS tables", ()), ("DROP TABLE IF EXISTS meta", ()),
+                      ("""CREATE TABLE tables (name TEXT PRIMARY KEY, position INTEGER, status TEXT, worker TEXT,
+                          lease_until REAL, attempts INTEGER DEFAULT 0, result TEXT, error TEXT)""", ()),
+                      ("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)", ()),
+                      ("INSERT INTO meta VALUES ('options', ?)", (json.dumps(options),))]
+        statements += [("INSERT INTO tables (name, position, status) VALUES (?, ?, ?)", (name, i, QUEUED))
+                       for i, name in enumerate(names)]
+        self._transaction(statements)
+
+    def options(self) -> Mapping[str, Any]:
+        return json.loads(self.connection.execute("SELECT value FROM meta WHERE key = 'options'").fetchone()[0])
+
+    def claim(self, worker: str, lease_seconds: float) -> str:
+        """
+        :param worker: id of worker
+        :param lease_seconds: the table is queued again if its lease is not renewed in this time
+        :return: name of claimed table (None if no table is queued)
+        """
+        cursor = self.connection.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            row = cursor.execute("SELECT name FROM tables WHERE status = ? ORDER BY position LIMIT 1",
+                                 (QUEUED,)).fetchone()
+            if row is not None:
+                cursor.execute("""UPDATE tables SET status = ?, worker = ?, lease_until = ?, attempts = attempts + 1
+                                  WHERE name = ?""", (LEASED, worker, time.time() + lease_seconds, row[0]))
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+        return None if row is None else row[0]
+
+    def renew(self, name: str, worker: str, lease_seconds: float) -> None:
+        self._transaction([("UPDATE tables SET lease_until = ? WHERE name = ? AND worker = ? AND status = ?",
+                            (time.time() + lease_seconds, name, worker, LEASED))])
+
+    def complete(self, name: str, worker: str, result: Mapping[str, Any]) -> None:
+        """
+        :param name: name of table
+        :param worker: id of worker
+        :param result: extracted table as dict (None if the table was skipped)
+        """
+        # result of a worker whose lease expired is still valid, the table may be extracted twice
+        self._transaction([("UPDATE tables SET status = ?, worker = ?, result = ?, error = NULL "
+                            "WHERE name = ? AND status != ?",
+                            (DONE, worker, json.dumps(result, use_decimal=True), name, DONE))])
+
+    def fail(self, name: str, worker: str, error: str, max_attempts: int) -> None:
+        """
+        Queueing the table again or marking it failed after max attempts
+        """
+        self._transaction([("""UPDATE tables SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, error = ?,
+                               worker = NULL WHERE name = ? AND worker = ? AND status = ?""",
+                            (max_attempts, FAILED, QUEUED, error, name, worker, LEASED))])
+
+    def requeue_expired(self, max_attempts: int) -> int:
+        """
+        Queueing again tables whose lease expired, tables which expired max attempts times are marked failed
+        (e.g. each of them crashes its worker)
+        :param max_attempts: max number of claims of a table
+        :return: number of tables queued again or failed
+        """
+        cursor = self.connection.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute("""UPDATE tables SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, worker = NULL,
+                          error = coalesce(error, 'lease expired') WHERE status = ? AND lease_until < ?""",
+                       (max_attempts, FAILED, QUEUED, LEASED, time.time()))
+        count = cursor.rowcount
+        cursor.execute("COMMIT")
+        return count
+
+    def counts(self) -> Mapping[str, int]:
+        """
+        :return: numbers of tables by status
+        """
+        return dict(self.connection.execute("SELECT status, count(*) FROM tables GROUP BY status").fetchall())
+
+    def results(self) -> Sequence[Mapping[str, Any]]:
+        """
+        :return: extracted tables (as dicts) in order of queue, skipped and failed tables are omitted
+        """
+        rows = self.connection.execute("SELECT name, status, result, error FROM tables ORDER BY position").fetchall()
+        ret = []
+        for name, status, result, error in rows:
+            if status == FAILED:
+                logging.warning(f'Extraction of table {name} failed: {error}')
+            elif result is not None:
+                # numeric values of db (decimals) are kept exact, as in the report of a single process
+                table = json.loads(result, use_decimal=True)
+                # None for tables skipped by their cost
+                if table is not None:
+                    ret.append(table)
+        return ret
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+def run_worker(queue_path: str, password: str, worker: str = None, lease_seconds: float = DEFAULT_LEASE_SECONDS,
+               max_attempts: int = DEFAULT_MAX_ATTEMPTS, poll_seconds: float = 5.0) -> int:
+    """
+    Extracting claimed tables until no table is queued or leased
+    :param queue_path: path of SQLite file of the queue
+    :param password: password for the user of db
+    :param worker: id of worker (host and process id if not given)
+    :param lease_seconds: lease of claimed table, it is renewed every third of this time during extraction
+    :param max_attempts: a table failing this many times is marked failed
+    :param poll_seconds: waiting time when all remaining tables are leased by other workers
+    :return: number of extracted tables
+    """
+    worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+    queue = WorkQueue(queue_path)
+    options = dict(queue.options(), password=password)
+    extractor = create_extractor(options)
+    extracted = 0
+    while True:
+        name = queue.claim(worker, lease_seconds)
+        if name is None:
+            counts = queue.counts()
+            if not counts.get(QUEUED) and not counts.get(LEASED):
+                break
+            # leases of other workers may expire and their tables be queued again
+            time.sleep(poll_seconds)
+            continue
+
+        stop = threading.Event()
+
+        def renew_lease(table_name=name):
+            # the heartbeat has its own connection, sqlite connections are bound to threads
+            heartbeat = WorkQueue(queue_path)
+            while not stop.wait(lease_seconds / 3):
+                heartbeat.renew(table_name, worker, lease_seconds)
+            heartbeat.close()
+
+        heartbeat_thread = threading.Thread(target=renew_lease, daemon=True)
+        heartbeat_thread.start()
+        try:
+            table = extractor._get_table(name)
+            if table is not None and extractor.value_filters is not None:
+                extractor.value_filters.add_table(extractor._create_table_extractor(extractor.db_connection, name),
+                                                  table)
+            extractor.end_transaction()
+            queue.complete(name, worker, None if table is None else table.to_dict())
+            extracted += 1
+            logging.info(f'Worker {worker} extracted table {name}')
+        except Exception as e:
+            logging.exception(f'Worker {worker} failed to extract table {name}')
+            queue.fail(name, worker, str(e), max_attempts)
+        finally:
+            stop.set()
+            heartbeat_thread.join()
+    queue.close()
+    return extracted
+
+
+def coordinate(options: Mapping[str, Any], queue_path: str, workers: int = 0,
+               lease_seconds: float = DEFAULT_LEASE_SECONDS, max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+               poll_seconds: float = 5.0) -> Mapping:
+    """
+    Queueing tables of db (largest first, according to catalog), waiting for workers and assembling the report
+    :param options: options of extraction named as command line arguments
+    :param queue_path: path of SQLite file of the queue
+    :param workers: number of local worker processes started by coordinator (remote workers can join as well)
+    :param lease_seconds: lease of claimed tables
+    :param max_attempts: a table claimed this many times is marked failed
+    :param poll_seconds: interval of checking the queue
+    :return: extracted database info as given by extract_to_dict
+    """
+    extractor = create_extractor(options)
+    names = extractor._get_tables_names()
+    estimates = extractor._get_tables_rows_estimates()
+    # the connection stays idle until workers finish, it does not hold a transaction
+    extractor.end_transaction()
+    # large tables first, so they do not end up as the last long tail of one worker
+    names = sorted(names, key=lambda name: -(estimates.get(name) or 0))
+    queue = WorkQueue(queue_path)
+    queue.create(names, {key: value for key, value in options.items() if key != "password"})
+    logging.info(f'{len(names)} tables queued in {queue_path}')
+
+    env = dict(os.environ)
+    env[PASSWORD_ENV] = options["password"]
+    processes = [subprocess.Popen([sys.executable, "-m", "dbexplorer.distributed", "worker", "-q", queue_path,
+                                   "-ls", str(lease_seconds), "-ma", str(max_attempts)], env=env)
+                 for _ in range(workers)]
+    try:
+        while True:
+            requeued = queue.requeue_expired(max_attempts)
+            if requeued:
+                logging.warning(f'{requeued} tables queued again after their lease expired')
+            counts = queue.counts()
+            if not counts.get(QUEUED) and not counts.get(LEASED):
+                break
+            if len(processes) and all(process.poll() is not None for process in processes):
+                raise Exception(f"All local workers exited, tables are left in the queue: {counts}")
+            time.sleep(poll_seconds)
+    finally:
+        for process in processes:
+            process.wait()
+
+    data = {
+        "scheme": "SchemeName",
+        "database": options["database_name"],
+        "tables": queue.results()
+    }
+    queue.close()
+    return data
+
+
+def main():
+    from dbexplorer.__main__ import parser as extraction_parser
+    from dbexplorer.visualizing import DbVisualizer
+
+    parser = argparse.ArgumentParser(description='Database explorer distributed mode')
+    parser.add_argument('role', choices=['coordinator', 'worker'])
+    parser.add_argument('-q', '--queue', help='Path of SQLite file of work queue (on storage shared by workers)',
+                        type=str, required=True)
+    parser.add_argument('-w', '--workers', help='Number of local worker processes started by coordinator', type=int,
+                        default=0)
+    parser.add_argument('-ls', '--lease_seconds', help='Tables of workers not renewing leases in this time are '
+                                                       'queued again', type=float, default=DEFAULT_LEASE_SECONDS)
+    parser.add_argument('-ma', '--max_attempts', help='Tables failing (or expiring) this many times are skipped',
+                        type=int, default=DEFAULT_MAX_ATTEMPTS)
+    parser.add_argument('-wpass', '--worker_password', help=f'Password for the user (worker, default: '
+                                                            f'{PASSWORD_ENV} environment variable)', type=str)
+    args, extraction_args = parser.parse_known_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.role == 'worker':
+        run_worker(args.queue, args.worker_password or os.environ.get(PASSWORD_ENV), lease_seconds=args.lease_seconds,
+                   max_attempts=args.max_attempts)
+        return
+
+    options = vars(extraction_parser.parse_args(extraction_args))
+    data = coordinate(options, args.queue, args.workers, args.lease_seconds, args.max_attempts)
+    DbVisualizer(data, options["output"]).generate_report()
+
+
+if __name__ == "__main__":
+    main()
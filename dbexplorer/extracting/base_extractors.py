@@ -1,6 +1,18 @@
 from abc import ABCMeta, abstractmethod
+from contextlib import contextmanager
+from dbexplorer.extracting.common import get_domain_counts
 from dbexplorer.extracting.db_types import Table, Column, ColumnType
-from typing import Sequence, Mapping, Any, Tuple, Type
+from dbexplorer.extracting.filters import ExtractionFilter
+from dbexplorer.extracting.dry_run import DryRunConnection
+from dbexplorer.extracting.incremental import IncrementalProfiler
+from dbexplorer.extracting.sharding import ShardedProfiler
+from dbexplorer.extracting.keys import KeyDiscovery
+from dbexplorer.extracting.memo import MemoConnection, DEFAULT_CACHE_ROWS
+from dbexplorer.extracting.memory import MemoryMonitor, SpilledTables, LOW_MEMORY_CACHE_ROWS
+from dbexplorer.extracting.progress import ExtractionProgress
+from dbexplorer.extracting.throttle import ThrottleScope, get_throttle
+from dbexplorer.extracting.value_filters import ValueFilters
+from typing import Sequence, Mapping, Any, Tuple, Type, Iterator, Callable
 import logging
 
 
@@ -12,8 +24,26 @@ class DbExtractor(metaclass=ABCMeta):
     All already create derived classes follow this structure.
     """
 
+    # session settings (name: value) applied to connections of extraction, see _configure_session
+    SESSION_SETTINGS = {}
+    # cheap statement timed by throttle to detect load of server
+    PROBE_STATEMENT = "SELECT 1"
+    # statement giving number of running statements of server (in the last column of its first row), see throttle
+    LOAD_STATEMENT = None
+
     def __init__(self, server_address: str, port: int, db_name: str, user: str, password: str, extended: bool,
-                 top_number: int, schema: str, odbc_driver: str, max_text_len: int):
+                 top_number: int, schema: str, odbc_driver: str, max_text_len: int, catalog_stats: bool = False,
+                 filters: ExtractionFilter = None, dry_run: bool = False, max_cost: float = None,
+                 incremental_state: str = None, watermark_columns: Sequence[str] = None, shards: int = None,
+                 shard_columns: Sequence[str] = None, shard_min_rows: int = 1000000, discover_keys: bool = False,
+                 verified_keys: int = 100, connection: Any = None, connection_factory: Callable[[], Any] = None,
+                 statement_cache_rows: int = DEFAULT_CACHE_ROWS, session_profile: bool = True,
+                 session_settings: Mapping[str, Any] = None, progress: ExtractionProgress = None,
+                 value_filters: bool = False, value_filter_fpr: float = 0.01, value_filter_max_distinct: int = 100000,
+                 value_filter_budget: int = 10 * 1024 * 1024, memory_budget: int = None,
+                 memory_trace: bool = False, throttle_concurrency: int = None,
+                 throttle_rows_per_second: float = None, throttle_max_load: float = None,
+                 throttle_latency_factor: float = 3.0, throttle_probe_interval: float = 10.0):
         """
         :param server_address: address of db server (in form: "192.168.1.1")
         :param port: port of the database
@@ -25,11 +55,106 @@ class DbExtractor(metaclass=ABCMeta):
         :param schema: schema name (may be ignored if db type does not use it)
         :param odbc_driver: driver (may be ignored if db type does not use it)
         :param max_text_len: max length of text in column
+        :param catalog_stats: if statistics should be read from db catalog where available (instead of scanning)
+        :param filters: tables and columns to be extracted (all if not given)
+        :param dry_run: if statements reading tables should be only explained (see get_cost_report)
+        :param max_cost: tables with higher estimated cost of extraction (EXPLAIN) are skipped
+        :param incremental_state: directory of stored states of incremental profiling (not used in dry run)
+        :param watermark_columns: tables with any of these columns are profiled incrementally
+        :param shards: tables are read in this many shards on parallel connections (not used in dry run)
+        :param shard_columns: columns split into value ranges of shards (primary key is used if not given)
+        :param shard_min_rows: tables with fewer rows by catalog estimate are not read in shards
+        :param discover_keys: if foreign keys should be discovered from sketches of columns (not used in dry run)
+        :param verified_keys: number of best candidate foreign keys verified by queries
+        :param connection: existing connection to db (used instead of connecting, it is not closed by extractor)
+        :param connection_factory: function giving connections to db, e.g. getconn of a pool (used instead of
+        connecting, for the main connection if no connection is given and for shards)
+        :param statement_cache_rows: max number of rows of results kept in memory, repeated statements within
+        extraction of a table are answered from them (0 disables the cache, not used in dry run)
+        :param session_profile: if session settings should be applied to connections created by extractor
+        and statements of every table should be run in one read-only snapshot transaction (not used in dry run)
+        :param session_settings: settings overriding SESSION_SETTINGS of the db type
+        :param progress: progress notified about tables and statements of extraction (not used in dry run)
+        :param value_filters: if bloom filters of all values of columns should be embedded in report for value search
+        (not used in dry run)
+        :param value_filter_fpr: target rate of false positives of value filters
+        :param value_filter_max_distinct: columns with more distinct values get no value filter
+        :param value_filter_budget: max total size of value filters in bytes
+        :param memory_budget: max RSS of process in bytes, when it is approached statement cache is reduced and
+        extracted tables are spilled to disk (not used in dry run)
+        :param memory_trace: if allocations should be traced to attribute memory to extraction and tables
+        (see memory, not used in dry run)
+        :param throttle_concurrency: max number of statements running at once on the server (shared by extractors
+        of the server in the process), it is lowered while the server is loaded (not used in dry run)
+        :param throttle_rows_per_second: max estimated rows per second scanned by statements reading tables
+        (not limited if not given, not used in dry run)
+        :param throttle_max_load: server is loaded when LOAD_STATEMENT gives more running statements of other
+        clients (relative to the lowest observed load if not given)
+        :param throttle_latency_factor: server is loaded when PROBE_STATEMENT takes this multiple of its lowest
+        latency
+        :param throttle_probe_interval: min seconds between probes of load of the server
         """
+        self.session_settings = dict(self.SESSION_SETTINGS)
+        self.session_settings.update(session_settings or {})
+        # given connections are not changed, they may be shared with other code
+        self.snapshots = session_profile and not dry_run and connection is None and connection_factory is None
+        self._own_connection = connection is None
         self.max_text_len = max_text_len
+        self.dry_run = dry_run
+        self.max_cost = max_cost
+        self.incremental = None
+        if incremental_state is not None and watermark_columns:
+            self.incremental = IncrementalProfiler(incremental_state, watermark_columns)
+        self.catalog_stats = catalog_stats
+        self.filters = filters if filters is not None else ExtractionFilter()
         self.db_name = db_name
         self.odbc_driver = odbc_driver
-        self.db_connection = self.connect(server_address, port, db_name, user, password)
+        if connection_factory is None and session_profile:
+            connection_factory = lambda: self._configure_session(
+                self.connect(server_address, port, db_name, user, password))
+        elif connection_factory is None:
+            connection_factory = lambda: self.connect(server_address, port, db_name, user, password)
+        self.throttle = None
+        if (throttle_concurrency is not None or throttle_rows_per_second is not None) and not dry_run:
+            self.throttle = ThrottleScope(get_throttle(
+                f"{server_address}:{port}", max_concurrency=throttle_concurrency or max(shards or 1, 1),
+                rows_per_second=throttle_rows_per_second, max_load=throttle_max_load,
+                latency_factor=throttle_latency_factor, probe_interval=throttle_probe_interval,
+                connection_factory=connection_factory, probe_statement=self.PROBE_STATEMENT,
+                load_statement=self.LOAD_STATEMENT))
+            throttled = connection_factory
+            connection_factory = lambda: self.throttle.wrap(throttled())
+            if connection is not None:
+                connection = self.throttle.wrap(connection)
+        self.progress = None if dry_run else progress
+        if self.progress is not None:
+            connect = connection_factory
+            connection_factory = lambda: self.progress.wrap(connect())
+            if connection is not None:
+                connection = self.progress.wrap(connection)
+        self.db_connection = connection if connection is not None else connection_factory()
+        self.sharded = None
+        if shards is not None and shards > 1:
+            self.sharded = ShardedProfiler(connection_factory, self._create_table_extractor, shards, shard_columns,
+                                           shard_min_rows)
+        # catalog row counts of tables (read once per iteration over tables, when needed)
+        self._rows_estimates = None
+        self.key_discovery = None
+        if discover_keys and not dry_run:
+            self.key_discovery = KeyDiscovery(verified_keys)
+        self.value_filters = None
+        if value_filters and not dry_run:
+            self.value_filters = ValueFilters(value_filter_fpr, value_filter_max_distinct, value_filter_budget)
+        self.memory = None
+        if (memory_budget is not None or memory_trace) and not dry_run:
+            self.memory = MemoryMonitor(memory_budget, memory_trace)
+        # relationships discovered by the last iteration over tables
+        self.relationships = []
+        self.statement_cache = None
+        if dry_run:
+            self.db_connection = DryRunConnection(self.db_connection, self.explain_cost)
+        elif statement_cache_rows:
+            self.statement_cache = self.db_connection = MemoConnection(self.db_connection, statement_cache_rows)
         self.extended = extended
         self.top_number = top_number
         self.schema = schema
@@ -40,35 +165,227 @@ class DbExtractor(metaclass=ABCMeta):
         :return: sequence of Tables
         """
 
-        ret = []
-
-        for table_name in self._get_tables_names():
-            # try:
-            ret.append(self._get_table(table_name))
-            # except Exception as e:
-            #     logging.warning(f'Failed to extract info from table {table_name}: ' + str(e))
+        ret = list(self.iter_tables())
 
+        tables = {table.name: table for table in ret}
+        for relationship in self.relationships:
+            tables[relationship.table].relationships.append(relationship)
         return ret
 
+    def iter_tables(self, cancel: Callable[[], bool] = None,
+                    progress: Callable[[int, int, str], None] = None) -> Iterator[Table]:
+        """
+        Extracting tables one by one, every table is yielded as soon as it is extracted, so profiles of
+        the database do not need to be kept in memory. Discovered foreign keys are not attached to yielded
+        tables, they are available in relationships after the iteration.
+        :param cancel: function checked before every table, iteration stops if it returns True
+        :param progress: function called after every table (arguments: number of finished tables,
+        number of all tables, name of finished table)
+        :return: iterator of Tables (skipped tables are not yielded)
+        """
+        self.relationships = []
+        if self.key_discovery is not None:
+            self.key_discovery.signatures = []
+        if self.value_filters is not None:
+            self.value_filters.size = 0
+        if self.statement_cache is not None:
+            self.statement_cache.clear(statistics=True)
+        names = self._get_tables_names()
+        self._rows_estimates = None
+        if self.progress is not None or self.throttle is not None:
+            estimates = self._get_rows_estimates()
+            if self.progress is not None:
+                self.progress.start(names, estimates)
+            if self.throttle is not None:
+                self.throttle.start(estimates)
+        self.end_transaction()
+        try:
+            for i, table_name in enumerate(names):
+                if cancel is not None and cancel():
+                    logging.info(f'Extraction cancelled before table {table_name}')
+                    return
+                # try:
+                if self.progress is not None:
+                    self.progress.table_started(table_name)
+                if self.memory is not None:
+                    self.memory.table_started(table_name)
+                if self.throttle is not None:
+                    self.throttle.table = table_name
+                table = self._get_table(table_name)
+                if self.progress is not None:
+                    self.progress.table_finished(table_name, None if table is None else table.rows_count)
+                if table is not None:
+                    if self.key_discovery is not None:
+                        self.key_discovery.add_table(self._create_table_extractor(self.db_connection, table_name),
+                                                     table)
+                    if self.value_filters is not None:
+                        self.value_filters.add_table(self._create_table_extractor(self.db_connection, table_name),
+                                                     table)
+                if self.memory is not None:
+                    self.memory.table_finished(table_name)
+                    if self.statement_cache is not None and self.memory.near_budget() \
+                            and self.statement_cache.max_rows > LOW_MEMORY_CACHE_ROWS:
+                        # larger results are streamed from db instead of being kept
+                        self.statement_cache.max_rows = LOW_MEMORY_CACHE_ROWS
+                        self.statement_cache.clear()
+                if table is not None:
+                    yield table
+                # except Exception as e:
+                #     logging.warning(f'Failed to extract info from table {table_name}: ' + str(e))
+                if progress is not None:
+                    progress(i + 1, len(names), table_name)
+
+            if self.key_discovery is not None:
+                self.relationships = self.key_discovery.discover(
+                    lambda name: self._create_table_extractor(self.db_connection, name))
+        finally:
+            if self.statement_cache is not None:
+                logging.info(self.statement_cache.report())
+            if self.throttle is not None:
+                self.throttle.table = None
+                logging.info(self.throttle.throttle.report())
+            if self.progress is not None:
+                self.progress.finish()
+
     def _get_table(self, name: str) -> Table:
         """
         Method controls the workflow of extracting single db info
         :param name: name of table to be extracted
+        :return: Single table info (None if table is skipped because of its cost)
+        """
+        if self.statement_cache is not None:
+            # results are kept only within extraction of a table, a warm extractor never serves stale data
+            self.statement_cache.clear()
+        if self.dry_run:
+            self.db_connection.current_table = name
+        elif self.max_cost is not None:
+            cost = self.estimate_table_cost(name)
+            if cost > self.max_cost:
+                logging.warning(f'Table {name} skipped, its estimated cost {cost:.2f} is above {self.max_cost}')
+                return None
+
+        if self.snapshots:
+            with self._snapshot():
+                return self._extract_table(name)
+        return self._extract_table(name)
+
+    def _extract_table(self, name: str) -> Table:
+        """
+        :param name: name of table to be extracted
         :return: Single table info
         """
-        extractor = self.table_extractor_class(self.db_connection, name, self.extended, self.top_number, self.db_name,
-                                               self.max_text_len)
+        extractor = self._create_table_extractor(self.db_connection, name)
+        if self.incremental is not None and not self.dry_run:
+            table = self.incremental.get_table(extractor)
+            if table is not None:
+                return table
+        if self.sharded is not None and not self.dry_run:
+            table = self.sharded.get_table(extractor, self._get_rows_estimates().get(name))
+            if table is not None:
+                return table
         return Table(name, extractor.get_rows_count(), extractor.get_columns())
 
+    def _create_table_extractor(self, db_connection: Any, name: str) -> 'TableExtractor':
+        return self.table_extractor_class(db_connection, name, self.extended, self.top_number, self.db_name,
+                                          self.max_text_len, catalog_stats=self.catalog_stats, schema=self.schema,
+                                          filters=self.filters)
+
+    def _get_rows_estimates(self) -> Mapping[str, int]:
+        """
+        :return: estimated rows count by table name, read from db catalog once per iteration over tables
+        """
+        if self._rows_estimates is None:
+            self._rows_estimates = self._get_tables_rows_estimates()
+        return self._rows_estimates
+
+    def _get_tables_rows_estimates(self) -> Mapping[str, int]:
+        """
+        Row counts of tables according to db catalog (statistics), used for ETA of progress, throttle and shards
+        :return: estimated rows count by table name (tables without estimates are missing)
+        """
+        return {}
+
+    def _configure_session(self, connection: Any) -> Any:
+        """
+        Applying session profile (session_settings) to a new connection
+        :param connection: new connection to db
+        :return: the connection
+        """
+        return connection
+
+    def end_transaction(self) -> None:
+        """
+        Ending transaction of the main connection opened by statements outside snapshots (e.g. reads of db catalog),
+        so an idle connection does not hold its snapshot and locks. Transactions of a given connection belong
+        to the code that gave it, they are not ended.
+        """
+        if self._own_connection:
+            self.db_connection.rollback()
+
+    @contextmanager
+    def _snapshot(self) -> Iterator[None]:
+        """
+        Running statements of a table in one read-only snapshot transaction of the main connection
+        (shards are read on their own connections, each of them in its own transaction)
+        """
+        yield
+
+    def estimate_table_cost(self, name: str) -> float:
+        """
+        Explaining all statements of the table extraction without executing them
+        :param name: name of table
+        :return: sum of estimated costs of statements
+        """
+        connection = DryRunConnection(self.db_connection, self.explain_cost)
+        connection.current_table = name
+        extractor = self._create_table_extractor(connection, name)
+        extractor.get_rows_count()
+        extractor.get_columns()
+        return connection.total_cost()
+
+    def get_cost_report(self) -> str:
+        """
+        Report of estimated costs of all statements, extractor needs to be created with dry_run
+        :return: text report with costs per table and statement
+        """
+        if not self.dry_run:
+            raise ValueError("Cost report is available only in dry run")
+        self.get_tables()
+        return self.db_connection.report()
+
+    def explain_cost(self, cursor: Any, sql: str) -> float:
+        """
+        Estimating cost of the statement with EXPLAIN
+        :param cursor: cursor of (not wrapped) db connection
+        :param sql: statement to be explained
+        :return: estimated cost (in db units) or None if it can not be read from plan
+        """
+        raise NotImplementedError
+
     def extract_to_dict(self) -> Mapping:
         """
-        Getting dictionary that can be interpreted by the visualizer
-        :return: Dictionary of extracted database info
+        Getting dictionary that can be interpreted by the visualizer. Tables are converted as soon as they are
+        extracted, with memory budget they are spilled to disk when the budget is approached.
+        :return: Dictionary of extracted database info (tables may be SpilledTables)
         """
+        if self.memory is None:
+            tables = [table.to_dict() for table in self.iter_tables()]
+        else:
+            with self.memory.phase("extraction"):
+                tables = self.memory.collect(table.to_dict() for table in self.iter_tables())
+
+        relationships = {}
+        for relationship in self.relationships:
+            relationships.setdefault(relationship.table, []).append(relationship.to_dict())
+        if isinstance(tables, SpilledTables):
+            tables.relationships = relationships
+        else:
+            for table in tables:
+                table["relationships"].extend(relationships.get(table["name"], []))
         return {
             "scheme": "SchemeName",
             "database": self.db_name,
-            "tables": [table.to_dict() for table in self.get_tables()]
+            "tables": tables
         }
 
     @abstractmethod
@@ -87,7 +404,7 @@ class DbExtractor(metaclass=ABCMeta):
     @abstractmethod
     def _get_tables_names(self) -> Sequence[str]:
         """
-        get all table names in db
+        get all table names in db (matching filters)
         :return: List of table names
         """
         raise NotImplemented
@@ -109,8 +426,14 @@ class TableExtractor(metaclass=ABCMeta):
     All already create derived classes follow this structure.
     """
 
+    # format of quoted column name in statements
+    IDENTIFIER_QUOTE = '"{}"'
+    # format of mean of numeric column in statements
+    MEAN_SQL = 'avg({})'
+
     def __init__(self, db_connection: Any, table_name: str, extended: bool, top_number: int, db_name: str,
-                 max_text_len: int):
+                 max_text_len: int, catalog_stats: bool = False, schema: str = None,
+                 filters: ExtractionFilter = None):
         """
         :param db_connection: object of db connection proper for db type
         :param table_name: table name to be extracted
@@ -118,6 +441,9 @@ class TableExtractor(metaclass=ABCMeta):
         :param top_number: number of most common values to extract
         :param db_name: database name
         :param max_text_len: max length of text in column
+        :param catalog_stats: if statistics should be read from db catalog where available (instead of scanning)
+        :param schema: schema name (may be ignored if db type does not use it)
+        :param filters: columns to be extracted (all if not given)
         """
         self.db_connection = db_connection
         self.table_name = table_name
@@ -125,6 +451,11 @@ class TableExtractor(metaclass=ABCMeta):
         self.top_number = top_number
         self.db_name = db_name
         self.max_text_len = max_text_len
+        self.catalog_stats = catalog_stats
+        self.schema = schema
+        self.filters = filters if filters is not None else ExtractionFilter()
+        # counts of all values of small domain columns by column name
+        self._domain_counts = {}
 
     def get_columns(self) -> Sequence[Column]:
         """
@@ -141,7 +472,12 @@ class TableExtractor(metaclass=ABCMeta):
         columns_names, columns_sql_types = self._extract_column_names_and_types()
 
         if self.extended:
-            return self._extract_extended_stats(columns_names, columns_sql_types)
+            columns = self._extract_extended_stats(columns_names, columns_sql_types)
+            histograms = self._get_histograms(columns)
+            for column in columns:
+                if column.name in histograms:
+                    column.histogram = histograms[column.name]
+            return columns
 
         return self._extract_basic_stats(columns_names, columns_sql_types)
 
@@ -163,6 +499,138 @@ class TableExtractor(metaclass=ABCMeta):
         """
         raise NotImplementedError
 
+    def iter_rows(self, columns_names: Sequence[str], bounds: Sequence[Tuple[str, str, Any]] = (),
+                  distinct: bool = False, limit: int = None) -> Iterator[Sequence[Any]]:
+        """
+        Streaming rows of the table (used by incremental and sharded profiling, key discovery and value filters)
+        :param columns_names: columns to be read
+        :param bounds: conditions (column, operator, value) of read rows joined with AND, e.g. ("id", ">", 100)
+        :param distinct: if only distinct rows should be read
+        :param limit: max number of read rows, the statement stops after them (all rows if not given)
+        :return: iterator of rows
+        """
+        raise NotImplementedError
+
+    def _get_distinct_estimates(self) -> Mapping[str, float]:
+        """
+        Distinct counts of columns estimated by statistics of db catalog, read without scanning the table
+        :return: estimated number of distinct values by column name (columns without statistics are missing)
+        """
+        return {}
+
+    def _count_missing_values(self, column_name: str, referenced_table: str, referenced_column: str) -> int:
+        """
+        Checking inclusion dependency (used by key discovery)
+        :param column_name: column of this table
+        :param referenced_table: table of referenced column (in the same db)
+        :param referenced_column: referenced column
+        :return: number of distinct non null values of the column missing in referenced column
+        """
+        raise NotImplementedError
+
+    def _get_nullable(self, columns: Sequence[Mapping[str, str]]) -> Mapping[str, Any]:
+        """
+        Nullability of columns read from db catalog
+        :param columns: columns (dicts with name and sql_type)
+        :return: nullability (as given by db) by column name
+        """
+        raise NotImplementedError
+
+    def _get_relation(self) -> str:
+        """
+        :return: table as used in statements
+        """
+        return self.table_name
+
+    def _get_small_domain_columns(self, columns: Sequence[Mapping[str, str]]) -> Sequence[str]:
+        """
+        Columns whose type allows only a few values (booleans, enums). All their values are counted by one
+        grouping, which gives the most common values, nulls and distinct count at once.
+        :param columns: columns (dicts with name and sql_type)
+        :return: names of small domain columns
+        """
+        return []
+
+    def _get_domain_counts(self, column_name: str) -> Sequence[Tuple[Any, int]]:
+        """
+        Counts of all values of a small domain column, read once per table extraction
+        :param column_name: column name
+        :return: values (null included) with their counts, the most common first
+        """
+        if column_name not in self._domain_counts:
+            self._domain_counts[column_name] = get_domain_counts(self.IDENTIFIER_QUOTE.format(column_name),
+                                                                 self._get_relation(), self.db_connection)
+        return self._domain_counts[column_name]
+
+    def _get_basic_text_columns(self, columns: Sequence[Mapping[str, str]]) -> Sequence[Column]:
+        """
+        Most common values of text columns (used by sharded profiling for single columns)
+        :param columns: text columns (dicts with name and sql_type)
+        :return: basic text columns
+        """
+        raise NotImplementedError
+
+    def _get_distinct_count(self, column: Mapping[str, str], has_nulls: bool) -> int:
+        """
+        Distinct count of a column not unique by constraint (used by sharded profiling for single columns)
+        :param column: column (dict with name and sql_type)
+        :param has_nulls: if the column has null values
+        :return: number of distinct values, null is counted as a distinct value as well
+        """
+        raise NotImplementedError
+
+    def _get_quartiles(self, column_name: str, count: int) -> Sequence[float]:
+        """
+        :param column_name: name of numeric column
+        :param count: number of not null values of the column
+        :return: quartiles of the column
+        """
+        raise NotImplementedError
+
+    def _get_histograms(self, columns: Sequence[Column]) -> Mapping[str, Sequence[int]]:
+        """
+        Equal-width histograms (between min and max already extracted) of numeric and datetime columns
+        :param columns: extracted extended columns
+        :return: counts of values in buckets by column name (columns without histogram are omitted)
+        """
+        return {}
+
+    def _get_primary_key(self) -> Sequence[str]:
+        """
+        :return: columns of primary key of the table (empty if there is none)
+        """
+        raise NotImplementedError
+
+    def _get_unique_columns(self) -> Sequence[str]:
+        """
+        Columns whose values are unique by enforced constraints (single-column primary key, unique constraint
+        or unique index), their distinct counts are not queried and their most common values are not grouped
+        :return: names of unique columns
+        """
+        return []
+
+    def _get_partitions(self) -> Sequence[str]:
+        """
+        Partitions that can be read as separate tables (used by sharded profiling)
+        :return: names of partitions as used in statements (empty if the table is not partitioned)
+        """
+        return []
+
+    def _get_shard_column(self) -> str:
+        """
+        Column whose value ranges are read without scanning the whole table (used by sharded profiling)
+        :return: column name or None if there is no such column
+        """
+        key = self._get_primary_key()
+        return key[0] if len(key) == 1 else None
+
+    def _get_max_min(self, column_name: str) -> Tuple[Any, Any]:
+        """
+        :param column_name: name of column
+        :return: max and min of the column
+        """
+        raise NotImplementedError
+
     @abstractmethod
     def _extract_basic_stats(self, columns_names: Sequence[str], columns_sql_types: Sequence[str]) \
             -> Sequence[Column]:
@@ -187,7 +655,7 @@ class TableExtractor(metaclass=ABCMeta):
     @abstractmethod
     def _extract_column_names_and_types(self) -> Tuple[Sequence[str], Sequence[str]]:
         """
-        # extract names and sql_types of columns
+        # extract names and sql_types of columns (matching filters)
         :return: tuple of column names and corresponding types
         """
         raise NotImplementedError
@@ -2,9 +2,47 @@
 common methods to be used in any db type
 """
 
-from typing import Sequence, Any, Callable
+import re
+from datetime import date, datetime
+from typing import Sequence, Any, Callable, Container, Iterator, Mapping, Tuple
 
-TOO_LONG_TEXT_WARNING = "(Text length is longer than specified max)"
+# indexed columns with at most this many distinct values are enumerated by loose index scan
+LOOSE_INDEX_SCAN_MAX_DISTINCT = 10000
+# rows streamed from server are fetched in batches of this size
+ROWS_BATCH_SIZE = 10000
+# number of buckets of histograms of numeric and datetime columns
+HISTOGRAM_BUCKETS = 20
+# max number of result columns of one statement (Postgres allows 1664, Teradata 2048)
+MAX_SELECT_COLUMNS = 1000
+
+
+class ColumnStats:
+    """
+    Column statistics read from db catalog instead of scanning the table.
+    Any field may be None when the catalog does not provide it, the value is computed by live query then.
+    """
+
+    def __init__(self, null_fraction: float = None, distinct_count: int = None, top: Sequence[Any] = None,
+                 top_values: Sequence[int] = None, minimum: Any = None, maximum: Any = None, mean: float = None,
+                 quartiles: Sequence[float] = None):
+        """
+        :param null_fraction: fraction (0 - 1) of null values
+        :param distinct_count: number of distinct values
+        :param top: most common values
+        :param top_values: counts of most common values
+        :param minimum: minimal value
+        :param maximum: maximal value
+        :param mean: mean value (numeric columns only)
+        :param quartiles: quartiles (numeric columns only)
+        """
+        self.null_fraction = null_fraction
+        self.distinct_count = distinct_count
+        self.top = top
+        self.top_values = top_values
+        self.minimum = minimum
+        self.maximum = maximum
+        self.mean = mean
+        self.quartiles = quartiles
 
 
 def check_result_empty(result: Sequence[Any]) -> bool:
@@ -56,3 +94,199 @@ def get_text_len(column_name: str, table_name: str, db_connection: Any) -> bool:
     check_sql = f"""select max(length("{column_name}")) from {table_name};"""
     cursor.execute(check_sql)
     return cursor.fetchone()[0]
+
+
+def display_text(prefix: Any, length: int, max_text_len: int) -> Any:
+    """
+    :param prefix: first max_text_len characters of text
+    :param length: length of the whole text
+    :param max_text_len: max length of displayed text
+    :return: prefix marked as truncated if the text is longer
+    """
+    if prefix is None or length is None or length <= max_text_len:
+        return prefix
+    return f"{prefix}..."
+
+
+def get_max_min(column_names: Sequence[str], indexed: Container[str], max_min_sql: Callable, table_name: str,
+                db_connection: Any) -> Mapping[str, Tuple[Any, Any]]:
+    """
+    Max and min of columns. Statement with only max and min of indexed columns is answered by index seeks
+    instead of a scan, so indexed columns are queried separately from the others.
+    :param column_names: names of columns
+    :param indexed: names of columns that are leading columns of an index
+    :param max_min_sql: function returning "max, min" select part for given column name
+    :param table_name: (full) table name
+    :param db_connection: connection to db
+    :return: tuple of max and min by column name
+    """
+    ret = {}
+    cursor = db_connection.cursor()
+    for group in ([n for n in column_names if n in indexed], [n for n in column_names if n not in indexed]):
+        if not len(group):
+            continue
+        cursor.execute(f"""SELECT {", ".join([max_min_sql(n) for n in group])} from {table_name};""")
+        result = cursor.fetchone()
+        for i, name in enumerate(group):
+            ret[name] = (result[2 * i], result[2 * i + 1])
+    return ret
+
+
+def get_unique_distinct_count(rows_count: int, nulls_count: int) -> int:
+    """
+    Distinct count of column whose values are unique by constraint
+    :param rows_count: number of rows in table
+    :param nulls_count: number of nulls in column (unique constraints allow many nulls)
+    :return: number of distinct values, null is counted as a distinct value as well
+    """
+    return rows_count - nulls_count + (1 if nulls_count > 0 else 0)
+
+
+def get_nulls_counts(column_names: Sequence[str], identifier_quote: str, table_name: str,
+                     db_connection: Any) -> Mapping[str, int]:
+    """
+    Numbers of nulls of columns counted in a single pass over the table (wide tables take a pass
+    per MAX_SELECT_COLUMNS columns)
+    :param column_names: names of columns
+    :param identifier_quote: format of quoted column name
+    :param table_name: table (as used in statements)
+    :param db_connection: connection to db
+    :return: number of nulls by column name
+    """
+    ret = {}
+    cursor = db_connection.cursor()
+    for start in range(0, len(column_names), MAX_SELECT_COLUMNS):
+        names = column_names[start:start + MAX_SELECT_COLUMNS]
+        counts = ", ".join([f"count(*) - count({identifier_quote.format(name)})" for name in names])
+        cursor.execute(f"""SELECT {counts} FROM {table_name};""")
+        result = cursor.fetchone()
+        for i, name in enumerate(names):
+            ret[name] = int(result[i] or 0)
+    return ret
+
+
+def get_domain_counts(column_sql: str, table_name: str, db_connection: Any) -> Sequence[Tuple[Any, int]]:
+    """
+    Counts of all values of a column with small domain (booleans, enums), read by a single grouping
+    :param column_sql: quoted column name
+    :param table_name: table (as used in statements)
+    :param db_connection: connection to db
+    :return: values (null included) with their counts, the most common first
+    """
+    cursor = db_connection.cursor()
+    cursor.execute(f"""SELECT {column_sql}, count(*) FROM {table_name}
+                       GROUP BY {column_sql} ORDER BY count(*) DESC;""")
+    return cursor.fetchall()
+
+
+def setting_literal(value: Any) -> str:
+    """
+    :param value: value of session setting
+    :return: value as sql literal (numbers are not quoted)
+    """
+    if isinstance(value, (int, float)) or re.fullmatch(r"\d+", str(value)):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def float_literal(value: float) -> str:
+    """
+    :param value: number
+    :return: sql literal of float in exponent notation (understood by all dbs)
+    """
+    return f"{float(value):.17e}"
+
+
+def bound_literal(value: Any) -> str:
+    """
+    :param value: number, date, datetime or string (datetimes of incremental states are stored as strings)
+    :return: sql literal of the value (standard date and timestamp literals are understood by all dbs)
+    """
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    if isinstance(value, datetime):
+        return f"TIMESTAMP '{value.isoformat(sep=' ')}'"
+    if isinstance(value, date):
+        return f"DATE '{value.isoformat()}'"
+    if isinstance(value, float):
+        return float_literal(value)
+    return str(value)
+
+
+def get_histograms(buckets_sql: Mapping[str, str], table_name: str, db_connection: Any,
+                   buckets: int = HISTOGRAM_BUCKETS) -> Mapping[str, Sequence[int]]:
+    """
+    Equal-width histograms of columns counted in a single pass over the table (wide tables take a pass
+    per MAX_SELECT_COLUMNS counts)
+    :param buckets_sql: sql expressions of bucket numbers by column name, values from 0 to buckets
+    (max of the column is the only value in bucket number buckets, it is counted in the last bucket)
+    :param table_name: table (as used in statements)
+    :param db_connection: connection to db
+    :param buckets: number of buckets
+    :return: counts of values in buckets by column name
+    """
+    if not len(buckets_sql):
+        return {}
+    columns_names = list(buckets_sql.keys())
+    group_size = max(MAX_SELECT_COLUMNS // (buckets + 1), 1)
+    cursor = db_connection.cursor()
+    ret = {}
+    for start in range(0, len(columns_names), group_size):
+        names = columns_names[start:start + group_size]
+        bucket_columns = ", ".join([f"{buckets_sql[name]} AS b{i}" for i, name in enumerate(names)])
+        counts = ", ".join([f"count(case when b{i} = {bucket} then 1 end)"
+                            for i in range(len(names)) for bucket in range(buckets + 1)])
+        cursor.execute(f"""SELECT {counts} FROM (SELECT {bucket_columns} FROM {table_name}) AS buckets;""")
+        result = cursor.fetchone()
+
+        for i, name in enumerate(names):
+            histogram = [int(count or 0) for count in result[i * (buckets + 1):(i + 1) * (buckets + 1)]]
+            max_count = histogram.pop()
+            histogram[-1] += max_count
+            ret[name] = histogram
+    return ret
+
+
+def get_rows_sql(columns_names: Sequence[str], table_name: str, bounds: Sequence[Tuple[str, str, Any]],
+                 quote: str, placeholder: str, distinct: bool = False) -> Tuple[str, Sequence[Any]]:
+    """
+    Statement reading rows of table
+    :param columns_names: columns to be read
+    :param table_name: table (as used in statements)
+    :param bounds: conditions (column, operator, value) joined with AND, values are bound as parameters
+    (operators IS NULL and IS NOT NULL take no value)
+    :param quote: format of quoted column name, e.g. '"{}"'
+    :param placeholder: parameter placeholder of db driver
+    :param distinct: if only distinct rows should be read
+    :return: statement and its parameters
+    """
+    sql = ("SELECT DISTINCT " if distinct else "SELECT ") + ", ".join([quote.format(name) for name in columns_names]) \
+        + f" FROM {table_name}"
+    conditions = []
+    params = []
+    for column, operator, value in bounds:
+        if operator.upper() in ("IS NULL", "IS NOT NULL"):
+            conditions.append(f"{quote.format(column)} {operator}")
+        else:
+            conditions.append(f"{quote.format(column)} {operator} {placeholder}")
+            params.append(value)
+    if len(conditions):
+        sql += " WHERE " + " AND ".join(conditions)
+    return sql, params
+
+
+def fetch_in_batches(cursor: Any, batch_size: int = ROWS_BATCH_SIZE) -> Iterator[Sequence[Any]]:
+    """
+    :param cursor: cursor with executed statement, it is closed when the iterator is exhausted or closed
+    (server-side cursors are not closed by their garbage collection)
+    :param batch_size: number of rows fetched at once
+    :return: iterator of rows of result
+    """
+    try:
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not len(rows):
+                break
+            yield from rows
+    finally:
+        cursor.close()
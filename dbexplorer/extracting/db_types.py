@@ -82,6 +82,10 @@ class Table:
         self._name = name
         self._rows_count = rows_count
         self._columns = columns
+        # discovered references of columns to other tables
+        self.relationships = []
+        # bloom filters of all values by column name (searched in report)
+        self.value_filters = {}
 
     @property
     def name(self) -> str:
@@ -102,7 +106,65 @@ class Table:
         return {
             "name": self.name,
             "records": self.rows_count,
-            "columns": [column.to_dict() for column in self.columns]
+            "columns": [column.to_dict() for column in self.columns],
+            "relationships": [relationship.to_dict() for relationship in self.relationships],
+            "value_filters": {name: bloom.to_dict() for name, bloom in self.value_filters.items()}
+        }
+
+
+class Relationship:
+    """
+    Discovered inclusion dependency - values of column are included in values of referenced unique column
+    """
+
+    def __init__(self, table: str, column: str, referenced_table: str, referenced_column: str, containment: float,
+                 verified: bool = None):
+        """
+        :param table: name of table
+        :param column: name of column
+        :param referenced_table: name of referenced table
+        :param referenced_column: name of referenced column
+        :param containment: estimated fraction (0 - 1) of distinct values of column present in referenced column
+        :param verified: if inclusion was checked by query (None if it was not checked)
+        """
+        self._table = table
+        self._column = column
+        self._referenced_table = referenced_table
+        self._referenced_column = referenced_column
+        self._containment = containment
+        self._verified = verified
+
+    @property
+    def table(self) -> str:
+        return self._table
+
+    @property
+    def column(self) -> str:
+        return self._column
+
+    @property
+    def referenced_table(self) -> str:
+        return self._referenced_table
+
+    @property
+    def referenced_column(self) -> str:
+        return self._referenced_column
+
+    @property
+    def containment(self) -> float:
+        return self._containment
+
+    @property
+    def verified(self) -> bool:
+        return self._verified
+
+    def to_dict(self) -> Mapping:
+        return {
+            "column": self.column,
+            "referenced_table": self.referenced_table,
+            "referenced_column": self.referenced_column,
+            "containment": self.containment,
+            "verified": self.verified
         }
 
 
@@ -247,15 +309,25 @@ class ExtendedTextColumn(ExtendedColumn, TextColumn):
 class ExtendedNumericColumn(ExtendedColumn, NumericColumn):
 
     def __init__(self, name: str, sql_type: str, maximum: float, minimum: float, mean: float, is_nullable: bool,
-                 nulls_percent: float, unique_count: int, quartiles: Sequence[float]):
+                 nulls_percent: float, unique_count: int, quartiles: Sequence[float], histogram: Sequence[int] = None):
         ExtendedColumn.__init__(self, is_nullable, nulls_percent, unique_count)
         NumericColumn.__init__(self, name, sql_type, maximum, minimum, mean)
         self._quartiles = quartiles
+        # counts of values in equal-width buckets between min and max
+        self._histogram = histogram
 
     @property
     def quartiles(self) -> Sequence[float]:
         return self._quartiles
 
+    @property
+    def histogram(self) -> Sequence[int]:
+        return self._histogram
+
+    @histogram.setter
+    def histogram(self, histogram: Sequence[int]) -> None:
+        self._histogram = histogram
+
     def to_dict(self) -> Mapping:
         ret = NumericColumn.to_dict(self)
         ret["data"] += ExtendedColumn.to_dict(self)
@@ -263,17 +335,29 @@ class ExtendedNumericColumn(ExtendedColumn, NumericColumn):
         for i, quartile in enumerate(QUARTILES):
             quartiles[f"Quantile {quartile:.2f}"] = self.quartiles[i] if len(self.quartiles) else None
         ret["data"] += to_key_value(quartiles)
+        ret["data"] += to_key_value({"Histogram": self.histogram or []})
         return ret
 
 
 class ExtendedDatetimeColumn(ExtendedColumn, DatetimeColumn):
 
     def __init__(self, name: str, sql_type: str, maximum: float, minimum: float, is_nullable: bool,
-                 nulls_percent: float, unique_count: int):
+                 nulls_percent: float, unique_count: int, histogram: Sequence[int] = None):
         ExtendedColumn.__init__(self, is_nullable, nulls_percent, unique_count)
         DatetimeColumn.__init__(self, name, sql_type, maximum, minimum)
+        # counts of values in equal-width buckets between min and max
+        self._histogram = histogram
+
+    @property
+    def histogram(self) -> Sequence[int]:
+        return self._histogram
+
+    @histogram.setter
+    def histogram(self, histogram: Sequence[int]) -> None:
+        self._histogram = histogram
 
     def to_dict(self) -> Mapping:
         ret = DatetimeColumn.to_dict(self)
         ret["data"] += ExtendedColumn.to_dict(self)
+        ret["data"] += to_key_value({"Histogram": self.histogram or []})
         return ret
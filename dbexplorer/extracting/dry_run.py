@@ -0,0 +1,143 @@
+"""
+dry run of extraction - statements reading table data are only explained, not executed
+"""
+
+import re
+from collections import OrderedDict
+from typing import Any, Callable, Sequence, Mapping, Tuple
+
+# relations of db catalogs, statements reading only from these are executed also in dry run
+CATALOG_RELATIONS = re.compile(r'^"?(information_schema\.|pg_|svv_|stv_|svl_|dbc\.)', re.IGNORECASE)
+
+
+def _strip_literals(sql: str) -> str:
+    return re.sub(r"'[^']*'|\"[^\"]*\"|`[^`]*`", "x", sql)
+
+
+def is_catalog_statement(sql: str) -> bool:
+    """
+    :param sql: statement
+    :return: if statement reads only db catalogs (and not table data)
+    """
+    relations = re.findall(r"\b(?:from|join)\s+([^\s(,;]+)", re.sub(r"'[^']*'", "''", sql), re.IGNORECASE)
+    return len(relations) > 0 and all(CATALOG_RELATIONS.match(r) for r in relations)
+
+
+def select_arity(sql: str) -> int:
+    """
+    :param sql: select statement
+    :return: number of columns in result of the statement
+    """
+    tokens = list(re.finditer(r"\(|\)|,|\bselect\b|\bfrom\b", _strip_literals(sql), re.IGNORECASE))
+    depth = 0
+    selects = []
+    for i, token in enumerate(tokens):
+        value = token.group(0).lower()
+        if value == "(":
+            depth += 1
+        elif value == ")":
+            depth -= 1
+        elif value == "select":
+            selects.append((depth, i))
+    if not len(selects):
+        return 1
+
+    select_depth, start = min(selects, key=lambda x: x[0])
+    depth = select_depth
+    arity = 1
+    for token in tokens[start + 1:]:
+        value = token.group(0).lower()
+        if value == "(":
+            depth += 1
+        elif value == ")":
+            depth -= 1
+        elif depth == select_depth and value == ",":
+            arity += 1
+        elif depth == select_depth and value == "from":
+            break
+    return arity
+
+
+class DryRunCursor:
+    """
+    Cursor executing catalog statements and only explaining the others.
+    Explained statements return a single row of zeros (fetchone) or no rows (fetchall).
+    """
+
+    def __init__(self, connection: 'DryRunConnection', cursor: Any):
+        self.connection = connection
+        self.cursor = cursor
+        self._result = None
+
+    def execute(self, sql: str, *args) -> 'DryRunCursor':
+        if is_catalog_statement(sql):
+            self._result = None
+            self.cursor.execute(sql, *args)
+        else:
+            self.connection.record(sql, self.connection.explain(self.cursor, sql))
+            self._result = tuple([0] * select_arity(sql))
+        return self
+
+    def fetchone(self) -> Sequence[Any]:
+        return self.cursor.fetchone() if self._result is None else self._result
+
+    def fetchall(self) -> Sequence[Sequence[Any]]:
+        return self.cursor.fetchall() if self._result is None else []
+
+    def __iter__(self):
+        return iter(self.cursor) if self._result is None else iter([])
+
+    def close(self) -> None:
+        self.cursor.close()
+
+
+class DryRunConnection:
+    """
+    Connection wrapper collecting estimated costs of statements (in units of the db: planner cost units
+    for Postgres, Redshift and MySQL, seconds for Teradata) per table
+    """
+
+    def __init__(self, db_connection: Any, explain: Callable[[Any, str], float]):
+        """
+        :param db_connection: real connection to db
+        :param explain: function returning estimated cost of statement (arguments: cursor, statement)
+        """
+        self.db_connection = db_connection
+        self.explain = explain
+        self.current_table = None
+        self.statements = []
+
+    def cursor(self) -> DryRunCursor:
+        return DryRunCursor(self, self.db_connection.cursor())
+
+    def rollback(self) -> None:
+        self.db_connection.rollback()
+
+    def record(self, sql: str, cost: float) -> None:
+        self.statements.append((self.current_table, " ".join(sql.split()), cost))
+
+    def table_costs(self) -> Mapping[str, Tuple[float, Sequence[Tuple[str, float]]]]:
+        """
+        :return: total cost and statements with costs by table name
+        """
+        ret = OrderedDict()
+        for table, sql, cost in self.statements:
+            total, statements = ret.get(table, (0.0, []))
+            statements.append((sql, cost))
+            ret[table] = (total + (cost or 0.0), statements)
+        return ret
+
+    def total_cost(self) -> float:
+        return sum(cost or 0.0 for _, _, cost in self.statements)
+
+    def report(self) -> str:
+        """
+        :return: text report of estimated costs per table and statement
+        """
+        lines = []
+        for table, (total, statements) in self.table_costs().items():
+            lines.append(f"{table}: {total:.2f} ({len(statements)} statements)")
+            for sql, cost in statements:
+                lines.append(f"    {'unknown' if cost is None else f'{cost:.2f}':>12}  {sql}")
+        lines.append(f"Total: {self.total_cost():.2f} ({len(self.statements)} statements)")
+        return "\n".join(lines)
@@ -0,0 +1,97 @@
+"""
+filtering of extracted tables and columns
+"""
+
+import re
+from typing import Sequence
+
+
+def _quote(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _like_to_regex(pattern: str):
+    regex = "".join(".*" if ch == "%" else "." if ch == "_" else re.escape(ch) for ch in pattern)
+    return re.compile(regex, re.IGNORECASE | re.DOTALL)
+
+
+class ExtractionFilter:
+    """
+    Include/exclude patterns (SQL LIKE syntax, e.g. "tmp_%") of tables, columns and sql types,
+    and max rows count of extracted tables.
+    Filters are rendered into conditions of catalog queries, so excluded objects are never queried.
+    """
+
+    def __init__(self, include_tables: Sequence[str] = None, exclude_tables: Sequence[str] = None,
+                 include_columns: Sequence[str] = None, exclude_columns: Sequence[str] = None,
+                 include_types: Sequence[str] = None, exclude_types: Sequence[str] = None, max_rows: int = None):
+        """
+        :param include_tables: only tables matching any of the patterns are extracted
+        :param exclude_tables: tables matching any of the patterns are skipped
+        :param include_columns: only columns matching any of the patterns are extracted
+        :param exclude_columns: columns matching any of the patterns are skipped
+        :param include_types: only columns of sql type matching any of the patterns are extracted (case insensitive)
+        :param exclude_types: columns of sql type matching any of the patterns are skipped (case insensitive)
+        :param max_rows: tables with more rows (according to db estimates) are skipped
+        """
+        self.include_tables = include_tables or []
+        self.exclude_tables = exclude_tables or []
+        self.include_columns = include_columns or []
+        self.exclude_columns = exclude_columns or []
+        self.include_types = include_types or []
+        self.exclude_types = exclude_types or []
+        self.max_rows = max_rows
+
+    @staticmethod
+    def _patterns_condition(sql: str, include: Sequence[str], exclude: Sequence[str]) -> str:
+        condition = ""
+        if len(include):
+            condition += " AND (" + " OR ".join([f"{sql} LIKE {_quote(p)}" for p in include]) + ")"
+        for pattern in exclude:
+            condition += f" AND {sql} NOT LIKE {_quote(pattern)}"
+        return condition
+
+    def tables_condition(self, name_sql: str) -> str:
+        """
+        :param name_sql: sql expression of table name
+        :return: condition to be appended to where clause (empty or starting with AND)
+        """
+        return self._patterns_condition(name_sql, self.include_tables, self.exclude_tables)
+
+    def columns_condition(self, name_sql: str) -> str:
+        """
+        :param name_sql: sql expression of column name
+        :return: condition to be appended to where clause (empty or starting with AND)
+        """
+        return self._patterns_condition(name_sql, self.include_columns, self.exclude_columns)
+
+    def types_condition(self, type_sql: str) -> str:
+        """
+        :param type_sql: sql expression of column sql type name
+        :return: condition to be appended to where clause (empty or starting with AND)
+        """
+        return self._patterns_condition(f"LOWER({type_sql})", [p.lower() for p in self.include_types],
+                                        [p.lower() for p in self.exclude_types])
+
+    def rows_condition(self, rows_sql: str) -> str:
+        """
+        Tables without rows estimate are kept
+        :param rows_sql: sql expression of estimated rows count of table
+        :return: condition to be appended to where clause (empty or starting with AND)
+        """
+        if self.max_rows is None:
+            return ""
+        return f" AND ({rows_sql} IS NULL OR {rows_sql} <= {int(self.max_rows)})"
+
+    def has_types_filter(self) -> bool:
+        return len(self.include_types) > 0 or len(self.exclude_types) > 0
+
+    def matches_type(self, sql_type: str) -> bool:
+        """
+        Checking type in python, for dbs that keep types as codes in catalog
+        :param sql_type: sql type name
+        :return: if columns of this type should be extracted
+        """
+        if len(self.include_types) and not any(_like_to_regex(p).fullmatch(sql_type) for p in self.include_types):
+            return False
+        return not any(_like_to_regex(p).fullmatch(sql_type) for p in self.exclude_types)
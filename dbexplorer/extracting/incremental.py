@@ -0,0 +1,411 @@
+"""
+incremental profiling of append-only tables - mergeable state of column statistics is stored per table
+together with a watermark (max value of a column like id or created_at), later runs read only rows past
+the watermark and merge them into the stored state. Counts, nulls, min, max and sums are read by aggregating
+statements, rows are streamed only for sketches.
+"""
+
+import logging
+import os
+import re
+from datetime import date, datetime
+from typing import Any, Callable, Mapping, Sequence, Tuple
+
+import simplejson as json
+
+from dbexplorer.extracting.db_types import *
+from dbexplorer.extracting.common import HISTOGRAM_BUCKETS, display_text
+from dbexplorer.extracting.sharding import ShardedProfiler
+from dbexplorer.extracting.sketches import HyperLogLog, TopK, QuantileSketch
+
+# most frequent values are kept in state for this many times top number values
+TOP_CAPACITY_FACTOR = 20
+EPOCH = datetime(1970, 1, 1)
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _min(a: Any, b: Any, key: Callable[[Any], Any] = _identity) -> Any:
+    return a if b is None or (a is not None and key(a) <= key(b)) else b
+
+
+def _max(a: Any, b: Any, key: Callable[[Any], Any] = _identity) -> Any:
+    return a if b is None or (a is not None and key(a) >= key(b)) else b
+
+
+def _epoch(value: Any) -> float:
+    """
+    :param value: datetime, date or their string
+    :return: seconds since epoch (None for other values, e.g. times of day)
+    """
+    if isinstance(value, str):
+        # as given by str of datetime or date (offset of time zone is optional)
+        match = re.match(r"(\d{4}-\d\d-\d\d)(?:[ T](\d\d:\d\d:\d\d)(\.\d+)?)?(?:([+-]\d\d):?(\d\d))?$", value)
+        if match is None:
+            return None
+        day, time_of_day, fraction, offset_hours, offset_minutes = match.groups()
+        try:
+            value = datetime.strptime(f"{day} {time_of_day or '00:00:00'}", "%Y-%m-%d %H:%M:%S")
+        except ValueError:
+            return None
+        seconds = (value - EPOCH).total_seconds() + float(fraction or 0)
+        if offset_hours is not None:
+            sign = -1 if offset_hours.startswith("-") else 1
+            seconds -= int(offset_hours) * 3600 + sign * int(offset_minutes) * 60
+        return seconds
+    if isinstance(value, datetime):
+        return value.timestamp() if value.tzinfo is not None else (value - EPOCH).total_seconds()
+    if isinstance(value, date):
+        return (value - EPOCH.date()).total_seconds()
+    return None
+
+
+def _datetime_key(value: Any) -> Tuple[int, Any]:
+    """
+    :param value: datetime, date or their string (as stored in state)
+    :return: key comparing values by time (other values, e.g. times of day, by their strings)
+    """
+    epoch = _epoch(value)
+    return (0, epoch) if epoch is not None else (1, str(value))
+
+
+class ColumnState:
+    """
+    Mergeable statistics of a column: count of nulls, sum, min, max, max text length and sketches
+    of distinct values, most frequent values (text columns) and quantiles (numeric columns, seconds since epoch
+    of datetime columns). Datetime min and max are stored as strings, they are compared by time.
+    """
+
+    def __init__(self, simple_type: int, top_capacity: int, nulls: int = 0, total: float = 0.0,
+                 minimum: Any = None, maximum: Any = None, max_len: int = None, distinct: HyperLogLog = None,
+                 top: TopK = None, quantiles: QuantileSketch = None):
+        """
+        :param simple_type: ColumnType of column
+        :param top_capacity: number of most frequent values kept (text columns)
+        """
+        self.simple_type = simple_type
+        self.nulls = nulls
+        self.total = total
+        self.minimum = minimum
+        self.maximum = maximum
+        self.max_len = max_len
+        self.distinct = distinct if distinct is not None else HyperLogLog()
+        self.top = top
+        if self.top is None and simple_type == ColumnType.TEXT:
+            self.top = TopK(top_capacity)
+        self.quantiles = quantiles
+        # states of datetime columns with values, stored by previous versions, have no quantiles (their histograms
+        # would miss the stored values)
+        if self.quantiles is None and (simple_type == ColumnType.NUMERIC
+                                       or simple_type == ColumnType.DATETIME and minimum is None):
+            self.quantiles = QuantileSketch()
+
+    def aggregate(self, nulls: int, total: float, minimum: Any, maximum: Any) -> None:
+        """
+        Adding aggregates of rows read by statement
+        :param nulls: number of nulls
+        :param total: sum of values (numeric columns)
+        :param minimum: min value (numeric and datetime columns)
+        :param maximum: max value (numeric and datetime columns)
+        """
+        key = _datetime_key if self.simple_type == ColumnType.DATETIME else _identity
+        if self.simple_type == ColumnType.NUMERIC:
+            minimum = None if minimum is None else float(minimum)
+            maximum = None if maximum is None else float(maximum)
+        self.nulls += nulls
+        self.total += total
+        self.minimum = _min(self.minimum, minimum, key)
+        self.maximum = _max(self.maximum, maximum, key)
+
+    def update_sketches(self, value: Any) -> None:
+        if self.simple_type == ColumnType.TEXT:
+            # null is one of the most frequent values as well
+            self.top.add(value)
+        if value is None:
+            return
+
+        if self.simple_type == ColumnType.NUMERIC:
+            value = float(value)
+            self.quantiles.add(value)
+        elif self.simple_type == ColumnType.DATETIME:
+            epoch = _epoch(value)
+            if epoch is not None and self.quantiles is not None:
+                self.quantiles.add(epoch)
+            # distinct values are counted by the same hashes as in stored states
+            value = str(value)
+        elif self.simple_type == ColumnType.TEXT and not isinstance(value, bool):
+            self.max_len = max(self.max_len or 0, len(str(value)))
+        self.distinct.add(value)
+
+    def merge(self, other: 'ColumnState') -> 'ColumnState':
+        key = _datetime_key if self.simple_type == ColumnType.DATETIME else _identity
+        return ColumnState(self.simple_type, 0,
+                           nulls=self.nulls + other.nulls,
+                           total=self.total + other.total,
+                           minimum=_min(self.minimum, other.minimum, key),
+                           maximum=_max(self.maximum, other.maximum, key),
+                           max_len=_max(self.max_len, other.max_len),
+                           distinct=self.distinct.merge(other.distinct),
+                           top=None if self.top is None else self.top.merge(other.top),
+                           quantiles=None if self.quantiles is None or other.quantiles is None
+                           else self.quantiles.merge(other.quantiles))
+
+    def to_column(self, name: str, sql_type: str, rows_count: int, extended: bool, top_number: int,
+                  max_text_len: int, is_nullable: Any) -> Column:
+        """
+        :param name: column name
+        :param sql_type: sql type of column
+        :param rows_count: number of rows in table
+        :param extended: if the info should be in the extended form
+        :param top_number: number of most common values
+        :param max_text_len: max length of text in column
+        :param is_nullable: nullability as read from db catalog
+        :return: column info
+        """
+        nulls_percent = 0 if rows_count == 0 else 100 * self.nulls / rows_count
+        # null is counted as a distinct value as well
+        distinct_count = self.distinct.count() + (1 if self.nulls > 0 else 0)
+        count = rows_count - self.nulls
+
+        if self.simple_type == ColumnType.NUMERIC:
+            mean = None if count == 0 else self.total / count
+            if not extended:
+                return NumericColumn(name, sql_type, self.maximum, self.minimum, mean)
+            histogram = None
+            if self.minimum is not None and self.minimum != self.maximum:
+                histogram = self.quantiles.histogram(self.minimum, self.maximum, HISTOGRAM_BUCKETS)
+            return ExtendedNumericColumn(name, sql_type, self.maximum, self.minimum, mean, is_nullable, nulls_percent,
+                                         distinct_count, self.quantiles.quantiles(QUARTILES), histogram)
+        elif self.simple_type == ColumnType.DATETIME:
+            if not extended:
+                return DatetimeColumn(name, sql_type, str(self.maximum), str(self.minimum))
+            histogram = None
+            minimum, maximum = _epoch(self.minimum), _epoch(self.maximum)
+            if self.quantiles is not None and self.quantiles.count() and minimum is not None \
+                    and maximum is not None and minimum != maximum:
+                histogram = self.quantiles.histogram(minimum, maximum, HISTOGRAM_BUCKETS)
+            return ExtendedDatetimeColumn(name, sql_type, str(self.maximum), str(self.minimum), is_nullable,
+                                          nulls_percent, distinct_count, histogram)
+        elif self.simple_type == ColumnType.TEXT:
+            # wide texts are profiled as well, only their prefixes are displayed
+            top_counts = self.top.top(top_number)
+            top = [t[0] if not isinstance(t[0], str) else display_text(t[0][:max_text_len], len(t[0]), max_text_len)
+                   for t in top_counts]
+            top_values = [t[1] for t in top_counts]
+            if not extended:
+                return TextColumn(name, sql_type, top, top_values)
+            return ExtendedTextColumn(name, sql_type, top, top_values, is_nullable, nulls_percent, distinct_count)
+        elif self.simple_type == ColumnType.NONE:
+            if not extended:
+                return Column(name, sql_type)
+            return ExtendedNoneTypeColumn(name, sql_type, is_nullable, nulls_percent, distinct_count)
+        raise ValueError("Unknown ColumnType")
+
+    def to_dict(self) -> Mapping[str, Any]:
+        return {
+            "simple_type": self.simple_type,
+            "nulls": self.nulls,
+            "total": self.total,
+            "minimum": self.minimum,
+            "maximum": self.maximum,
+            "max_len": self.max_len,
+            "distinct": self.distinct.to_dict(),
+            "top": None if self.top is None else self.top.to_dict(),
+            "quantiles": None if self.quantiles is None else self.quantiles.to_dict()
+        }
+
+    @staticmethod
+    def from_dict(data: Mapping[str, Any]) -> 'ColumnState':
+        return ColumnState(data["simple_type"], 0,
+                           nulls=data["nulls"],
+                           total=data["total"],
+                           minimum=data["minimum"],
+                           maximum=data["maximum"],
+                           max_len=data["max_len"],
+                           distinct=HyperLogLog.from_dict(data["distinct"]),
+                           top=None if data["top"] is None else TopK.from_dict(data["top"]),
+                           quantiles=None if data["quantiles"] is None else QuantileSketch.from_dict(data["quantiles"]))
+
+
+class TableState:
+    """
+    States of all columns of a table with rows count and watermark (max value of watermark column)
+    """
+
+    def __init__(self, watermark_column: str, sql_types: Mapping[str, str], columns: Mapping[str, ColumnState],
+                 watermark: Any = None, rows_count: int = 0, sketches: bool = True):
+        """
+        :param watermark_column: column of values growing with appended rows
+        :param sql_types: sql types by column name, state is rebuilt when they change
+        :param columns: column states by column name
+        :param watermark: max value of watermark column in processed rows
+        :param rows_count: number of processed rows
+        :param sketches: if sketches of all columns are kept (extended mode), otherwise only most frequent values
+        of text columns
+        """
+        self.watermark_column = watermark_column
+        self.sql_types = sql_types
+        self.columns = columns
+        self.watermark = watermark
+        self.rows_count = rows_count
+        self.sketches = sketches
+
+    def update_sketches(self, columns_names: Sequence[str], row: Sequence[Any]) -> None:
+        for name, value in zip(columns_names, row):
+            self.columns[name].update_sketches(value)
+
+    @staticmethod
+    def create(extractor: 'TableExtractor', sql_types: Mapping[str, str], watermark_column: str = None,
+               sketches: bool = True) -> 'TableState':
+        """
+        :param extractor: extractor of the table
+        :param sql_types: sql types by column name
+        :param watermark_column: column of values growing with appended rows
+        :param sketches: if sketches of all columns are kept
+        :return: state of no rows
+        """
+        top_capacity = TOP_CAPACITY_FACTOR * extractor.top_number
+        return TableState(watermark_column, sql_types,
+                          {name: ColumnState(extractor._map_sql_types(sql_type), top_capacity)
+                           for name, sql_type in sql_types.items()}, sketches=sketches)
+
+    def read(self, extractor: 'TableExtractor', bounds: Sequence[Tuple[str, str, Any]] = ()) -> 'TableState':
+        """
+        Updating state with rows of the table - counts, nulls, min, max and sums are read by one aggregating
+        statement (per MAX_SELECT_COLUMNS aggregates), rows are streamed only for sketches. Streamed rows are
+        bounded by the max watermark of the aggregated rows, so rows appended meanwhile are left to the next run.
+        :param extractor: extractor of the table
+        :param bounds: conditions of read rows (see TableExtractor.iter_rows)
+        :return: self
+        """
+        columns = [{"name": name, "sql_type": sql_type} for name, sql_type in self.sql_types.items()]
+        aggregates = ShardedProfiler.aggregate_shard(extractor, (extractor.table_name, bounds), columns)
+        self.rows_count += aggregates.rows_count
+        for name, state in self.columns.items():
+            column = aggregates.columns[name]
+            state.aggregate(aggregates.rows_count - column["count"], column["sum"], column["min"], column["max"])
+        if aggregates.rows_count == 0:
+            return self
+
+        watermark = aggregates.columns[self.watermark_column]["max"]
+        if watermark is None:
+            # watermark column is not numeric nor datetime, max is not aggregated
+            cursor = extractor.db_connection.cursor()
+            name = extractor.IDENTIFIER_QUOTE.format(self.watermark_column)
+            cursor.execute(f"""SELECT max({name}) FROM {extractor._get_relation()}""")
+            watermark = cursor.fetchone()[0]
+        if watermark is not None:
+            bounds = list(bounds) + [(self.watermark_column, "<=", watermark)]
+            self.watermark = _max(watermark, self.watermark)
+
+        streamed = [c["name"] for c in columns
+                    if self.sketches or self.columns[c["name"]].simple_type == ColumnType.TEXT]
+        if len(streamed):
+            for row in extractor.iter_rows(streamed, bounds):
+                self.update_sketches(streamed, row)
+        return self
+
+    def to_table(self, extractor: 'TableExtractor') -> Table:
+        """
+        :param extractor: extractor of the table
+        :return: table info
+        """
+        columns = [{"name": name, "sql_type": sql_type} for name, sql_type in self.sql_types.items()]
+        nullable = extractor._get_nullable(columns) if extractor.extended else {}
+        return Table(extractor.table_name, self.rows_count,
+                     [self.columns[c["name"]].to_column(c["name"], c["sql_type"], self.rows_count, extractor.extended,
+                                                        extractor.top_number, extractor.max_text_len,
+                                                        nullable.get(c["name"]))
+                      for c in columns])
+
+    def merge(self, delta: 'TableState') -> 'TableState':
+        """
+        :param delta: state of other rows (rows past watermark of this state in incremental profiling)
+        :return: state of all rows
+        """
+        return TableState(self.watermark_column, self.sql_types,
+                          {name: state.merge(delta.columns[name]) for name, state in self.columns.items()},
+                          delta.watermark if delta.watermark is not None else self.watermark,
+                          self.rows_count + delta.rows_count, self.sketches and delta.sketches)
+
+    def to_dict(self) -> Mapping[str, Any]:
+        return {
+            "watermark_column": self.watermark_column,
+            "watermark": self.watermark,
+            "rows_count": self.rows_count,
+            "sketches": self.sketches,
+            "sql_types": self.sql_types,
+            "columns": {name: state.to_dict() for name, state in self.columns.items()}
+        }
+
+    @staticmethod
+    def from_dict(data: Mapping[str, Any]) -> 'TableState':
+        return TableState(data["watermark_column"], data["sql_types"],
+                          {name: ColumnState.from_dict(state) for name, state in data["columns"].items()},
+                          data["watermark"], data["rows_count"], data.get("sketches", True))
+
+
+class IncrementalProfiler:
+    """
+    Profiling tables with a watermark column incrementally, states are stored as JSON files (one per table)
+    in state directory. Tables must be append-only - updated or deleted rows are not reflected in the state,
+    rows appended later with watermark value not greater than the stored one are missed.
+    """
+
+    def __init__(self, state_dir: str, watermark_columns: Sequence[str]):
+        """
+        :param state_dir: directory of stored states
+        :param watermark_columns: candidate watermark columns, the first one present in table is used
+        """
+        self.state_dir = state_dir
+        self.watermark_columns = watermark_columns
+
+    def _state_path(self, extractor: 'TableExtractor') -> str:
+        name = f"{extractor.db_name}.{extractor.schema}.{extractor.table_name}"
+        return os.path.join(self.state_dir, re.sub(r"[^\w.-]", "_", name) + ".json")
+
+    def _load_state(self, path: str) -> TableState:
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as fh:
+            return TableState.from_dict(json.load(fh))
+
+    def _save_state(self, path: str, state: TableState) -> None:
+        os.makedirs(self.state_dir, exist_ok=True)
+        # state is replaced at once, so interrupted run leaves the previous state
+        with open(path + ".tmp", 'w', encoding='utf-8') as fh:
+            json.dump(state.to_dict(), fh, use_decimal=True, default=str)
+        os.replace(path + ".tmp", path)
+
+    def get_table(self, extractor: 'TableExtractor') -> Table:
+        """
+        :param extractor: extractor of the table
+        :return: table info from merged state, None if table has no watermark column
+        """
+        columns_names, columns_sql_types = extractor._extract_column_names_and_types()
+        watermark_column = next((c for c in self.watermark_columns if c in columns_names), None)
+        if watermark_column is None:
+            return None
+
+        path = self._state_path(extractor)
+        sql_types = dict(zip(columns_names, columns_sql_types))
+        state = self._load_state(path)
+        if state is not None and (state.sql_types != sql_types or state.watermark_column != watermark_column):
+            logging.warning(f'Columns of table {extractor.table_name} changed, its incremental state is rebuilt')
+            state = None
+        elif state is not None and state.watermark is None:
+            # no watermark yet (table was empty), whole table is read again
+            state = None
+        elif state is not None and extractor.extended and not state.sketches:
+            logging.info(f'Incremental state of table {extractor.table_name} has no sketches of distinct values '
+                         f'and quantiles, it is rebuilt')
+            state = None
+
+        bounds = [] if state is None else [(watermark_column, ">", state.watermark)]
+        sketches = extractor.extended if state is None else state.sketches
+        delta = TableState.create(extractor, sql_types, watermark_column, sketches).read(extractor, bounds)
+        state = delta if state is None else state.merge(delta)
+        self._save_state(path, state)
+        return state.to_table(extractor)
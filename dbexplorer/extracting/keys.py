@@ -0,0 +1,193 @@
+"""
+discovery of foreign keys (inclusion dependencies) - signatures of key-like columns (unique columns that may be
+referenced and columns named like keys that may reference them) are computed after profiling of their table,
+inclusion of every type-compatible pair of columns is estimated from the signatures in memory and only the best
+candidates are verified by queries. Other columns are not read, so the cost grows with the number of keys,
+not with the number of columns.
+"""
+
+import logging
+import re
+from typing import Any, Callable, Sequence
+
+from dbexplorer.extracting.db_types import *
+from dbexplorer.extracting.sketches import hash64, HyperLogLog, BloomFilter, BottomK
+
+# bloom filters of referenced columns take this many bits per value (about 1 % of false positives) ...
+BLOOM_BITS_PER_VALUE = 10
+# ... but at most 1 MB per column
+MAX_BLOOM_BITS = 1 << 23
+# size of bloom filter of referenced column with unknown rows count
+DEFAULT_BLOOM_BITS = 1 << 20
+# names of columns referencing keys, e.g. customer_id, CustomerID, country_code, order_no (lowercase name)
+KEY_NAME_PATTERN = re.compile(r"(id|key|code|_no|_nr|_number)$")
+
+
+def normalize_key(value: Any, simple_type: int) -> str:
+    """
+    Equal keys of different sql types (e.g. integer and decimal, char and varchar) get the same form
+    :param value: value of column
+    :param simple_type: ColumnType of column
+    :return: value as string
+    """
+    if simple_type == ColumnType.NUMERIC:
+        value = float(value)
+        return str(int(value)) if value.is_integer() else repr(value)
+    return str(value).rstrip(" ")
+
+
+class ColumnSignature:
+    """
+    Compact signature of column values: distinct count (HyperLogLog), uniform sample of distinct values (bottom-k
+    hashes) and, for unique columns that may be referenced, set membership (bloom filter)
+    """
+
+    def __init__(self, table: str, column: str, simple_type: int, minimum: float = None, maximum: float = None,
+                 bloom_bits: int = None):
+        """
+        :param table: name of table
+        :param column: name of column
+        :param simple_type: ColumnType of column
+        :param minimum: min value (numeric columns)
+        :param maximum: max value (numeric columns)
+        :param bloom_bits: size of bloom filter, None if column is not unique (it can not be referenced)
+        """
+        self.table = table
+        self.column = column
+        self.simple_type = simple_type
+        self.minimum = minimum
+        self.maximum = maximum
+        self.distinct = HyperLogLog(10)
+        self.sample = BottomK()
+        self.bloom = None if bloom_bits is None else BloomFilter(bloom_bits)
+
+    def add(self, value: Any) -> None:
+        hashed = hash64(normalize_key(value, self.simple_type))
+        self.distinct.add_hash(hashed)
+        self.sample.add_hash(hashed)
+        if self.bloom is not None:
+            self.bloom.add_hash(hashed)
+
+    @staticmethod
+    def containment(hashes: Sequence[int], other: 'ColumnSignature', min_containment: float) -> float:
+        """
+        :param hashes: sample of hashes of column values
+        :param other: signature of referenced column
+        :param min_containment: estimation stops as soon as containment is known to be lower
+        :return: estimated fraction of distinct values present in other column (0 if it is lower than min)
+        """
+        allowed_misses = int((1 - min_containment) * len(hashes))
+        misses = 0
+        for hashed in hashes:
+            if not other.bloom.contains_hash(hashed):
+                misses += 1
+                if misses > allowed_misses:
+                    return 0
+        return 1 - misses / len(hashes)
+
+
+class KeyDiscovery:
+    """
+    Collecting signatures of key-like columns (numeric and text) of profiled tables and discovering
+    which of them reference unique columns (primary keys, unique constraints or columns with all values distinct)
+    """
+
+    def __init__(self, verified_candidates: int = 100, min_containment: float = 0.9):
+        """
+        :param verified_candidates: number of best candidates verified by queries, the others are reported unverified
+        :param min_containment: min estimated fraction of values present in referenced column
+        """
+        self.verified_candidates = verified_candidates
+        self.min_containment = min_containment
+        self.signatures = []
+
+    def add_table(self, extractor: 'TableExtractor', table: Table) -> None:
+        """
+        Computing signatures of key-like columns of profiled table (one distinct scan per column): unique columns
+        (they may be referenced) and columns named like keys (they may reference unique columns)
+        :param extractor: extractor of the table
+        :param table: extracted table
+        """
+        try:
+            key = extractor._get_primary_key()
+        except NotImplementedError:
+            key = []
+        unique_columns = extractor._get_unique_columns()
+
+        for column in table.columns:
+            simple_type = extractor._map_sql_types(column.sql_type)
+            if simple_type not in (ColumnType.NUMERIC, ColumnType.TEXT) or column.sql_type.lower() == "boolean":
+                continue
+            if isinstance(column, ExtendedColumn) and column.unique_number is not None and column.unique_number < 2:
+                continue
+
+            unique = key == [column.name] or column.name in unique_columns \
+                or (isinstance(column, ExtendedColumn) and table.rows_count
+                    and column.unique_number == table.rows_count)
+            if not unique and KEY_NAME_PATTERN.search(column.name.lower()) is None:
+                continue
+            bloom_bits = None
+            if unique:
+                bloom_bits = DEFAULT_BLOOM_BITS if not table.rows_count \
+                    else min(max(BLOOM_BITS_PER_VALUE * table.rows_count, 64), MAX_BLOOM_BITS)
+            signature = ColumnSignature(table.name, column.name, simple_type,
+                                        getattr(column, "min", None) if simple_type == ColumnType.NUMERIC else None,
+                                        getattr(column, "max", None) if simple_type == ColumnType.NUMERIC else None,
+                                        bloom_bits)
+            for row in extractor.iter_rows([column.name], [(column.name, "IS NOT NULL", None)], distinct=True):
+                signature.add(row[0])
+            self.signatures.append(signature)
+
+    @staticmethod
+    def _name_score(child: ColumnSignature, parent: ColumnSignature) -> int:
+        # names like orders.customer_id -> customers.id or customer.customer_id are preferred
+        name = child.column.lower()
+        return int(name == parent.column.lower()) + int(parent.table.lower().rstrip("s") in name)
+
+    def estimate(self) -> Sequence[Relationship]:
+        """
+        :return: candidate relationships estimated from signatures, best first
+        """
+        parents = [s for s in self.signatures if s.bloom is not None]
+        candidates = []
+        for child in self.signatures:
+            hashes = child.sample.hashes
+            if not len(hashes):
+                continue
+            child_count = child.distinct.count()
+            for parent in parents:
+                if parent is child or parent.simple_type != child.simple_type:
+                    continue
+                # distinct counts are approximate
+                if child_count > 1.1 * parent.distinct.count():
+                    continue
+                if child.minimum is not None and parent.minimum is not None \
+                        and (child.minimum < parent.minimum or child.maximum > parent.maximum):
+                    continue
+                containment = ColumnSignature.containment(hashes, parent, self.min_containment)
+                if containment >= self.min_containment:
+                    candidates.append((containment, self._name_score(child, parent), child, parent))
+
+        candidates.sort(key=lambda c: (c[0], c[1]), reverse=True)
+        return [Relationship(child.table, child.column, parent.table, parent.column, containment)
+                for containment, _, child, parent in candidates]
+
+    def discover(self, create_extractor: Callable[[str], 'TableExtractor']) -> Sequence[Relationship]:
+        """
+        :param create_extractor: function creating extractor of table (argument: table name)
+        :return: relationships - verified best candidates and the other (unverified) candidates
+        """
+        ret = []
+        for i, candidate in enumerate(self.estimate()):
+            if i >= self.verified_candidates:
+                ret.append(candidate)
+                continue
+            missing = create_extractor(candidate.table)._count_missing_values(
+                candidate.column, candidate.referenced_table, candidate.referenced_column)
+            if missing:
+                logging.info(f'{candidate.table}.{candidate.column} is not included in '
+                             f'{candidate.referenced_table}.{candidate.referenced_column} ({missing} values missing)')
+                continue
+            ret.append(Relationship(candidate.table, candidate.column, candidate.referenced_table,
+                                    candidate.referenced_column, candidate.containment, True))
+        return ret
@@ -0,0 +1,151 @@
+"""
+memoization of statement results within extraction of a table - the same statement (e.g. max length of a text
+column or rows count of the table) is sent to db only once, the next executions are answered from memory
+"""
+
+from collections import OrderedDict
+from typing import Any, Sequence, Tuple
+
+# max number of rows kept in memory, the least recently used results are evicted first
+DEFAULT_CACHE_ROWS = 100000
+
+
+def normalize_statement(sql: str, params: Sequence[Any] = ()) -> Tuple[str, str]:
+    """
+    :param sql: statement
+    :param params: parameters of statement
+    :return: cache key of statement
+    """
+    return " ".join(sql.split()).rstrip(";").strip(), repr(params)
+
+
+class MemoCursor:
+    """
+    Cursor answering repeated statements from cache of its connection. Results larger than the cache
+    are streamed from db and not cached.
+    """
+
+    def __init__(self, connection: 'MemoConnection', cursor: Any):
+        self.connection = connection
+        self.cursor = cursor
+        self._rows = []
+        self._position = 0
+        # db cursor still holding rows not fetched into _rows (result too large to be cached)
+        self._rest = None
+
+    def execute(self, sql: str, *args) -> 'MemoCursor':
+        key = normalize_statement(sql, args)
+        self._position = 0
+        self._rest = None
+        rows = self.connection.get(key)
+        if rows is not None:
+            self._rows = rows
+            return self
+
+        self.cursor.execute(sql, *args)
+        if self.cursor.description is None:
+            # statement without result
+            self._rows = []
+            return self
+        limit = self.connection.max_rows
+        self._rows = list(self.cursor.fetchmany(limit + 1))
+        if len(self._rows) <= limit:
+            self.connection.put(key, self._rows)
+        else:
+            self._rest = self.cursor
+        return self
+
+    @property
+    def description(self) -> Any:
+        return self.cursor.description
+
+    def fetchmany(self, size: int = 1) -> Sequence[Sequence[Any]]:
+        rows = self._rows[self._position:self._position + size]
+        self._position += len(rows)
+        if len(rows) < size and self._rest is not None:
+            rows = rows + list(self._rest.fetchmany(size - len(rows)))
+        return rows
+
+    def fetchone(self) -> Sequence[Any]:
+        rows = self.fetchmany(1)
+        return rows[0] if len(rows) else None
+
+    def fetchall(self) -> Sequence[Sequence[Any]]:
+        rows = self._rows[self._position:]
+        self._position = len(self._rows)
+        if self._rest is not None:
+            rows = rows + list(self._rest.fetchall())
+        return rows
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def close(self) -> None:
+        self.cursor.close()
+
+
+class MemoConnection:
+    """
+    Connection wrapper memoizing results of statements (keyed by normalized statement and parameters)
+    with bounded number of kept rows. Cursors created with arguments (server side cursors streaming
+    table rows) are not wrapped.
+    """
+
+    def __init__(self, db_connection: Any, max_rows: int = DEFAULT_CACHE_ROWS):
+        """
+        :param db_connection: real connection to db
+        :param max_rows: max number of rows kept in memory
+        """
+        self.db_connection = db_connection
+        self.max_rows = max_rows
+        self._results = OrderedDict()
+        self._rows = 0
+        self.hits = 0
+        self.misses = 0
+
+    def cursor(self, *args, **kwargs) -> Any:
+        if len(args) or len(kwargs):
+            return self.db_connection.cursor(*args, **kwargs)
+        return MemoCursor(self, self.db_connection.cursor())
+
+    def __getattr__(self, name: str) -> Any:
+        # commit, rollback, close and other methods of real connection
+        return getattr(self.db_connection, name)
+
+    def get(self, key: Tuple[str, str]) -> Sequence[Sequence[Any]]:
+        rows = self._results.get(key)
+        if rows is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._results.move_to_end(key)
+        return rows
+
+    def put(self, key: Tuple[str, str], rows: Sequence[Sequence[Any]]) -> None:
+        self._results[key] = rows
+        self._rows += max(len(rows), 1)
+        while self._rows > self.max_rows:
+            _, evicted = self._results.popitem(last=False)
+            self._rows -= max(len(evicted), 1)
+
+    def clear(self, statistics: bool = False) -> None:
+        """
+        Forgetting results, so that data changed in db are not answered from memory
+        :param statistics: if counts of hits and misses should be reset as well
+        """
+        self._results.clear()
+        self._rows = 0
+        if statistics:
+            self.hits = 0
+            self.misses = 0
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return 0.0 if lookups == 0 else self.hits / lookups
+
+    def report(self) -> str:
+        """
+        :return: text report of hits of the cache
+        """
+        return f'Statement cache: {self.hits} of {self.hits + self.misses} statements answered from memory ' \
+               f'({100 * self.hit_rate():.1f} %)'
@@ -0,0 +1,226 @@
+"""
+memory of extraction and rendering of report - peak memory attributed to phases (extraction, rendering)
+and memory retained by profiles of single tables (tracemalloc, optional as it slows allocations down),
+and a memory budget (RSS of the process)
+
+When usage approaches the budget, extraction switches to paths keeping less in memory instead of being killed:
+statement cache keeps only small results (larger ones are streamed from db) and extracted tables are spilled
+to a temporary file, from which the report is written table by table (see DbVisualizer.generate_report).
+"""
+
+import logging
+import os
+import pickle
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Iterable, Iterator, Mapping, Sequence, Union
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows
+    resource = None
+
+# fraction of budget at which extraction switches to low memory paths
+BUDGET_THRESHOLD = 0.8
+# max number of rows of results kept by statement cache in low memory mode
+LOW_MEMORY_CACHE_ROWS = 1000
+# number of tables with the largest profiles shown in report
+TOP_TABLES = 10
+
+
+def current_rss() -> int:
+    """
+    :return: resident set size of this process in bytes (peak RSS where the current one is not available,
+    None if neither is available)
+    """
+    try:
+        with open('/proc/self/statm', 'r') as fh:
+            return int(fh.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def format_bytes(size: int) -> str:
+    """
+    :param size: size in bytes
+    :return: size in kB or MB (or "?" if unknown)
+    """
+    if size is None:
+        return "?"
+    if abs(size) < 1024 * 1024:
+        return f"{size / 1024:,.1f} kB"
+    return f"{size / 1024 / 1024:,.1f} MB"
+
+
+class SpilledTables:
+    """
+    Extracted tables (as given by Table.to_dict) kept in a temporary file instead of memory, iterated
+    in the order they were added. Relationships discovered after the tables were spilled are attached when
+    tables are read.
+    """
+
+    def __init__(self, tables: Iterable[Mapping] = ()):
+        """
+        :param tables: tables to be spilled
+        """
+        self._file = tempfile.TemporaryFile()
+        self._count = 0
+        # relationships (as given by Relationship.to_dict) by table name
+        self.relationships = {}
+        for table in tables:
+            self.append(table)
+
+    def append(self, table: Mapping) -> None:
+        # pickle keeps types of values (e.g. Decimal and float), as if the table was kept in memory
+        pickle.dump(table, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._count += 1
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[Mapping]:
+        self._file.flush()
+        self._file.seek(0)
+        for _ in range(self._count):
+            table = pickle.load(self._file)
+            table["relationships"].extend(self.relationships.get(table["name"], []))
+            yield table
+        self._file.seek(0, os.SEEK_END)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class MemoryMonitor:
+    """
+    Instrumentation of memory and memory budget of extraction and rendering of report
+    """
+
+    def __init__(self, budget: int = None, trace: bool = False):
+        """
+        :param budget: max RSS of process in bytes, low memory paths are used when it is approached (no limit
+        if not given)
+        :param trace: if allocations should be traced (tracemalloc) to attribute memory to phases and tables
+        """
+        self.budget = budget
+        self.trace = trace
+        # statistics by phase name: peak traced memory, memory retained after the phase, RSS and seconds
+        self.phases = OrderedDict()
+        # memory retained by profiles of tables (traced), by table name
+        self.tables = {}
+        # low memory mode is kept once entered, freed memory is rarely returned to the system
+        self.low_memory = False
+        self.peak_rss = None
+        self._table_start = None
+
+    def rss(self) -> int:
+        """
+        :return: current RSS of process in bytes (None if unknown), peak RSS is updated
+        """
+        rss = current_rss()
+        if rss is not None:
+            self.peak_rss = rss if self.peak_rss is None else max(self.peak_rss, rss)
+        return rss
+
+    def near_budget(self) -> bool:
+        """
+        :return: if low memory paths should be used (RSS reached BUDGET_THRESHOLD of budget)
+        """
+        if self.budget is None or self.low_memory:
+            return self.low_memory
+        rss = self.rss()
+        if rss is not None and rss >= BUDGET_THRESHOLD * self.budget:
+            logging.warning(f'Memory usage {format_bytes(rss)} is approaching the budget {format_bytes(self.budget)}, '
+                            f'switching to low memory mode')
+            self.low_memory = True
+        return self.low_memory
+
+    def _tracing(self) -> bool:
+        if self.trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        return self.trace and tracemalloc.is_tracing()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Attributing memory to a phase (phases are not nested, tables are measured within them)
+        :param name: name of phase, e.g. extraction or rendering
+        """
+        tracing = self._tracing()
+        traced_start = 0
+        if tracing:
+            if hasattr(tracemalloc, "reset_peak"):
+                tracemalloc.reset_peak()
+            traced_start = tracemalloc.get_traced_memory()[0]
+        start = time.time()
+        try:
+            yield
+        finally:
+            stats = {"seconds": time.time() - start, "rss": self.rss()}
+            if tracing:
+                current, peak = tracemalloc.get_traced_memory()
+                stats["peak_traced"] = peak
+                stats["retained_traced"] = current - traced_start
+            self.phases[name] = stats
+
+    def table_started(self, name: str) -> None:
+        if self._tracing():
+            self._table_start = tracemalloc.get_traced_memory()[0]
+
+    def table_finished(self, name: str) -> None:
+        """
+        Recording memory retained by profile of table (its Table object and anything kept for it, e.g. sketches
+        of key discovery)
+        :param name: name of table
+        """
+        if self._table_start is not None and tracemalloc.is_tracing():
+            self.tables[name] = tracemalloc.get_traced_memory()[0] - self._table_start
+        self._table_start = None
+        self.rss()
+
+    def collect(self, tables: Iterable[Mapping]) -> Union[Sequence[Mapping], SpilledTables]:
+        """
+        :param tables: extracted tables (as given by Table.to_dict)
+        :return: list of the tables, or tables spilled to disk if the budget was approached during extraction
+        """
+        ret = []
+        for table in tables:
+            ret.append(table)
+            if not isinstance(ret, SpilledTables) and self.near_budget():
+                logging.warning(f'Spilling extracted tables to disk after {len(ret)} tables')
+                ret = SpilledTables(ret)
+        return ret
+
+    def report(self) -> str:
+        """
+        :return: text report of memory by phase and of the largest profiles of tables
+        """
+        lines = [f"Peak RSS: {format_bytes(self.peak_rss)}"
+                 + ("" if self.budget is None else f" (budget {format_bytes(self.budget)}"
+                    + (", low memory mode" if self.low_memory else "") + ")")]
+        for name, stats in self.phases.items():
+            line = f"{name}: {stats['seconds']:.1f} s, RSS {format_bytes(stats['rss'])}"
+            if "peak_traced" in stats:
+                line += f", peak traced {format_bytes(stats['peak_traced'])}, " \
+                        f"retained {format_bytes(stats['retained_traced'])}"
+            lines.append(line)
+        if len(self.tables):
+            lines.append(f"Largest profiles of tables (of {len(self.tables)}):")
+            for name, size in sorted(self.tables.items(), key=lambda item: -item[1])[:TOP_TABLES]:
+                lines.append(f"  {name}: {format_bytes(size)}")
+        return "\n".join(lines)
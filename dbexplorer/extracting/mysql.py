@@ -1,26 +1,164 @@
-from typing import Tuple, Type
+from typing import Tuple, Type, Iterator
 from dbexplorer.extracting.base_extractors import DbExtractor, TableExtractor
 from dbexplorer.extracting.db_types import *
 import pymysql
+import base64
+import json
+import re
 from collections import defaultdict
+from contextlib import contextmanager
 from dbexplorer.extracting.common import *
 
+# datetime types with histograms (bucketed by seconds)
+HISTOGRAM_DATETIME_TYPES = {"date", "datetime", "timestamp"}
+
+
+def _decode_histogram_value(value: Any) -> Any:
+    """
+    Strings are stored in MySQL histograms in form "base64:type254:<base64 encoded value>"
+    :param value: value from histogram bucket
+    :return: decoded value
+    """
+    if isinstance(value, str) and value.startswith("base64:type"):
+        return base64.b64decode(value.split(":", 2)[2]).decode("utf-8", "replace")
+    return value
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_histogram(histogram: Mapping, rows_count: int, top_number: int) -> ColumnStats:
+    """
+    Converting MySQL 8 histogram (information_schema.COLUMN_STATISTICS) to column statistics.
+    Singleton histograms hold every value with its frequency, equi-height ones hold ranges of values.
+    :param histogram: parsed json histogram
+    :param rows_count: number of rows in the table
+    :param top_number: number of most common values to extract
+    :return: column statistics
+    """
+    buckets = histogram.get("buckets", [])
+    null_fraction = histogram.get("null-values", 0.0)
+    if not len(buckets):
+        return ColumnStats(null_fraction=null_fraction, distinct_count=0)
+
+    singleton = histogram.get("histogram-type") == "singleton"
+    # bucket: [value, cumulative frequency] or [lower, upper, cumulative frequency, distinct values]
+    cumulative = [b[1] if singleton else b[2] for b in buckets]
+    frequencies = [cumulative[0]] + [cumulative[i] - cumulative[i - 1] for i in range(1, len(cumulative))]
+    not_null = cumulative[-1] if cumulative[-1] > 0 else 1
+
+    stats = ColumnStats(null_fraction=null_fraction)
+    if singleton:
+        values = [_decode_histogram_value(b[0]) for b in buckets]
+        stats.distinct_count = len(buckets)
+        stats.minimum, stats.maximum = values[0], values[-1]
+        top = sorted(zip(values, frequencies), key=lambda x: x[1], reverse=True)[:top_number]
+        stats.top = [t[0] for t in top]
+        stats.top_values = [int(round(t[1] * rows_count)) for t in top]
+        points = [_to_float(v) for v in values]
+    else:
+        stats.distinct_count = sum(b[3] for b in buckets)
+        stats.minimum, stats.maximum = _decode_histogram_value(buckets[0][0]), _decode_histogram_value(buckets[-1][1])
+        lowers = [_to_float(_decode_histogram_value(b[0])) for b in buckets]
+        uppers = [_to_float(_decode_histogram_value(b[1])) for b in buckets]
+        points = [None if lo is None or up is None else (lo + up) / 2 for lo, up in zip(lowers, uppers)]
+
+    if not any(p is None for p in points):
+        stats.mean = sum(p * f for p, f in zip(points, frequencies)) / not_null
+        quartiles = []
+        for q in QUARTILES:
+            i = next(i for i, cum in enumerate(cumulative) if cum / not_null >= q)
+            if singleton:
+                quartiles.append(points[i])
+            else:
+                previous = cumulative[i - 1] / not_null if i > 0 else 0
+                share = (q - previous) / (frequencies[i] / not_null) if frequencies[i] > 0 else 0
+                quartiles.append(lowers[i] + (uppers[i] - lowers[i]) * share)
+        stats.quartiles = quartiles
+    return stats
+
 
 class MysqlDbExtractor(DbExtractor):
 
+    # GROUP BY and DISTINCT of large tables are sorted and grouped in memory instead of on-disk temporary tables
+    SESSION_SETTINGS = {"sort_buffer_size": 64 * 1024 * 1024, "tmp_table_size": 256 * 1024 * 1024,
+                        "max_heap_table_size": 256 * 1024 * 1024}
+    LOAD_STATEMENT = "SHOW GLOBAL STATUS LIKE 'Threads_running'"
+
     def __init__(self, server_address: str, port: int, db_name: str, user: str, password: str,
-                 extended: bool, top_number: int, schema: str, odbc_driver: str, max_text_len: str):
+                 extended: bool, top_number: int, schema: str, odbc_driver: str, max_text_len: str, **kwargs):
+        # read from server with the first table
+        self._window_functions = None
         super(MysqlDbExtractor, self).__init__(server_address, port, db_name, user, password, extended, top_number,
-                                               schema, odbc_driver, max_text_len)
+                                               schema, odbc_driver, max_text_len, **kwargs)
+
+    def _create_table_extractor(self, db_connection: Any, name: str) -> 'MysqlTableExtractor':
+        extractor = super(MysqlDbExtractor, self)._create_table_extractor(db_connection, name)
+        extractor.window_functions = self._has_window_functions()
+        return extractor
+
+    def _has_window_functions(self) -> bool:
+        """
+        :return: if server supports window functions (MySQL 8.0, MariaDB 10.2)
+        """
+        if self._window_functions is None:
+            # read from the real connection, wrappers (dry run, statement cache, progress) keep it in db_connection
+            # and dry run would only explain the statement
+            connection = self.db_connection
+            while hasattr(connection, "db_connection"):
+                connection = connection.db_connection
+            cursor = connection.cursor()
+            cursor.execute("SELECT VERSION();")
+            version = str(cursor.fetchone()[0])
+            match = re.match(r"(\d+)\.(\d+)", version)
+            if match is None:
+                self._window_functions = False
+            elif "mariadb" in version.lower():
+                self._window_functions = (int(match.group(1)), int(match.group(2))) >= (10, 2)
+            else:
+                self._window_functions = int(match.group(1)) >= 8
+        return self._window_functions
 
     def _get_tables_names(self) -> Sequence[str]:
         cursor = self.db_connection.cursor()
-        cursor.execute(f"""SELECT table_name FROM information_schema.tables WHERE table_schema = '{self.db_name}'""")
+        cursor.execute(f"""SELECT table_name FROM information_schema.tables WHERE table_schema = '{self.db_name}'
+                           {self.filters.tables_condition("table_name")}
+                           {self.filters.rows_condition("table_rows")}""")
         return [name[0] for name in cursor.fetchall()]
 
+    def _get_tables_rows_estimates(self) -> Mapping[str, int]:
+        cursor = self.db_connection.cursor()
+        cursor.execute(f"""SELECT table_name, table_rows FROM information_schema.tables
+                           WHERE table_schema = '{self.db_name}'""")
+        return {name: int(rows) for name, rows in cursor.fetchall() if rows is not None}
+
     def connect(self, server_address: str, port: int, db_name: str, user: str, password: str) -> Any:
         return pymysql.connect(host=server_address, user=user, password=password, db=db_name)
 
+    def _configure_session(self, connection: Any) -> Any:
+        cursor = connection.cursor()
+        for name, value in self.session_settings.items():
+            cursor.execute(f"SET SESSION {name} = {setting_literal(value)};")
+        return connection
+
+    @contextmanager
+    def _snapshot(self) -> Iterator[None]:
+        self.db_connection.cursor().execute("START TRANSACTION WITH CONSISTENT SNAPSHOT, READ ONLY;")
+        try:
+            yield
+        finally:
+            self.db_connection.commit()
+
+    def explain_cost(self, cursor: Any, sql: str) -> float:
+        cursor.execute("EXPLAIN FORMAT=JSON " + sql.strip().rstrip(";"))
+        plan = json.loads(cursor.fetchone()[0])
+        cost = plan.get("query_block", {}).get("cost_info", {}).get("query_cost")
+        return None if cost is None else float(cost)
+
     @property
     def table_extractor_class(self) -> Type:
         return MysqlTableExtractor
@@ -28,11 +166,20 @@ class MysqlDbExtractor(DbExtractor):
 
 class MysqlTableExtractor(TableExtractor):
 
+    IDENTIFIER_QUOTE = '`{}`'
+
     def __init__(self, db_connection: Any, table_name: str, extended: bool, top_number: int, db_name: str,
-                 max_text_len: int):
+                 max_text_len: int, **kwargs):
         super(MysqlTableExtractor, self).__init__(db_connection, table_name, extended, top_number, db_name,
-                                                  max_text_len)
+                                                  max_text_len, **kwargs)
         self.rows_count = None
+        self._catalog_column_stats = None
+        self._indexed_columns = None
+        self._unique_columns = None
+        # max lengths of texts found by grouping of text columns
+        self._text_lengths = {}
+        # if max length of column can be computed by grouping of the column (window functions of MySQL 8.0)
+        self.window_functions = True
 
     def _map_sql_types(self, sql_type: str) -> ColumnType:
         types = {
@@ -65,6 +212,12 @@ class MysqlTableExtractor(TableExtractor):
         return types[sql_type] if sql_type in types else ColumnType.NONE
 
     def get_rows_count(self) -> int:
+        if self.rows_count is None and self.catalog_stats:
+            cursor = self.db_connection.cursor()
+            cursor.execute(f"""SELECT TABLE_ROWS FROM information_schema.TABLES
+                               WHERE TABLE_SCHEMA = '{self.db_name}' AND TABLE_NAME = '{self.table_name}';""")
+            result = cursor.fetchone()
+            self.rows_count = None if result is None else result[0]
         if self.rows_count is None:
             cursor = self.db_connection.cursor()
             cursor.execute(f"""SELECT COUNT(*) FROM {self.table_name}""")
@@ -72,6 +225,81 @@ class MysqlTableExtractor(TableExtractor):
             self.rows_count = result[0]
         return self.rows_count
 
+    def _get_catalog_column_stats(self, column_name: str) -> ColumnStats:
+        """
+        Statistics of column collected by db (histograms and index cardinality), available only in catalog mode
+        :param column_name: name of column
+        :return: column statistics or None if db has not collected any
+        """
+        if not self.catalog_stats:
+            return None
+        if self._catalog_column_stats is None:
+            self._catalog_column_stats = self._read_catalog_stats()
+        return self._catalog_column_stats.get(column_name)
+
+    def _read_catalog_stats(self) -> Mapping[str, ColumnStats]:
+        cursor = self.db_connection.cursor()
+        stats = {}
+        try:
+            cursor.execute(f"""SELECT COLUMN_NAME, HISTOGRAM FROM information_schema.COLUMN_STATISTICS
+                               WHERE SCHEMA_NAME = '{self.db_name}' AND TABLE_NAME = '{self.table_name}';""")
+            histograms = cursor.fetchall()
+        except pymysql.MySQLError:
+            # COLUMN_STATISTICS is available since MySQL 8.0
+            histograms = []
+
+        for column_name, histogram in histograms:
+            if isinstance(histogram, bytes):
+                histogram = histogram.decode("utf-8")
+            if isinstance(histogram, str):
+                histogram = json.loads(histogram)
+            stats[column_name] = parse_histogram(histogram, self.get_rows_count(), self.top_number)
+
+        for column_name, cardinality in self._get_distinct_estimates().items():
+            column_stats = stats.setdefault(column_name, ColumnStats())
+            if column_stats.distinct_count is None:
+                column_stats.distinct_count = cardinality
+        return stats
+
+    def _get_distinct_estimates(self) -> Mapping[str, float]:
+        # cardinality of first column of an index is the number of distinct values in this column
+        cursor = self.db_connection.cursor()
+        cursor.execute(f"""SELECT COLUMN_NAME, MAX(CARDINALITY) FROM information_schema.STATISTICS
+                           WHERE TABLE_SCHEMA = '{self.db_name}' AND TABLE_NAME = '{self.table_name}'
+                           AND SEQ_IN_INDEX = 1 GROUP BY COLUMN_NAME;""")
+        return {column_name: cardinality for column_name, cardinality in cursor.fetchall() if cardinality is not None}
+
+    def _get_catalog_min_max(self, column_name: str, with_mean: bool) -> ColumnStats:
+        stats = self._get_catalog_column_stats(column_name)
+        if stats is None or stats.minimum is None or stats.maximum is None or (with_mean and stats.mean is None):
+            return None
+        return stats
+
+    def _get_indexed_columns(self) -> Mapping[str, Tuple[str, int]]:
+        """
+        Leading columns of b-tree indexes of the table
+        :return: index name and its cardinality by column name
+        """
+        if self._indexed_columns is None:
+            cursor = self.db_connection.cursor()
+            cursor.execute(f"""SELECT COLUMN_NAME, INDEX_NAME, CARDINALITY FROM information_schema.STATISTICS
+                               WHERE TABLE_SCHEMA = '{self.db_name}' AND TABLE_NAME = '{self.table_name}'
+                               AND SEQ_IN_INDEX = 1 AND INDEX_TYPE = 'BTREE';""")
+            self._indexed_columns = {}
+            for column_name, index_name, cardinality in cursor.fetchall():
+                self._indexed_columns.setdefault(column_name, (index_name, cardinality))
+        return self._indexed_columns
+
+    def _get_loose_index_scan_index(self, column_name: str) -> str:
+        """
+        :param column_name: name of column
+        :return: name of index to be used for loose index scan or None if column is not indexed or not selective
+        """
+        index_name, cardinality = self._get_indexed_columns().get(column_name, (None, None))
+        if cardinality is None or cardinality > LOOSE_INDEX_SCAN_MAX_DISTINCT:
+            return None
+        return index_name
+
     def get_columns_by_simple_types(self, columns_names: Sequence[str], columns_sql_types: Sequence[str]) \
             -> Mapping[str, Sequence[Mapping[str, str]]]:
         columns_by_simple_types = defaultdict(list)
@@ -90,35 +318,73 @@ class MysqlTableExtractor(TableExtractor):
         return ret
 
     def _are_texts_longer_than_max(self, column_name: str) -> bool:
+        if column_name in self._text_lengths:
+            max_len = self._text_lengths[column_name]
+            return max_len is not None and max_len > self.max_text_len
         max_len = get_text_len(column_name, self.table_name, self.db_connection)
         return max_len is not None and max_len > self.max_text_len
 
     def _get_basic_text_columns(self, columns: Sequence[Mapping[str, str]]) -> Sequence[TextColumn]:
         ret = []
         cursor = self.db_connection.cursor()
+        unique = [c for c in columns if c["name"] in self._get_unique_columns()]
+        nullable = self._get_nullable(unique)
         for c in columns:
-            if self._are_texts_longer_than_max(c["name"]):
-                ret.append(TextColumn(c["name"], c["sql_type"], [TOO_LONG_TEXT_WARNING], []))
-            else:
-                cursor.execute(f"""SELECT {c["name"]}, count(*) from {self.table_name}
-                            GROUP BY {c["name"]}
-                            ORDER BY count(*) DESC LIMIT {self.top_number};""")
+            stats = self._get_catalog_column_stats(c["name"])
+            if stats is not None and stats.top is not None:
+                ret.append(TextColumn(c["name"], c["sql_type"], stats.top, stats.top_values))
+            elif c in unique and nullable.get(c["name"]) == "NO":
+                # every value occurs once, so any values are the most common ones
+                cursor.execute(f"""SELECT LEFT({c["name"]}, {self.max_text_len}), CHAR_LENGTH({c["name"]})
+                                   from {self.table_name} LIMIT {self.top_number};""")
                 result = cursor.fetchall()
+                ret.append(TextColumn(c["name"], c["sql_type"],
+                                      [display_text(r[0], r[1], self.max_text_len) for r in result],
+                                      [1 for _ in result]))
+            elif c["sql_type"] == "enum":
+                result = self._get_domain_counts(c["name"])[:self.top_number]
                 ret.append(TextColumn(c["name"], c["sql_type"], [r[0] for r in result], [r[1] for r in result]))
+            else:
+                # grouping by fixed-width hash, so temporary table does not depend on length of texts, only
+                # prefixes of the top values are displayed, max length of the column is computed in the same pass
+                # (before MySQL 8.0 it is queried separately only when needed)
+                max_len = f', MAX(MAX(CHAR_LENGTH({c["name"]}))) OVER ()' if self.window_functions else ""
+                cursor.execute(f"""SELECT MIN(LEFT({c["name"]}, {self.max_text_len})), count(*),
+                                   MAX(CHAR_LENGTH({c["name"]})){max_len}
+                                   from {self.table_name}
+                                   GROUP BY MD5({c["name"]})
+                                   ORDER BY count(*) DESC LIMIT {self.top_number};""")
+                result = cursor.fetchall()
+                if self.window_functions:
+                    self._text_lengths[c["name"]] = result[0][3] if len(result) else None
+                ret.append(TextColumn(c["name"], c["sql_type"],
+                                      [display_text(r[0], r[2], self.max_text_len) for r in result],
+                                      [r[1] for r in result]))
         return ret
 
     def _get_basic_numeric_columns(self, columns: Sequence[Mapping[str, str]]) -> Sequence[NumericColumn]:
         ret = []
         sql = ""
-        for i, c in enumerate(columns):
+        live_columns = [c for c in columns if self._get_catalog_min_max(c["name"], True) is None]
+        for i, c in enumerate(live_columns):
             sql += f'MAX({c["name"]}), MIN({c["name"]}), AVG({c["name"]})'
-            if i < len(columns) - 1:
+            if i < len(live_columns) - 1:
                 sql += ", "
-        cursor = self.db_connection.cursor()
-        cursor.execute(f"""SELECT {sql} from {self.table_name};""")
-        result = cursor.fetchone()
+        result = []
+        if len(live_columns):
+            cursor = self.db_connection.cursor()
+            cursor.execute(f"""SELECT {sql} from {self.table_name};""")
+            result = cursor.fetchone()
 
-        for i, c in enumerate(columns):
+        i = -1
+        for c in columns:
+            stats = self._get_catalog_min_max(c["name"], True)
+            if stats is not None:
+                ret.append(NumericColumn(c["name"], c["sql_type"],
+                                         float(stats.maximum), float(stats.minimum), float(stats.mean)))
+                continue
+
+            i += 1
             if check_result_empty(result[3 * i:3 * i + 2]):
                 ret.append(NumericColumn(c["name"], c["sql_type"], None, None, None))
                 continue
@@ -131,19 +397,19 @@ class MysqlTableExtractor(TableExtractor):
 
     def _get_basic_datetime_columns(self, columns: Sequence[Mapping[str, str]]) -> Sequence[DatetimeColumn]:
         ret = []
-        sql = ""
-        for i, c in enumerate(columns):
-            sql += f'MAX({c["name"]}), MIN({c["name"]})'
-            if i < len(columns) - 1:
-                sql += ", "
-        cursor = self.db_connection.cursor()
-        cursor.execute(f"""SELECT {sql} from {self.table_name};""")
-        result = cursor.fetchone()
+        live_columns = [c["name"] for c in columns if self._get_catalog_min_max(c["name"], False) is None]
+        result = get_max_min(live_columns, self._get_indexed_columns(),
+                             lambda name: f'MAX({name}), MIN({name})', self.table_name, self.db_connection)
+
+        for c in columns:
+            stats = self._get_catalog_min_max(c["name"], False)
+            if stats is not None:
+                ret.append(DatetimeColumn(c["name"], c["sql_type"], str(stats.maximum), str(stats.minimum)))
+                continue
 
-        for i, c in enumerate(columns):
             ret.append(DatetimeColumn(c["name"], c["sql_type"],
-                                      str(result[2 * i]),
-                                      str(result[2 * i + 1])
+                                      str(result[c["name"]][0]),
+                                      str(result[c["name"]][1])
                                       ))
         return ret
 
@@ -164,40 +430,76 @@ class MysqlTableExtractor(TableExtractor):
                 raise ValueError("Unknown ColumnType")
         return ret
 
+    def _get_small_domain_columns(self, columns: Sequence[Mapping[str, str]]) -> Sequence[str]:
+        # BOOLEAN is a synonym of TINYINT(1), any tinyint has at most 256 values
+        return [c["name"] for c in columns if c["sql_type"] in ("enum", "tinyint")]
+
     def _get_extended_columns(self, columns: Sequence[Mapping[str, str]]) -> Sequence[ExtendedColumn]:
         ret = []
+        nullable = self._get_nullable(columns)
+        columns_stats = {c["name"]: self._get_catalog_column_stats(c["name"]) for c in columns}
+        # statistics collected by db are used instead of grouping
+        small_domain = [name for name in self._get_small_domain_columns(columns) if columns_stats[name] is None]
+        nulls_counts = get_nulls_counts([c["name"] for c in columns if nullable.get(c["name"]) != "NO"
+                                         and c["name"] not in small_domain
+                                         and (columns_stats[c["name"]] is None
+                                              or columns_stats[c["name"]].null_fraction is None)],
+                                        self.IDENTIFIER_QUOTE, self.table_name, self.db_connection)
         for c in columns:
-            cursor = self.db_connection.cursor()
-
-            cursor.execute(f"""select IS_NULLABLE from INFORMATION_SCHEMA.COLUMNS
-                                 where table_name = '{self.table_name}' and column_name ='{c["name"]}'; """)
-
-            is_nullable = cursor.fetchone()[0]
-
-            cursor.execute(f"""select count(*) from {self.table_name} where {c["name"]} is NULL;""")
-            nulls_count = cursor.fetchone()[0]
-
-            if self._map_sql_types(c["sql_type"]) == ColumnType.TEXT and self._are_texts_longer_than_max(c["name"]):
-                distinct_count = None
+            is_nullable = nullable.get(c["name"])
+
+            stats = columns_stats[c["name"]]
+            if c["name"] in small_domain:
+                # all values of enums and booleans are counted by one grouping
+                domain_counts = self._get_domain_counts(c["name"])
+                nulls_count = sum([count for value, count in domain_counts if value is None])
+                nulls_percent = 0 if self.get_rows_count() == 0 else (100 * nulls_count / self.get_rows_count())
+            elif is_nullable == "NO":
+                nulls_percent = 0
+            elif stats is not None and stats.null_fraction is not None:
+                nulls_percent = 100 * stats.null_fraction
+            else:
+                nulls_count = nulls_counts[c["name"]]
+                nulls_percent = 0 if self.get_rows_count() == 0 else (100 * nulls_count / self.get_rows_count())
+
+            if c["name"] in small_domain:
+                distinct_count = len(self._get_domain_counts(c["name"]))
+            elif stats is not None and stats.distinct_count is not None:
+                distinct_count = stats.distinct_count
+            elif c["name"] in self._get_unique_columns():
+                distinct_count = get_unique_distinct_count(self.get_rows_count(),
+                                                           round(nulls_percent * self.get_rows_count() / 100))
             else:
-                cursor.execute(
-                    f"""SELECT COUNT(*) FROM (SELECT DISTINCT {c["name"]} FROM {self.table_name}) AS temp;"""
-                )
-                distinct_count = cursor.fetchone()[0]
+                distinct_count = self._get_distinct_count(c, nulls_percent > 0)
 
             ret.append(ExtendedNoneTypeColumn(c["name"],
                                               c["sql_type"],
                                               is_nullable,
-                                              0 if self.get_rows_count() == 0 else (100 * nulls_count
-                                                                                    / self.get_rows_count()),
+                                              nulls_percent,
                                               distinct_count))
         return ret
 
+    def _get_distinct_count(self, column: Mapping[str, str], has_nulls: bool) -> int:
+        cursor = self.db_connection.cursor()
+        if self._map_sql_types(column["sql_type"]) == ColumnType.TEXT \
+                and self._are_texts_longer_than_max(column["name"]):
+            # long texts are counted by their hashes (null is counted as a distinct value as well)
+            cursor.execute(f"""SELECT COUNT(*) FROM (SELECT DISTINCT MD5({column["name"]})
+                               FROM {self.table_name}) AS temp;""")
+        elif self._get_loose_index_scan_index(column["name"]) is not None:
+            # GROUP BY on leading index column is done by loose index scan (jumping between values)
+            cursor.execute(f"""SELECT COUNT(*) FROM (SELECT {column["name"]} FROM {self.table_name}
+                               FORCE INDEX (`{self._get_loose_index_scan_index(column["name"])}`)
+                               GROUP BY {column["name"]}) AS temp;""")
+        else:
+            cursor.execute(f"""SELECT COUNT(*) FROM (SELECT DISTINCT {column["name"]}
+                               FROM {self.table_name}) AS temp;""")
+        return cursor.fetchone()[0]
+
     def _get_extended_text_columns(self, columns: Sequence[Mapping[str, str]]) -> Sequence[ExtendedTextColumn]:
         ret = []
-        for c in columns:
-            basic_text = self._get_basic_text_columns([{"name": c["name"], "sql_type": c["sql_type"]}])[0]
-            extended_stats = self._get_extended_columns([{"name": c["name"], "sql_type": c["sql_type"]}])[0]
+        for c, basic_text, extended_stats in zip(columns, self._get_basic_text_columns(columns),
+                                                  self._get_extended_columns(columns)):
             ret.append(ExtendedTextColumn(c["name"], c["sql_type"],
                                           basic_text.top,
                                           basic_text.top_values,
@@ -208,9 +510,8 @@ class MysqlTableExtractor(TableExtractor):
 
     def _get_extended_numeric_columns(self, columns: Sequence[Mapping[str, str]]) -> Sequence[ExtendedNumericColumn]:
         ret = []
-        for c in columns:
-            basic_numeric = self._get_basic_numeric_columns([{"name": c["name"], "sql_type": c["sql_type"]}])[0]
-            extended_stats = self._get_extended_columns([{"name": c["name"], "sql_type": c["sql_type"]}])[0]
+        for c, basic_numeric, extended_stats in zip(columns, self._get_basic_numeric_columns(columns),
+                                                    self._get_extended_columns(columns)):
             quartiles = self._get_quartiles(c["name"], self.get_rows_count() * (1 - extended_stats.null_percent / 100))
             ret.append(ExtendedNumericColumn(c["name"], c["sql_type"],
                                              basic_numeric.max, basic_numeric.min, basic_numeric.mean,
@@ -222,9 +523,8 @@ class MysqlTableExtractor(TableExtractor):
 
     def _get_extended_datetime_columns(self, columns: Sequence[Mapping[str, str]]) -> Sequence[ExtendedDatetimeColumn]:
         ret = []
-        for c in columns:
-            basic_datetime = self._get_basic_datetime_columns([{"name": c["name"], "sql_type": c["sql_type"]}])[0]
-            extended_stats = self._get_extended_columns([{"name": c["name"], "sql_type": c["sql_type"]}])[0]
+        for c, basic_datetime, extended_stats in zip(columns, self._get_basic_datetime_columns(columns),
+                                                     self._get_extended_columns(columns)):
             ret.append(ExtendedDatetimeColumn(c["name"], c["sql_type"],
                                               basic_datetime.max,
                                               basic_datetime.min,
@@ -251,6 +551,78 @@ class MysqlTableExtractor(TableExtractor):
                 raise ValueError("Unknown ColumnType")
         return ret
 
+    def _get_nullable(self, columns: Sequence[Mapping[str, str]]) -> Mapping[str, str]:
+        if not len(columns):
+            return {}
+        names = ", ".join([f"""'{c["name"]}'""" for c in columns])
+        cursor = self.db_connection.cursor()
+        cursor.execute(f"""select COLUMN_NAME, IS_NULLABLE from INFORMATION_SCHEMA.COLUMNS
+                           where TABLE_SCHEMA = '{self.db_name}' and TABLE_NAME = '{self.table_name}'
+                           and COLUMN_NAME in ({names});""")
+        return dict(cursor.fetchall())
+
+    @staticmethod
+    def _get_bucket_sql(column: Column) -> str:
+        """
+        :param column: extracted extended column
+        :return: sql expression of histogram bucket number (0 - HISTOGRAM_BUCKETS), None if column has no histogram
+        """
+        if isinstance(column, ExtendedNumericColumn) and column.min is not None and column.min != column.max:
+            value_sql, min_sql, max_sql = f"`{column.name}`", float_literal(column.min), float_literal(column.max)
+        elif isinstance(column, ExtendedDatetimeColumn) and column.sql_type in HISTOGRAM_DATETIME_TYPES \
+                and column.min != "None" and column.min != column.max:
+            value_sql, min_sql, max_sql = f"TO_SECONDS(`{column.name}`)", f"TO_SECONDS('{column.min}')", \
+                                          f"TO_SECONDS('{column.max}')"
+        else:
+            return None
+        return f"FLOOR(({value_sql} - {min_sql}) * {HISTOGRAM_BUCKETS} / ({max_sql} - {min_sql}))"
+
+    def _get_histograms(self, columns: Sequence[Column]) -> Mapping[str, Sequence[int]]:
+        buckets_sql = {c.name: self._get_bucket_sql(c) for c in columns}
+        return get_histograms({name: sql for name, sql in buckets_sql.items() if sql is not None}, self.table_name,
+                              self.db_connection)
+
+    def _get_primary_key(self) -> Sequence[str]:
+        cursor = self.db_connection.cursor()
+        cursor.execute(f"""select k.COLUMN_NAME from INFORMATION_SCHEMA.TABLE_CONSTRAINTS t
+                           join INFORMATION_SCHEMA.KEY_COLUMN_USAGE k on k.CONSTRAINT_NAME = t.CONSTRAINT_NAME
+                                and k.TABLE_SCHEMA = t.TABLE_SCHEMA and k.TABLE_NAME = t.TABLE_NAME
+                           where t.CONSTRAINT_TYPE = 'PRIMARY KEY' and t.TABLE_SCHEMA = '{self.db_name}'
+                           and t.TABLE_NAME = '{self.table_name}' order by k.ORDINAL_POSITION;""")
+        return [row[0] for row in cursor.fetchall()]
+
+    def _get_unique_columns(self) -> Sequence[str]:
+        if self._unique_columns is None:
+            # primary key and unique constraints are unique indexes in MySQL
+            cursor = self.db_connection.cursor()
+            cursor.execute(f"""select max(COLUMN_NAME) from INFORMATION_SCHEMA.STATISTICS
+                               where TABLE_SCHEMA = '{self.db_name}' and TABLE_NAME = '{self.table_name}'
+                               and NON_UNIQUE = 0 group by INDEX_NAME having count(*) = 1;""")
+            self._unique_columns = [row[0] for row in cursor.fetchall()]
+        return self._unique_columns
+
+    def _get_max_min(self, column_name: str) -> Tuple[Any, Any]:
+        return get_max_min([column_name], self._get_indexed_columns(), lambda name: f'MAX({name}), MIN({name})',
+                           self.table_name, self.db_connection)[column_name]
+
+    def _count_missing_values(self, column_name: str, referenced_table: str, referenced_column: str) -> int:
+        cursor = self.db_connection.cursor()
+        cursor.execute(f"""SELECT COUNT(*) FROM (SELECT DISTINCT t.`{column_name}` FROM {self.table_name} t
+                           WHERE t.`{column_name}` IS NOT NULL AND NOT EXISTS (
+                               SELECT 1 FROM {referenced_table} r
+                               WHERE r.`{referenced_column}` = t.`{column_name}`)) AS missing;""")
+        return cursor.fetchone()[0]
+
+    def iter_rows(self, columns_names: Sequence[str], bounds: Sequence[Tuple[str, str, Any]] = (),
+                  distinct: bool = False, limit: int = None) -> Iterator[Sequence[Any]]:
+        sql, params = get_rows_sql(columns_names, self.table_name, bounds, '`{}`', '%s', distinct)
+        if limit is not None:
+            sql = f"SELECT * FROM ({sql}) AS limited LIMIT {int(limit)}"
+        # unbuffered cursor streams rows instead of reading the whole result into memory
+        cursor = self.db_connection.cursor(pymysql.cursors.SSCursor)
+        cursor.execute(sql, params)
+        return fetch_in_batches(cursor)
+
     def _extract_column_names_and_types(self) -> Tuple[Sequence[str], Sequence[str]]:
         cursor = self.db_connection.cursor()
         cursor.execute(f"""
@@ -258,11 +630,17 @@ class MysqlTableExtractor(TableExtractor):
         column_name, data_type
         from information_schema.columns
         where
-        table_name = '{self.table_name}' and TABLE_SCHEMA = '{self.db_name}';""")
+        table_name = '{self.table_name}' and TABLE_SCHEMA = '{self.db_name}'
+        {self.filters.columns_condition("column_name")}
+        {self.filters.types_condition("data_type")};""")
         fetched = cursor.fetchall()
         return [info[0] for info in fetched], [info[1] for info in fetched]
 
     def _get_quartiles(self, column_name: str, count: int) -> Sequence[float]:
+        stats = self._get_catalog_column_stats(column_name)
+        if stats is not None and stats.quartiles is not None:
+            return stats.quartiles
+
         def quartile_sql(quart, even):
             even_shift = 1 if even else 2
             return f"""(select {column_name} """ \
@@ -1,28 +1,80 @@
-from typing import Tuple, Type
+from typing import Tuple, Type, Iterator
 from dbexplorer.extracting.base_extractors import DbExtractor, TableExtractor
 from dbexplorer.extracting.db_types import *
+import itertools
 import psycopg2
+import re
 from collections import defaultdict
+from contextlib import contextmanager
 from dbexplorer.extracting.common import *
 
+# numbers of server-side cursors, names of cursors open at once in a session must differ
+_cursor_numbers = itertools.count()
+# datetime types with histograms (bucketed by epoch seconds)
+HISTOGRAM_DATETIME_TYPES = {"timestamp without time zone", "timestamp", "timestamptz", "timestamp with time zone",
+                            "date"}
+
 
 class PostgresLikeDbExtractor(DbExtractor):
 
+    # distinct counts and sorts of quartiles do not spill to disk, large scans use parallel workers
+    SESSION_SETTINGS = {"work_mem": "256MB", "max_parallel_workers_per_gather": 4}
+    # sessions of other users are counted only with pg_read_all_stats (pg_monitor) role
+    LOAD_STATEMENT = "SELECT count(*) FROM pg_stat_activity WHERE state = 'active'"
+
     def __init__(self, server_address: str, port: int, db_name: str, user: str, password: str,
-                 extended: bool, top_number: int, schema: str, odbc_driver: str, max_text_len: int):
+                 extended: bool, top_number: int, schema: str, odbc_driver: str, max_text_len: int, **kwargs):
         super(PostgresLikeDbExtractor, self).__init__(server_address, port, db_name, user, password, extended,
-                                                      top_number, schema, odbc_driver, max_text_len)
+                                                      top_number, schema, odbc_driver, max_text_len, **kwargs)
 
     def _get_tables_names(self) -> Sequence[str]:
         cursor = self.db_connection.cursor()
-        cursor.execute(f"""SELECT table_name FROM information_schema.tables WHERE table_schema = '{self.schema}' 
-                              AND table_type='BASE TABLE';""")
+        cursor.execute(f"""SELECT t.table_name FROM information_schema.tables t
+                              LEFT JOIN pg_namespace n ON n.nspname = t.table_schema
+                              LEFT JOIN pg_class c ON c.relnamespace = n.oid AND c.relname = t.table_name
+                              WHERE t.table_schema = '{self.schema}' AND t.table_type='BASE TABLE'
+                              {self.filters.tables_condition("t.table_name")}
+                              {self.filters.rows_condition("c.reltuples")};""")
         return [name[0] for name in cursor.fetchall()]
 
+    def _get_tables_rows_estimates(self) -> Mapping[str, int]:
+        cursor = self.db_connection.cursor()
+        cursor.execute(f"""SELECT c.relname, c.reltuples FROM pg_class c
+                              JOIN pg_namespace n ON n.oid = c.relnamespace
+                              WHERE n.nspname = '{self.schema}' AND c.relkind = 'r';""")
+        # reltuples is -1 (or 0 in older versions) before the first analyze
+        return {name: int(rows) for name, rows in cursor.fetchall() if rows is not None and rows > 0}
+
     def connect(self, server_address: str, port: int, db_name: str, user: str, password: str) -> Any:
         return psycopg2.connect(
             f"dbname='{db_name}' port= '{port}' user='{user}' host='{server_address}' password='{password}'")
 
+    def _configure_session(self, connection: Any) -> Any:
+        # every transaction reads one snapshot of db and can not write
+        connection.set_session(isolation_level="REPEATABLE READ", readonly=True)
+        cursor = connection.cursor()
+        for name, value in self.session_settings.items():
+            cursor.execute(f"SET {name} = {setting_literal(value)};")
+        connection.commit()
+        return connection
+
+    @contextmanager
+    def _snapshot(self) -> Iterator[None]:
+        # transaction (and its snapshot) starts with the first statement of the table
+        try:
+            yield
+        finally:
+            self.db_connection.rollback()
+
+    def explain_cost(self, cursor: Any, sql: str) -> float:
+        cursor.execute("EXPLAIN " + sql.strip().rstrip(";"))
+        for row in cursor.fetchall():
+            # top plan node: "Aggregate  (cost=10.00..10.01 rows=1 width=8)", total cost is after ".."
+            match = re.search(r"cost=[\d.]+\.\.([\d.]+)", row[0])
+            if match is not None:
+                return float(match.group(1))
+        return None
+
     @property
     def table_extractor_class(self) -> Type:
         return PostgresTableExtractor
@@ -31,10 +83,14 @@ class PostgresLikeDbExtractor(DbExtractor):
 class PostgresTableExtractor(TableExtractor):
 
     def __init__(self, db_connection: Any, table_name: str, extended: bool, top_number: int, db_name: str,
-                 max_text_len: int):
+                 max_text_len: int, **kwargs):
         super(PostgresTableExtractor, self).__init__(db_connection, table_name, extended, top_number, db_name,
-                                                     max_text_len)
+                                                     max_text_len, **kwargs)
         self.rows_count = None
+        self._indexed_columns = None
+        self._unique_columns = None
+        # max lengths of texts found by grouping of text columns
+        self._text_lengths = {}
 
     def _map_sql_types(self, sql_type: str) -> ColumnType:
         types = {
@@ -72,6 +128,51 @@ class PostgresTableExtractor(TableExtractor):
             self.rows_count = result[0]
         return self.rows_count
 
+    def _get_indexed_columns(self) -> Mapping[str, float]:
+        """
+        Leading columns of (non partial) b-tree indexes of the table
+        :return: estimated number of distinct values (None if table was not analyzed) by column name
+        """
+        if self._indexed_columns is None:
+            cursor = self.db_connection.cursor()
+            cursor.execute(f"""select a.attname, s.n_distinct, c.reltuples from pg_index i
+                               join pg_class c on c.oid = i.indrelid
+                               join pg_namespace n on n.oid = c.relnamespace
+                               join pg_class ic on ic.oid = i.indexrelid
+                               join pg_am am on am.oid = ic.relam
+                               join pg_attribute a on a.attrelid = c.oid and a.attnum = i.indkey[0]
+                               left join pg_stats s on s.schemaname = n.nspname and s.tablename = c.relname
+                                                    and s.attname = a.attname
+                               where n.nspname = '{self.schema}' and c.relname = '{self.table_name}'
+                               and am.amname = 'btree' and i.indpred is null;""")
+            self._indexed_columns = {}
+            for name, n_distinct, reltuples in cursor.fetchall():
+                # negative n_distinct is a fraction of rows count
+                if n_distinct is not None and n_distinct < 0:
+                    n_distinct = None if reltuples is None or reltuples < 0 else -n_distinct * reltuples
+                self._indexed_columns[name] = n_distinct
+        return self._indexed_columns
+
+    def _get_distinct_estimates(self) -> Mapping[str, float]:
+        cursor = self.db_connection.cursor()
+        cursor.execute(f"""select s.attname, s.n_distinct, c.reltuples from pg_stats s
+                           join pg_namespace n on n.nspname = s.schemaname
+                           join pg_class c on c.relnamespace = n.oid and c.relname = s.tablename
+                           where s.schemaname = '{self.schema}' and s.tablename = '{self.table_name}';""")
+        ret = {}
+        for name, n_distinct, reltuples in cursor.fetchall():
+            # negative n_distinct is a fraction of rows count
+            if n_distinct is not None and n_distinct < 0:
+                n_distinct = None if reltuples is None or reltuples < 0 else -n_distinct * reltuples
+            if n_distinct is not None:
+                ret[name] = n_distinct
+        return ret
+
+    def _is_loose_index_scan_possible(self, column_name: str) -> bool:
+        indexed = self._get_indexed_columns()
+        return column_name in indexed and indexed[column_name] is not None \
+            and indexed[column_name] <= LOOSE_INDEX_SCAN_MAX_DISTINCT
+
     def get_columns_by_simple_types(self, columns_names: Sequence[str], columns_sql_types: Sequence[str]) \
             -> Mapping[str, Sequence[Mapping[str, str]]]:
         columns_by_simple_types = defaultdict(list)
@@ -92,21 +193,42 @@ class PostgresTableExtractor(TableExtractor):
     def _are_texts_longer_than_max(self, column: Mapping[str, str]) -> bool:
         if column['sql_type'] == "boolean":
             return False
+        if column["name"] in self._text_lengths:
+            max_len = self._text_lengths[column["name"]]
+            return max_len is not None and max_len > self.max_text_len
         max_len = get_text_len(column["name"], self.table_name, self.db_connection)
         return max_len is not None and max_len > self.max_text_len
 
     def _get_basic_text_columns(self, columns: Sequence[Mapping[str, str]]) -> Sequence[TextColumn]:
         ret = []
         cursor = self.db_connection.cursor()
+        unique = [c for c in columns if c["name"] in self._get_unique_columns()]
+        nullable = self._get_nullable(unique)
         for c in columns:
-            if self._are_texts_longer_than_max(c):
-                ret.append(TextColumn(c["name"], c["sql_type"], [TOO_LONG_TEXT_WARNING], []))
-            else:
-                cursor.execute(f"""SELECT "{c["name"]}", count(*) from {self.table_name}
-                            GROUP BY "{c["name"]}"
-                            ORDER BY count(*) DESC LIMIT {self.top_number};""")
+            if c in unique and nullable.get(c["name"]) == "NO":
+                # every value occurs once, so any values are the most common ones
+                cursor.execute(f"""SELECT left("{c["name"]}", {self.max_text_len}), length("{c["name"]}")
+                                   from {self.table_name} LIMIT {self.top_number};""")
                 result = cursor.fetchall()
+                ret.append(TextColumn(c["name"], c["sql_type"],
+                                      [display_text(r[0], r[1], self.max_text_len) for r in result],
+                                      [1 for _ in result]))
+            elif c['sql_type'] == "boolean":
+                result = self._get_domain_counts(c["name"])[:self.top_number]
                 ret.append(TextColumn(c["name"], c["sql_type"], [r[0] for r in result], [r[1] for r in result]))
+            else:
+                # grouping by fixed-width hash, so sorting does not depend on length of texts, only prefixes
+                # of the top values are displayed, max length of the column is computed in the same pass
+                cursor.execute(f"""SELECT min(left("{c["name"]}", {self.max_text_len})), count(*),
+                                   max(length("{c["name"]}")), max(max(length("{c["name"]}"))) OVER ()
+                                   from {self.table_name}
+                                   GROUP BY md5("{c["name"]}")
+                                   ORDER BY count(*) DESC LIMIT {self.top_number};""")
+                result = cursor.fetchall()
+                self._text_lengths[c["name"]] = result[0][3] if len(result) else None
+                ret.append(TextColumn(c["name"], c["sql_type"],
+                                      [display_text(r[0], r[2], self.max_text_len) for r in result],
+                                      [r[1] for r in result]))
 
         return ret
 
@@ -134,19 +256,13 @@ class PostgresTableExtractor(TableExtractor):
 
     def _get_basic_datetime_columns(self, columns: Sequence[Mapping[str, str]]) -> Sequence[DatetimeColumn]:
         ret = []
-        sql = ""
-        for i, c in enumerate(columns):
-            sql += f'max("{c["name"]}"), min("{c["name"]}")'
-            if i < len(columns) - 1:
-                sql += ", "
-        cursor = self.db_connection.cursor()
-        cursor.execute(f"""SELECT {sql} from {self.table_name};""")
-        result = cursor.fetchone()
+        result = get_max_min([c["name"] for c in columns], self._get_indexed_columns(),
+                             lambda name: f'max("{name}"), min("{name}")', self.table_name, self.db_connection)
 
-        for i, c in enumerate(columns):
+        for c in columns:
             ret.append(DatetimeColumn(c["name"], c["sql_type"],
-                                      str(result[2 * i]),
-                                      str(result[2 * i + 1])
+                                      str(result[c["name"]][0]),
+                                      str(result[c["name"]][1])
                                       ))
         return ret
 
@@ -167,26 +283,41 @@ class PostgresTableExtractor(TableExtractor):
                 raise ValueError("Unknown ColumnType")
         return ret
 
+    def _get_small_domain_columns(self, columns: Sequence[Mapping[str, str]]) -> Sequence[str]:
+        ret = [c["name"] for c in columns if c["sql_type"] == "boolean"]
+        user_defined = [f"""'{c["name"]}'""" for c in columns if c["sql_type"] == "USER-DEFINED"]
+        if len(user_defined):
+            cursor = self.db_connection.cursor()
+            cursor.execute(f"""select a.attname from pg_attribute a
+                               join pg_class c on c.oid = a.attrelid
+                               join pg_namespace n on n.oid = c.relnamespace
+                               join pg_type t on t.oid = a.atttypid
+                               where n.nspname = '{self.schema}' and c.relname = '{self.table_name}'
+                               and t.typtype = 'e' and a.attname in ({", ".join(user_defined)});""")
+            ret += [row[0] for row in cursor.fetchall()]
+        return ret
+
     def _get_extended_columns(self, columns: Sequence[Mapping[str, str]]) -> Sequence[ExtendedColumn]:
         ret = []
+        nullable = self._get_nullable(columns)
+        small_domain = self._get_small_domain_columns(columns)
+        nulls_counts = get_nulls_counts([c["name"] for c in columns if nullable.get(c["name"]) != "NO"
+                                         and c["name"] not in small_domain], self.IDENTIFIER_QUOTE,
+                                        self.table_name, self.db_connection)
         for c in columns:
-            cursor = self.db_connection.cursor()
-
-            cursor.execute(f"""select IS_NULLABLE from INFORMATION_SCHEMA.COLUMNS
-                                 where table_name = '{self.table_name}' and column_name ='{c["name"]}'; """)
-
-            is_nullable = cursor.fetchone()[0]
-
-            cursor.execute(f"""select count(*) from {self.table_name} where "{c["name"]}" is NULL;""")
-            nulls_count = cursor.fetchone()[0]
-
-            if self._map_sql_types(c["sql_type"]) == ColumnType.TEXT and self._are_texts_longer_than_max(c):
-                distinct_count = None
+            is_nullable = nullable.get(c["name"])
+
+            if c["name"] in small_domain:
+                # all values of booleans and enums are counted by one grouping
+                domain_counts = self._get_domain_counts(c["name"])
+                nulls_count = sum([count for value, count in domain_counts if value is None])
+                distinct_count = len(domain_counts)
+            elif c["name"] in self._get_unique_columns():
+                nulls_count = nulls_counts.get(c["name"], 0)
+                distinct_count = get_unique_distinct_count(self.get_rows_count(), nulls_count)
             else:
-                cursor.execute(
-                    f"""SELECT COUNT(*) FROM (SELECT DISTINCT "{c["name"]}" FROM {self.table_name}) AS temp;"""
-                )
-                distinct_count = cursor.fetchone()[0]
+                nulls_count = nulls_counts.get(c["name"], 0)
+                distinct_count = self._get_distinct_count(c, nulls_count > 0)
 
             ret.append(ExtendedNoneTypeColumn(c["name"],
                                               c["sql_type"],
@@ -196,11 +327,33 @@ class PostgresTableExtractor(TableExtractor):
                                               distinct_count))
         return ret
 
+    def _get_distinct_count(self, column: Mapping[str, str], has_nulls: bool) -> int:
+        cursor = self.db_connection.cursor()
+        if self._map_sql_types(column["sql_type"]) == ColumnType.TEXT and self._are_texts_longer_than_max(column):
+            # long texts are counted by their hashes (null is counted as a distinct value as well)
+            cursor.execute(f"""SELECT COUNT(*) FROM (SELECT DISTINCT md5("{column["name"]}")
+                               FROM {self.table_name}) AS temp;""")
+            return cursor.fetchone()[0]
+        if self._is_loose_index_scan_possible(column["name"]):
+            # loose index scan - every step jumps over the index to the next value, heap is not read
+            cursor.execute(f"""WITH RECURSIVE temp AS (
+                               (SELECT "{column["name"]}" AS v FROM {self.table_name}
+                                WHERE "{column["name"]}" IS NOT NULL ORDER BY "{column["name"]}" LIMIT 1)
+                               UNION ALL
+                               SELECT (SELECT "{column["name"]}" FROM {self.table_name}
+                                       WHERE "{column["name"]}" > temp.v ORDER BY "{column["name"]}" LIMIT 1)
+                               FROM temp WHERE temp.v IS NOT NULL)
+                               SELECT count(v) FROM temp;""")
+            # null is counted as a distinct value as well
+            return cursor.fetchone()[0] + (1 if has_nulls else 0)
+        cursor.execute(f"""SELECT COUNT(*) FROM (SELECT DISTINCT "{column["name"]}"
+                           FROM {self.table_name}) AS temp;""")
+        return cursor.fetchone()[0]
+
     def _get_extended_text_columns(self, columns: Sequence[Mapping[str, str]]) -> Sequence[ExtendedTextColumn]:
         ret = []
-        for c in columns:
-            basic_text = self._get_basic_text_columns([{"name": c["name"], "sql_type": c["sql_type"]}])[0]
-            extended_stats = self._get_extended_columns([{"name": c["name"], "sql_type": c["sql_type"]}])[0]
+        for c, basic_text, extended_stats in zip(columns, self._get_basic_text_columns(columns),
+                                                  self._get_extended_columns(columns)):
             ret.append(ExtendedTextColumn(c["name"], c["sql_type"],
                                           basic_text.top,
                                           basic_text.top_values,
@@ -211,10 +364,8 @@ class PostgresTableExtractor(TableExtractor):
 
     def _get_extended_numeric_columns(self, columns: Sequence[Mapping[str, str]]) -> Sequence[ExtendedNumericColumn]:
         ret = []
-        for c in columns:
-            basic_numeric = self._get_basic_numeric_columns([{"name": c["name"], "sql_type": c["sql_type"]}])[0]
-            extended_stats = self._get_extended_columns([{"name": c["name"], "sql_type": c["sql_type"]}])[0]
-
+        for c, basic_numeric, extended_stats in zip(columns, self._get_basic_numeric_columns(columns),
+                                                    self._get_extended_columns(columns)):
             quartiles = self._get_quartiles(c["name"], self.get_rows_count()*(1 - extended_stats.null_percent/100))
             ret.append(ExtendedNumericColumn(c["name"], c["sql_type"],
                                              basic_numeric.max, basic_numeric.min, basic_numeric.mean,
@@ -226,9 +377,8 @@ class PostgresTableExtractor(TableExtractor):
 
     def _get_extended_datetime_columns(self, columns: Sequence[Mapping[str, str]]) -> Sequence[ExtendedDatetimeColumn]:
         ret = []
-        for c in columns:
-            basic_datetime = self._get_basic_datetime_columns([{"name": c["name"], "sql_type": c["sql_type"]}])[0]
-            extended_stats = self._get_extended_columns([{"name": c["name"], "sql_type": c["sql_type"]}])[0]
+        for c, basic_datetime, extended_stats in zip(columns, self._get_basic_datetime_columns(columns),
+                                                     self._get_extended_columns(columns)):
             ret.append(ExtendedDatetimeColumn(c["name"], c["sql_type"],
                                               basic_datetime.max,
                                               basic_datetime.min,
@@ -262,7 +412,9 @@ class PostgresTableExtractor(TableExtractor):
         column_name, data_type
         from information_schema.columns
         where
-        table_name = '{self.table_name}';""")
+        table_name = '{self.table_name}'
+        {self.filters.columns_condition("column_name")}
+        {self.filters.types_condition("data_type")};""")
         fetched = cursor.fetchall()
         return [info[0] for info in fetched], [info[1] for info in fetched]
 
@@ -275,3 +427,104 @@ class PostgresTableExtractor(TableExtractor):
                    f"""limit {even_shift} offset {int(min(int(quart * (count - 1)), max(count-even_shift, 0)))})"""
 
         return get_quartiles(column_name, count, quartile_sql, self.db_connection)
+
+    def _get_nullable(self, columns: Sequence[Mapping[str, str]]) -> Mapping[str, str]:
+        if not len(columns):
+            return {}
+        names = ", ".join([f"""'{c["name"]}'""" for c in columns])
+        cursor = self.db_connection.cursor()
+        cursor.execute(f"""select column_name, is_nullable from information_schema.columns
+                           where table_schema = '{self.schema}' and table_name = '{self.table_name}'
+                           and column_name in ({names});""")
+        return dict(cursor.fetchall())
+
+    def _bucket_sql(self, value_sql: str, min_sql: str, max_sql: str) -> str:
+        """
+        :return: sql expression of histogram bucket number (0 - HISTOGRAM_BUCKETS) of value
+        """
+        return f"width_bucket({value_sql}, {min_sql}, {max_sql}, {HISTOGRAM_BUCKETS}) - 1"
+
+    def _get_bucket_sql(self, column: Column) -> str:
+        """
+        :param column: extracted extended column
+        :return: sql expression of histogram bucket number, None if column has no histogram
+        """
+        if isinstance(column, ExtendedNumericColumn) and column.min is not None and column.min != column.max:
+            return self._bucket_sql(f'"{column.name}"::float8', float_literal(column.min), float_literal(column.max))
+        if isinstance(column, ExtendedDatetimeColumn) and column.sql_type in HISTOGRAM_DATETIME_TYPES \
+                and column.min != "None" and column.min != column.max:
+            return self._bucket_sql(f'extract(epoch from "{column.name}")',
+                                    f"extract(epoch from cast('{column.min}' as {column.sql_type}))",
+                                    f"extract(epoch from cast('{column.max}' as {column.sql_type}))")
+        return None
+
+    def _get_histograms(self, columns: Sequence[Column]) -> Mapping[str, Sequence[int]]:
+        buckets_sql = {c.name: self._get_bucket_sql(c) for c in columns}
+        return get_histograms({name: sql for name, sql in buckets_sql.items() if sql is not None}, self.table_name,
+                              self.db_connection)
+
+    def _get_primary_key(self) -> Sequence[str]:
+        cursor = self.db_connection.cursor()
+        cursor.execute(f"""select k.column_name from information_schema.table_constraints t
+                           join information_schema.key_column_usage k on k.constraint_name = t.constraint_name
+                                and k.table_schema = t.table_schema and k.table_name = t.table_name
+                           where t.constraint_type = 'PRIMARY KEY' and t.table_schema = '{self.schema}'
+                           and t.table_name = '{self.table_name}' order by k.ordinal_position;""")
+        return [row[0] for row in cursor.fetchall()]
+
+    def _get_unique_columns(self) -> Sequence[str]:
+        if self._unique_columns is None:
+            # primary keys and unique constraints are backed by unique indexes, unique indexes may exist without
+            # constraints (partial and expression indexes do not make the column unique)
+            cursor = self.db_connection.cursor()
+            cursor.execute(f"""select a.attname from pg_index i
+                               join pg_class c on c.oid = i.indrelid
+                               join pg_namespace n on n.oid = c.relnamespace
+                               join pg_attribute a on a.attrelid = c.oid and a.attnum = i.indkey[0]
+                               where n.nspname = '{self.schema}' and c.relname = '{self.table_name}'
+                               and i.indisunique and i.indisvalid and i.indnatts = 1 and i.indkey[0] <> 0
+                               and i.indpred is null and i.indexprs is null;""")
+            self._unique_columns = [row[0] for row in cursor.fetchall()]
+        return self._unique_columns
+
+    def _get_partitions(self) -> Sequence[str]:
+        # leaf partitions of declaratively partitioned table (partitions may be partitioned as well),
+        # partitions may be created in other schemas than their parent, so names are qualified by schema
+        cursor = self.db_connection.cursor()
+        cursor.execute(f"""with recursive parts as (
+                               select c.oid, c.relnamespace, c.relname, c.relkind from pg_inherits i
+                               join pg_class p on p.oid = i.inhparent
+                               join pg_namespace n on n.oid = p.relnamespace
+                               join pg_class c on c.oid = i.inhrelid
+                               where n.nspname = '{self.schema}' and p.relname = '{self.table_name}'
+                               and p.relkind = 'p'
+                               union all
+                               select c.oid, c.relnamespace, c.relname, c.relkind from parts
+                               join pg_inherits i on i.inhparent = parts.oid
+                               join pg_class c on c.oid = i.inhrelid)
+                           select quote_ident(n.nspname) || '.' || quote_ident(parts.relname) from parts
+                           join pg_namespace n on n.oid = parts.relnamespace
+                           where parts.relkind <> 'p';""")
+        return [row[0] for row in cursor.fetchall()]
+
+    def _get_max_min(self, column_name: str) -> Tuple[Any, Any]:
+        return get_max_min([column_name], self._get_indexed_columns(), lambda name: f'max("{name}"), min("{name}")',
+                           self.table_name, self.db_connection)[column_name]
+
+    def _count_missing_values(self, column_name: str, referenced_table: str, referenced_column: str) -> int:
+        cursor = self.db_connection.cursor()
+        cursor.execute(f"""SELECT COUNT(*) FROM (SELECT DISTINCT t."{column_name}" FROM {self.table_name} t
+                           WHERE t."{column_name}" IS NOT NULL AND NOT EXISTS (
+                               SELECT 1 FROM {referenced_table} r
+                               WHERE r."{referenced_column}" = t."{column_name}")) AS missing;""")
+        return cursor.fetchone()[0]
+
+    def iter_rows(self, columns_names: Sequence[str], bounds: Sequence[Tuple[str, str, Any]] = (),
+                  distinct: bool = False, limit: int = None) -> Iterator[Sequence[Any]]:
+        sql, params = get_rows_sql(columns_names, self.table_name, bounds, '"{}"', '%s', distinct)
+        if limit is not None:
+            sql = f"SELECT * FROM ({sql}) AS limited LIMIT {int(limit)}"
+        # named cursor is declared on server, so rows are streamed instead of fetched at once
+        cursor = self.db_connection.cursor(name=f"dbexplorer_{self.table_name}_{next(_cursor_numbers)}")
+        cursor.execute(sql, params)
+        return fetch_in_batches(cursor)
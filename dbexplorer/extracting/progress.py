@@ -0,0 +1,224 @@
+"""
+progress of extraction - tables done of all tables, current table and statement, scan throughput and ETA
+printed to a stream (stderr) and optionally written as JSON lines events (e.g. to a file descriptor read
+by an orchestrator, which detects stalls by time since the last event)
+
+ETA is estimated from catalog row counts of remaining tables and throughput (estimated rows per second)
+observed on finished tables, so large tables weigh more than small ones.
+"""
+
+import sys
+import threading
+import time
+from typing import Any, IO, Mapping, Sequence
+
+import simplejson as json
+
+# max length of statement shown in progress line
+STATEMENT_WIDTH = 60
+
+
+def format_duration(seconds: float) -> str:
+    """
+    :param seconds: duration in seconds
+    :return: duration as h:mm:ss
+    """
+    seconds = int(round(seconds))
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+class ProgressCursor:
+    """
+    Cursor reporting executed statements to progress of its connection
+    """
+
+    def __init__(self, progress: 'ExtractionProgress', cursor: Any):
+        self.progress = progress
+        self.cursor = cursor
+
+    def execute(self, sql: str, *args) -> Any:
+        self.progress.statement(sql)
+        return self.cursor.execute(sql, *args)
+
+    def __getattr__(self, name: str) -> Any:
+        # fetch methods, description and other attributes of real cursor
+        return getattr(self.cursor, name)
+
+    def __iter__(self):
+        return iter(self.cursor)
+
+
+class ProgressConnection:
+    """
+    Connection wrapper reporting statements sent to db
+    """
+
+    def __init__(self, db_connection: Any, progress: 'ExtractionProgress'):
+        self.db_connection = db_connection
+        self.progress = progress
+
+    def cursor(self, *args, **kwargs) -> ProgressCursor:
+        return ProgressCursor(self.progress, self.db_connection.cursor(*args, **kwargs))
+
+    def __getattr__(self, name: str) -> Any:
+        # commit, rollback, close and other methods of real connection
+        return getattr(self.db_connection, name)
+
+
+class ExtractionProgress:
+    """
+    Tracking progress of extraction, notified by extractor (see DbExtractor progress argument)
+    """
+
+    def __init__(self, stream: IO = sys.stderr, events: IO = None, interval: float = 1.0):
+        """
+        :param stream: stream of human readable progress (None if not printed)
+        :param events: stream of JSON lines events (None if not written)
+        :param interval: min seconds between progress lines written to not interactive stream
+        """
+        self.stream = stream
+        self.events = events
+        self.interval = interval
+        # progress line is rewritten in place on terminals, otherwise lines are appended
+        self.interactive = stream is not None and hasattr(stream, "isatty") and stream.isatty()
+        self._lock = threading.Lock()
+        self._estimates = {}
+        # estimate of tables without catalog estimate and sum of estimates of tables not finished yet
+        self._average = 1
+        self._remaining = 0
+        self._names = []
+        self._done = 0
+        self._table = None
+        self._table_start = None
+        self._statement = None
+        self._start = None
+        self._last_line = 0.0
+        # estimated rows and seconds of finished tables - throughput used for ETA
+        self._finished_estimate = 0
+        self._finished_seconds = 0.0
+        self._rows = 0
+
+    def wrap(self, db_connection: Any) -> ProgressConnection:
+        """
+        :param db_connection: connection to db
+        :return: connection reporting its statements to this progress
+        """
+        return ProgressConnection(db_connection, self)
+
+    def _estimate(self, name: str) -> float:
+        estimate = self._estimates.get(name)
+        return estimate if estimate is not None else self._average
+
+    def throughput(self) -> float:
+        """
+        :return: estimated rows per second of finished tables (None before the first table is finished)
+        """
+        if self._finished_seconds <= 0:
+            return None
+        return self._finished_estimate / self._finished_seconds
+
+    def eta(self) -> float:
+        """
+        :return: estimated seconds until the end of extraction (None before the first table is finished)
+        """
+        throughput = self.throughput()
+        if throughput is None or not throughput:
+            return None
+        remaining = self._remaining
+        if self._table is not None:
+            # part of the current table is already read
+            remaining -= min(self._estimate(self._table), (time.time() - self._table_start) * throughput)
+        return max(remaining, 0) / throughput
+
+    def start(self, names: Sequence[str], estimates: Mapping[str, int]) -> None:
+        """
+        :param names: names of all tables to be extracted
+        :param estimates: catalog row counts by table name (tables without estimates may be missing)
+        """
+        with self._lock:
+            self._names = list(names)
+            self._estimates = {name: estimates.get(name) for name in names}
+            # tables without catalog estimate are taken as average tables
+            known = [estimate for estimate in self._estimates.values() if estimate is not None]
+            self._average = sum(known) / len(known) if len(known) else 1
+            self._remaining = sum(self._estimate(name) for name in self._names)
+            self._done = 0
+            self._start = time.time()
+            self._emit("started", force=True)
+
+    def table_started(self, name: str) -> None:
+        with self._lock:
+            self._table = name
+            self._table_start = time.time()
+            self._statement = None
+            self._emit("table_started", force=True)
+
+    def statement(self, sql: str) -> None:
+        with self._lock:
+            self._statement = " ".join(sql.split())
+            self._emit("statement")
+
+    def table_finished(self, name: str, rows_count: int = None) -> None:
+        """
+        :param name: name of finished table
+        :param rows_count: rows count of the table (None if the table was skipped)
+        """
+        with self._lock:
+            self._done += 1
+            self._remaining = max(self._remaining - self._estimate(name), 0)
+            seconds = time.time() - (self._table_start or time.time())
+            if rows_count is not None:
+                # skipped tables are not read, they would distort throughput
+                estimate = self._estimates.get(name)
+                self._finished_estimate += estimate if estimate is not None else rows_count
+                self._finished_seconds += seconds
+                self._rows += rows_count
+            self._table = None
+            self._statement = None
+            self._emit("table_finished", force=True, finished_table=name, rows_count=rows_count, seconds=seconds)
+
+    def finish(self) -> None:
+        with self._lock:
+            self._table = None
+            self._statement = None
+            self._emit("finished", force=True)
+            if self.interactive:
+                self.stream.write("\n")
+                self.stream.flush()
+
+    def _emit(self, event: str, force: bool = False, **fields) -> None:
+        now = time.time()
+        eta = self.eta()
+        throughput = self.throughput()
+        if self.events is not None:
+            record = {"event": event, "time": now, "tables_done": self._done, "tables_total": len(self._names),
+                      "table": self._table, "statement": self._statement, "rows": self._rows,
+                      "rows_per_second": None if not self._finished_seconds else self._rows / self._finished_seconds,
+                      "eta_seconds": eta}
+            record.update(fields)
+            self.events.write(json.dumps(record) + "\n")
+            self.events.flush()
+        if self.stream is None:
+            return
+        # statements come often, lines of appended output are limited to events and interval
+        if not self.interactive and not force and now - self._last_line < self.interval:
+            return
+        self._last_line = now
+        line = f"[{self._done}/{len(self._names)} tables, {format_duration(now - (self._start or now))}]"
+        if self._table is not None:
+            line += f" {self._table}"
+            if self._statement is not None:
+                statement = self._statement
+                if len(statement) > STATEMENT_WIDTH:
+                    statement = statement[:STATEMENT_WIDTH - 3] + "..."
+                line += f": {statement}"
+        if self._finished_seconds:
+            line += f" | {self._rows / self._finished_seconds:,.0f} rows/s"
+        if eta is not None and throughput:
+            line += f" | ETA {format_duration(eta)}"
+        if self.interactive:
+            # clearing rest of the previous (longer) line
+            self.stream.write("\r" + line + "\x1b[K")
+        else:
+            self.stream.write(line + "\n")
+        self.stream.flush()
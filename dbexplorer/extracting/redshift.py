@@ -0,0 +1,295 @@
+from datetime import datetime, timedelta
+from typing import Tuple, Type
+from dbexplorer.extracting.postgres_like import PostgresLikeDbExtractor, PostgresTableExtractor
+from dbexplorer.extracting.db_types import *
+from dbexplorer.extracting.common import *
+
+# zone maps keep min and max of every block as int8, only for these types it can be decoded back to the value
+# (blocks keep rows deleted but not vacuumed yet, so zone maps are not used for tables having such rows)
+ZONE_MAP_TYPES = {
+    "smallint": lambda v: v,
+    "integer": lambda v: v,
+    "bigint": lambda v: v,
+    "date": lambda v: str((datetime(2000, 1, 1) + timedelta(days=v)).date()),
+    "timestamp without time zone": lambda v: str(datetime(2000, 1, 1) + timedelta(microseconds=v)),
+    "timestamp": lambda v: str(datetime(2000, 1, 1) + timedelta(microseconds=v)),
+}
+
+
+class RedshiftDbExtractor(PostgresLikeDbExtractor):
+
+    # memory is assigned by WLM queues, statements are labeled for routing and monitoring
+    SESSION_SETTINGS = {"query_group": "dbexplorer"}
+    # running queries (of all users for superusers)
+    LOAD_STATEMENT = "SELECT count(*) FROM stv_inflight"
+
+    def __init__(self, server_address: str, port: int, db_name: str, user: str, password: str,
+                 extended: bool, top_number: int, schema: str, odbc_driver: str, max_text_len: int, **kwargs):
+        super(RedshiftDbExtractor, self).__init__(server_address, port, db_name, user, password, extended,
+                                                  top_number, schema, odbc_driver, max_text_len, **kwargs)
+
+    def _get_tables_names(self) -> Sequence[str]:
+        cursor = self.db_connection.cursor()
+        cursor.execute(f"""SELECT t.table_name FROM information_schema.tables t
+                              LEFT JOIN svv_table_info i ON i."schema" = t.table_schema AND i."table" = t.table_name
+                              WHERE t.table_schema = '{self.schema}' AND t.table_type='BASE TABLE'
+                              {self.filters.tables_condition("t.table_name")}
+                              {self.filters.rows_condition("coalesce(i.estimated_visible_rows, i.tbl_rows)")};""")
+        return [name[0] for name in cursor.fetchall()]
+
+    def _get_tables_rows_estimates(self) -> Mapping[str, int]:
+        cursor = self.db_connection.cursor()
+        # tbl_rows counts also rows deleted but not vacuumed yet
+        cursor.execute(f"""select "table", coalesce(estimated_visible_rows, tbl_rows) from svv_table_info
+                           where "schema" = '{self.schema}';""")
+        return {name: int(rows) for name, rows in cursor.fetchall() if rows is not None}
+
+    @property
+    def table_extractor_class(self) -> Type:
+        return RedshiftTableExtractor
+
+
+class RedshiftTableExtractor(PostgresTableExtractor):
+    """
+    Redshift is a columnar MPP engine - a statement reads only the columns it references, so all per-column
+    aggregates are computed in a single wide statement per table, distinct counts and quartiles are approximate
+    and row count is read from svv_table_info.
+    """
+
+    # avg of integer columns is truncated to integer in Redshift
+    MEAN_SQL = 'avg({}::float8)'
+
+    def __init__(self, db_connection: Any, table_name: str, extended: bool, top_number: int, db_name: str,
+                 max_text_len: int, **kwargs):
+        super(RedshiftTableExtractor, self).__init__(db_connection, table_name, extended, top_number, db_name,
+                                                     max_text_len, **kwargs)
+        self._table_info = None
+        self._aggregates = {}
+        self._scanned_rows_count = None
+
+    def _get_table_info(self) -> Mapping[str, Any]:
+        """
+        svv_table_info has no rows for empty tables and tables not visible to the user,
+        tbl_rows counts also rows deleted but not vacuumed yet, estimated_visible_rows does not
+        :return: table id, estimated rows count, whether there are deleted rows not vacuumed yet
+        and leading sort key of the table
+        """
+        if self._table_info is None:
+            cursor = self.db_connection.cursor()
+            cursor.execute(f"""select table_id, tbl_rows, estimated_visible_rows, sortkey1 from svv_table_info
+                               where "schema" = '{self.schema}' and "table" = '{self.table_name}';""")
+            result = cursor.fetchone()
+            if result is None:
+                self._table_info = {}
+            else:
+                rows = None if result[1] is None else int(result[1])
+                visible_rows = rows if result[2] is None else int(result[2])
+                self._table_info = {
+                    "table_id": result[0],
+                    "rows": visible_rows,
+                    "deleted": rows is not None and visible_rows is not None and rows > visible_rows,
+                    "sortkey": None if result[3] is None else result[3].strip()
+                }
+        return self._table_info
+
+    def _get_indexed_columns(self) -> Mapping[str, float]:
+        # Redshift has no indexes, sort keys and zone maps are used instead
+        return {}
+
+    def _get_distinct_estimates(self) -> Mapping[str, float]:
+        # statistics of Redshift are not readable from pg_stats
+        return {}
+
+    def get_rows_count(self) -> int:
+        if self.rows_count is None:
+            self.rows_count = self._get_table_info().get("rows")
+        return super(RedshiftTableExtractor, self).get_rows_count()
+
+    def _bucket_sql(self, value_sql: str, min_sql: str, max_sql: str) -> str:
+        return f"floor(({value_sql} - {min_sql}) * {HISTOGRAM_BUCKETS} / ({max_sql} - {min_sql}))"
+
+    def _get_unique_columns(self) -> Sequence[str]:
+        # primary key and unique constraints are not enforced in Redshift
+        return []
+
+    def _get_shard_column(self) -> str:
+        # there are no indexes, ranges of the leading sort key skip blocks by zone maps
+        return self._get_table_info().get("sortkey")
+
+    def _get_zone_map_min_max(self, column: Mapping[str, str]) -> Tuple[Any, Any]:
+        """
+        Min and max of the leading sort key column taken from block zone maps, without scanning the column
+        (stv_blocklist is visible only to superusers, for others the column is aggregated as any other;
+        blocks keep deleted rows until vacuum, so tables with such rows are aggregated too)
+        :param column: column to be checked
+        :return: tuple of min and max or None if zone maps can not be used
+        """
+        table_info = self._get_table_info()
+        if column["name"] != table_info.get("sortkey") or column["sql_type"] not in ZONE_MAP_TYPES \
+                or table_info.get("deleted"):
+            return None
+        cursor = self.db_connection.cursor()
+        cursor.execute(f"""select min(b.minvalue), max(b.maxvalue) from stv_blocklist b
+                           join pg_attribute a on a.attrelid = b.tbl and a.attnum - 1 = b.col
+                           where b.tbl = {table_info["table_id"]} and a.attname = '{column["name"]}'
+                           and b.num_values > 0;""")
+        result = cursor.fetchone()
+        if result is None or check_result_empty(result):
+            return None
+        decode = ZONE_MAP_TYPES[column["sql_type"]]
+        return decode(result[0]), decode(result[1])
+
+    def _get_aggregates(self, columns_by_simple_types: Mapping[int, Sequence[Mapping[str, str]]]) \
+            -> Mapping[str, Mapping[str, Any]]:
+        """
+        Computing all single column aggregates of the table in one statement
+        :param columns_by_simple_types: columns grouped by simple types
+        :return: aggregates by column name (keys: min, max, mean and in extended mode: nulls, distinct)
+        (in extended mode exact rows count is also read in the same statement)
+        """
+        select = ["count(*)"] if self.extended else []
+        readers = [(None, "rows")] if self.extended else []
+
+        def add(column_name, key, sql):
+            select.append(sql)
+            readers.append((column_name, key))
+
+        for simple_type, columns in columns_by_simple_types.items():
+            for c in columns:
+                name = c["name"]
+                self._aggregates[name] = {}
+                if simple_type in (ColumnType.NUMERIC, ColumnType.DATETIME):
+                    zone_map = self._get_zone_map_min_max(c)
+                    if zone_map is not None:
+                        self._aggregates[name]["min"], self._aggregates[name]["max"] = zone_map
+                    else:
+                        add(name, "min", f'min("{name}")')
+                        add(name, "max", f'max("{name}")')
+                if simple_type == ColumnType.NUMERIC:
+                    add(name, "mean", self.MEAN_SQL.format(f'"{name}"'))
+                if self.extended:
+                    add(name, "nulls", f'count(*) - count("{name}")')
+                    add(name, "distinct", f'approximate count(distinct "{name}")')
+
+        if len(select):
+            cursor = self.db_connection.cursor()
+            cursor.execute(f"""select {", ".join(select)} from {self.table_name};""")
+            result = cursor.fetchone()
+            for (column_name, key), value in zip(readers, result):
+                if column_name is None:
+                    self._scanned_rows_count = value
+                    continue
+                self._aggregates[column_name][key] = value
+        return self._aggregates
+
+    def _get_quartiles_of_columns(self, columns: Sequence[Mapping[str, str]]) -> Mapping[str, Sequence[float]]:
+        """
+        Approximate quartiles of all numeric columns in one statement,
+        within group order must be the same for all percentiles in a select, hence union of selects
+        :param columns: numeric columns
+        :return: quartiles by column name
+        """
+        if not len(columns):
+            return {}
+        selects = []
+        for i, c in enumerate(columns):
+            percentiles = ", ".join(
+                [f'approximate percentile_disc({q}) within group (order by "{c["name"]}")' for q in QUARTILES])
+            selects.append(f"""select {i}, {percentiles} from {self.table_name}""")
+        cursor = self.db_connection.cursor()
+        cursor.execute(" union all ".join(selects) + ";")
+        quartiles = {}
+        for result in cursor.fetchall():
+            if check_result_empty(result):
+                continue
+            quartiles[columns[result[0]]["name"]] = [float(r) for r in result[1:]]
+        return quartiles
+
+    def _get_distinct_count(self, column: Mapping[str, str], has_nulls: bool) -> int:
+        cursor = self.db_connection.cursor()
+        cursor.execute(f"""select approximate count(distinct "{column["name"]}") from {self.table_name};""")
+        return cursor.fetchone()[0]
+
+    def _get_quartiles(self, column_name: str, count: int) -> Sequence[float]:
+        return self._get_quartiles_of_columns([{"name": column_name}]).get(column_name, [])
+
+    def _numeric_min_max_mean(self, column_name: str) -> Tuple[float, float, float]:
+        aggregates = self._aggregates[column_name]
+        if check_result_empty([aggregates["min"], aggregates["max"]]):
+            return None, None, None
+        return float(aggregates["max"]), float(aggregates["min"]), float(aggregates["mean"])
+
+    def _nulls_percent(self, column_name: str) -> float:
+        # count(*) of the wide statement is exact, svv_table_info also counts deleted but not vacuumed rows
+        rows_count = self._scanned_rows_count if self._scanned_rows_count is not None else self.get_rows_count()
+        return 0 if rows_count == 0 else 100 * self._aggregates[column_name]["nulls"] / rows_count
+
+    def _extract_basic_stats(self, columns_names: Sequence[str], columns_sql_types: Sequence[str]) -> Sequence[Column]:
+        columns_by_simple_types = self.get_columns_by_simple_types(columns_names, columns_sql_types)
+        aggregates = self._get_aggregates(columns_by_simple_types)
+
+        ret = []
+        for simple_type, columns in columns_by_simple_types.items():
+            if simple_type == ColumnType.NONE:
+                ret += self._get_basic_columns(columns)
+            elif simple_type == ColumnType.TEXT:
+                ret += self._get_basic_text_columns(columns)
+            elif simple_type == ColumnType.NUMERIC:
+                ret += [NumericColumn(c["name"], c["sql_type"], *self._numeric_min_max_mean(c["name"]))
+                        for c in columns]
+            elif simple_type == ColumnType.DATETIME:
+                ret += [DatetimeColumn(c["name"], c["sql_type"],
+                                       str(aggregates[c["name"]]["max"]),
+                                       str(aggregates[c["name"]]["min"])) for c in columns]
+            else:
+                raise ValueError("Unknown ColumnType")
+        return ret
+
+    def _get_extended_columns(self, columns: Sequence[Mapping[str, str]]) -> Sequence[ExtendedColumn]:
+        nullable = self._get_nullable(columns)
+        ret = []
+        for c in columns:
+            ret.append(ExtendedNoneTypeColumn(c["name"], c["sql_type"],
+                                              nullable.get(c["name"]),
+                                              self._nulls_percent(c["name"]),
+                                              self._aggregates[c["name"]]["distinct"]))
+        return ret
+
+    def _extract_extended_stats(self, columns_names: Sequence[str], columns_sql_types: Sequence[str]) \
+            -> Sequence[ExtendedColumn]:
+        columns_by_simple_types = self.get_columns_by_simple_types(columns_names, columns_sql_types)
+        aggregates = self._get_aggregates(columns_by_simple_types)
+        quartiles = self._get_quartiles_of_columns(columns_by_simple_types.get(ColumnType.NUMERIC, []))
+
+        ret = []
+        for simple_type, columns in columns_by_simple_types.items():
+            extended_stats = self._get_extended_columns(columns)
+            if simple_type == ColumnType.NONE:
+                ret += extended_stats
+            elif simple_type == ColumnType.TEXT:
+                for c, basic_text, stats in zip(columns, self._get_basic_text_columns(columns), extended_stats):
+                    ret.append(ExtendedTextColumn(c["name"], c["sql_type"],
+                                                  basic_text.top,
+                                                  basic_text.top_values,
+                                                  stats.is_nullable,
+                                                  stats.null_percent,
+                                                  stats.unique_number))
+            elif simple_type == ColumnType.NUMERIC:
+                for c, stats in zip(columns, extended_stats):
+                    ret.append(ExtendedNumericColumn(c["name"], c["sql_type"],
+                                                     *self._numeric_min_max_mean(c["name"]),
+                                                     stats.is_nullable,
+                                                     stats.null_percent,
+                                                     stats.unique_number,
+                                                     quartiles.get(c["name"], [])))
+            elif simple_type == ColumnType.DATETIME:
+                for c, stats in zip(columns, extended_stats):
+                    ret.append(ExtendedDatetimeColumn(c["name"], c["sql_type"],
+                                                      str(aggregates[c["name"]]["max"]),
+                                                      str(aggregates[c["name"]]["min"]),
+                                                      stats.is_nullable,
+                                                      stats.null_percent,
+                                                      stats.unique_number))
+            else:
+                raise ValueError("Unknown ColumnType")
+        return ret
@@ -0,0 +1,306 @@
+"""
+intra-table parallelism - a large table is split into shards (partitions or value ranges of a key column),
+aggregates that merge exactly (counts of rows and nulls, min, max and mean) are computed by one statement
+per shard, each shard on its own connection. Statistics that can not be merged from shards (most common values,
+distinct counts, quartiles and histograms) are computed over the whole table by the statements of the db type,
+in parallel by column, so they are the same as without shards.
+"""
+
+import logging
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Mapping, Sequence, Tuple
+
+from dbexplorer.extracting.common import bound_literal, get_unique_distinct_count, MAX_SELECT_COLUMNS
+from dbexplorer.extracting.db_types import *
+
+# shard of table - name of table (or partition) and bounds of its rows
+Shard = Tuple[str, Sequence[Tuple[str, str, Any]]]
+
+
+def split_range(minimum: Any, maximum: Any, number: int) -> Sequence[Any]:
+    """
+    :param minimum: min value (number, date or datetime)
+    :param maximum: max value
+    :param number: number of ranges
+    :return: increasing lower bounds of equal-width ranges (fewer if range is too narrow)
+    """
+    if isinstance(minimum, int) and isinstance(maximum, int):
+        bounds = [minimum + (maximum - minimum) * i // number for i in range(number)]
+    else:
+        bounds = [minimum + (maximum - minimum) * i / number for i in range(number)]
+    return sorted(set(bounds))
+
+
+def _min(a: Any, b: Any) -> Any:
+    return a if b is None or (a is not None and a <= b) else b
+
+
+def _max(a: Any, b: Any) -> Any:
+    return a if b is None or (a is not None and a >= b) else b
+
+
+class ShardAggregates:
+    """
+    Aggregates of columns over rows of shards: rows count, counts of not null values, min, max and sum
+    (of numeric columns, as mean weighted by count)
+    """
+
+    def __init__(self):
+        self.rows_count = 0
+        # aggregates by column name (keys: count, min, max, sum)
+        self.columns = {}
+
+    def add(self, column_name: str, count: int, minimum: Any = None, maximum: Any = None, mean: Any = None) -> None:
+        column = self.columns.setdefault(column_name, {"count": 0, "min": None, "max": None, "sum": 0.0})
+        column["count"] += count
+        column["min"] = _min(column["min"], minimum)
+        column["max"] = _max(column["max"], maximum)
+        if mean is not None:
+            column["sum"] += float(mean) * count
+
+    def merge(self, other: 'ShardAggregates') -> 'ShardAggregates':
+        ret = ShardAggregates()
+        ret.rows_count = self.rows_count + other.rows_count
+        for aggregates in (self, other):
+            for name, column in aggregates.columns.items():
+                ret.add(name, column["count"], column["min"], column["max"])
+                ret.columns[name]["sum"] += column["sum"]
+        return ret
+
+    def nulls(self, column_name: str) -> int:
+        return self.rows_count - self.columns[column_name]["count"]
+
+    def mean(self, column_name: str) -> float:
+        column = self.columns[column_name]
+        return None if column["count"] == 0 else column["sum"] / column["count"]
+
+
+class ShardedProfiler:
+    """
+    Profiling large tables in shards read in parallel. Partitions of the table are the shards if the db reports
+    them, otherwise value ranges of a shard column (chosen one, primary key, Teradata partitioning column
+    or Redshift sort key). Only tables with at least min_rows rows by catalog estimate are split.
+    """
+
+    def __init__(self, connect: Callable[[], Any], create_table_extractor: Callable[[Any, str], 'TableExtractor'],
+                 shards: int, shard_columns: Sequence[str] = None, min_rows: int = 1000000):
+        """
+        :param connect: function creating new connection to db
+        :param create_table_extractor: function creating table extractor (arguments: connection, table name)
+        :param shards: number of value ranges and of parallel connections
+        :param shard_columns: candidate shard columns, the first one present in table is used
+        :param min_rows: tables with lower (or unknown) estimated rows count are not split
+        """
+        self.connect = connect
+        self.create_table_extractor = create_table_extractor
+        self.shards = shards
+        self.shard_columns = shard_columns or []
+        self.min_rows = min_rows
+        self._connections = queue.Queue()
+
+    def _get_shards(self, extractor: 'TableExtractor', sql_types: Mapping[str, str]) -> Sequence[Shard]:
+        partitions = extractor._get_partitions()
+        if len(partitions) > 1:
+            return [(partition, []) for partition in partitions]
+
+        column = next((c for c in self.shard_columns if c in sql_types), None) or extractor._get_shard_column()
+        if column is None or column not in sql_types \
+                or extractor._map_sql_types(sql_types[column]) not in (ColumnType.NUMERIC, ColumnType.DATETIME):
+            return []
+        maximum, minimum = extractor._get_max_min(column)
+        if minimum is None or minimum == maximum:
+            return []
+
+        bounds = split_range(minimum, maximum, self.shards)
+        ret = []
+        for i, lower in enumerate(bounds):
+            upper = [(column, "<", bounds[i + 1])] if i + 1 < len(bounds) else []
+            ret.append((extractor.table_name, [(column, ">=", lower)] + upper))
+        if extractor._get_nullable([{"name": column, "sql_type": sql_types[column]}]).get(column) in ("YES", True):
+            ret.append((extractor.table_name, [(column, "IS NULL", None)]))
+        return ret
+
+    def _run(self, function: Callable[[Any], Any]) -> Any:
+        """
+        :param function: function reading db (argument: connection)
+        :return: result of the function run on a connection of the pool
+        """
+        # connections are kept for next shards and tables
+        try:
+            connection = self._connections.get_nowait()
+        except queue.Empty:
+            connection = self.connect()
+        try:
+            return function(connection)
+        finally:
+            # reading transaction ends, the next statements on the connection get a new snapshot
+            connection.rollback()
+            self._connections.put(connection)
+
+    @staticmethod
+    def aggregate_shard(extractor: 'TableExtractor', shard: Shard, columns: Sequence[Mapping[str, str]]) \
+            -> ShardAggregates:
+        """
+        Aggregates of rows of a shard (used by incremental profiling for rows past the watermark as well)
+        :param extractor: extractor of the table (or partition) of the shard
+        :param shard: shard of the table
+        :param columns: columns of the table (dicts with name and sql_type)
+        :return: aggregates of rows of the shard
+        """
+        quote = extractor.IDENTIFIER_QUOTE.format
+        conditions = [f"{quote(column)} {operator}" if value is None
+                      else f"{quote(column)} {operator} {bound_literal(value)}"
+                      for column, operator, value in shard[1]]
+        where = "" if not len(conditions) else " WHERE " + " AND ".join(conditions)
+
+        aggregates = []
+        for c in columns:
+            select = [f'count({quote(c["name"])})']
+            simple_type = extractor._map_sql_types(c["sql_type"])
+            if simple_type in (ColumnType.NUMERIC, ColumnType.DATETIME):
+                select += [f'min({quote(c["name"])})', f'max({quote(c["name"])})']
+            if simple_type == ColumnType.NUMERIC:
+                select.append(extractor.MEAN_SQL.format(quote(c["name"])))
+            aggregates.append((c["name"], select))
+
+        ret = ShardAggregates()
+        cursor = extractor.db_connection.cursor()
+        group, size = [], 0
+        for i, (name, select) in enumerate(aggregates):
+            group.append((name, select))
+            size += len(select)
+            if i + 1 < len(aggregates) and size + len(aggregates[i + 1][1]) < MAX_SELECT_COLUMNS:
+                continue
+            sql = ", ".join(["count(*)"] + [s for _, selects in group for s in selects])
+            cursor.execute(f"""SELECT {sql} FROM {extractor._get_relation()}{where};""")
+            result = cursor.fetchone()
+            ret.rows_count = result[0]
+            position = 1
+            for column_name, selects in group:
+                ret.add(column_name, *result[position:position + len(selects)])
+                position += len(selects)
+            group, size = [], 0
+        if not len(aggregates):
+            cursor.execute(f"""SELECT count(*) FROM {extractor._get_relation()}{where};""")
+            ret.rows_count = cursor.fetchone()[0]
+        return ret
+
+    def _read_shard(self, shard: Shard, columns: Sequence[Mapping[str, str]]) -> ShardAggregates:
+        return self._run(lambda connection: self.aggregate_shard(
+            self.create_table_extractor(connection, shard[0]), shard, columns))
+
+    def _get_column_stats(self, table_name: str, column: Mapping[str, str], extended: bool, unique: bool,
+                          aggregates: ShardAggregates) -> Mapping[str, Any]:
+        """
+        Statistics of a column that can not be merged from shards, read from the whole table
+        :param table_name: name of table
+        :param column: column (dict with name and sql_type)
+        :param extended: if the info should be in the extended form
+        :param unique: if values of the column are unique by constraint
+        :param aggregates: merged aggregates of shards
+        :return: statistics by name (top, top_values, distinct, quartiles)
+        """
+        def read(connection):
+            extractor = self.create_table_extractor(connection, table_name)
+            simple_type = extractor._map_sql_types(column["sql_type"])
+            ret = {}
+            if simple_type == ColumnType.TEXT:
+                text = extractor._get_basic_text_columns([column])[0]
+                ret["top"], ret["top_values"] = text.top, text.top_values
+            if not extended:
+                return ret
+            nulls = aggregates.nulls(column["name"])
+            if unique:
+                ret["distinct"] = get_unique_distinct_count(aggregates.rows_count, nulls)
+            else:
+                ret["distinct"] = extractor._get_distinct_count(column, nulls > 0)
+            count = aggregates.columns[column["name"]]["count"]
+            if simple_type == ColumnType.NUMERIC:
+                ret["quartiles"] = extractor._get_quartiles(column["name"], count) if count > 0 else []
+            return ret
+
+        return self._run(read)
+
+    @staticmethod
+    def _to_column(column: Mapping[str, str], simple_type: int, aggregates: ShardAggregates, extended: bool,
+                   stats: Mapping[str, Any], is_nullable: Any) -> Column:
+        """
+        :param column: column (dict with name and sql_type)
+        :param simple_type: ColumnType of column
+        :param aggregates: merged aggregates of shards
+        :param extended: if the info should be in the extended form
+        :param stats: statistics of the column read from the whole table
+        :param is_nullable: nullability as read from db catalog
+        :return: column info
+        """
+        name, sql_type = column["name"], column["sql_type"]
+        merged = aggregates.columns[name]
+        nulls_percent = 0 if aggregates.rows_count == 0 else 100 * aggregates.nulls(name) / aggregates.rows_count
+
+        if simple_type == ColumnType.NUMERIC:
+            maximum = None if merged["max"] is None else float(merged["max"])
+            minimum = None if merged["min"] is None else float(merged["min"])
+            if not extended:
+                return NumericColumn(name, sql_type, maximum, minimum, aggregates.mean(name))
+            return ExtendedNumericColumn(name, sql_type, maximum, minimum, aggregates.mean(name), is_nullable,
+                                         nulls_percent, stats["distinct"], stats["quartiles"])
+        elif simple_type == ColumnType.DATETIME:
+            if not extended:
+                return DatetimeColumn(name, sql_type, str(merged["max"]), str(merged["min"]))
+            return ExtendedDatetimeColumn(name, sql_type, str(merged["max"]), str(merged["min"]), is_nullable,
+                                          nulls_percent, stats["distinct"])
+        elif simple_type == ColumnType.TEXT:
+            if not extended:
+                return TextColumn(name, sql_type, stats["top"], stats["top_values"])
+            return ExtendedTextColumn(name, sql_type, stats["top"], stats["top_values"], is_nullable, nulls_percent,
+                                      stats["distinct"])
+        elif simple_type == ColumnType.NONE:
+            if not extended:
+                return Column(name, sql_type)
+            return ExtendedNoneTypeColumn(name, sql_type, is_nullable, nulls_percent, stats["distinct"])
+        raise ValueError("Unknown ColumnType")
+
+    def get_table(self, extractor: 'TableExtractor', rows_estimate: int = None) -> Table:
+        """
+        :param extractor: extractor of the table
+        :param rows_estimate: rows count of the table according to db catalog
+        :return: table info from merged shards, None if the table is too small or can not be split
+        """
+        if rows_estimate is None or rows_estimate < self.min_rows:
+            return None
+        columns_names, columns_sql_types = extractor._extract_column_names_and_types()
+        sql_types = dict(zip(columns_names, columns_sql_types))
+        shards = self._get_shards(extractor, sql_types)
+        if len(shards) < 2:
+            return None
+
+        logging.info(f'Table {extractor.table_name} is read in {len(shards)} shards')
+        # columns are grouped by simple types, as they are extracted without shards
+        types = [extractor._map_sql_types(sql_type) for sql_type in sql_types.values()]
+        order = list(dict.fromkeys(types))
+        columns = [{"name": name, "sql_type": sql_type} for (name, sql_type), _ in
+                   sorted(zip(sql_types.items(), types), key=lambda column: order.index(column[1]))]
+        with ThreadPoolExecutor(self.shards) as executor:
+            parts = list(executor.map(lambda shard: self._read_shard(shard, columns), shards))
+            aggregates = parts[0]
+            for part in parts[1:]:
+                aggregates = aggregates.merge(part)
+
+            unique = extractor._get_unique_columns() if extractor.extended else []
+            needed = [c for c in columns
+                      if extractor.extended or extractor._map_sql_types(c["sql_type"]) == ColumnType.TEXT]
+            stats = dict(zip([c["name"] for c in needed], executor.map(
+                lambda c: self._get_column_stats(extractor.table_name, c, extractor.extended, c["name"] in unique,
+                                                 aggregates), needed)))
+
+            nullable = extractor._get_nullable(columns) if extractor.extended else {}
+            ret = [self._to_column(c, extractor._map_sql_types(c["sql_type"]), aggregates, extractor.extended,
+                                   stats.get(c["name"]), nullable.get(c["name"])) for c in columns]
+            if extractor.extended:
+                histograms = self._run(lambda connection: self.create_table_extractor(
+                    connection, extractor.table_name)._get_histograms(ret))
+                for column in ret:
+                    if column.name in histograms:
+                        column.histogram = histograms[column.name]
+        return Table(extractor.table_name, aggregates.rows_count, ret)
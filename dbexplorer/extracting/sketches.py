@@ -0,0 +1,291 @@
+"""
+mergeable sketches of column values - their states can be stored, merged and give approximate statistics
+"""
+
+import base64
+import hashlib
+import heapq
+import math
+import random
+from typing import Any, Mapping, Sequence, Tuple
+
+
+def hash64(value: Any) -> int:
+    """
+    :param value: value to be hashed (by its string representation)
+    :return: 64-bit hash of value
+    """
+    return int.from_bytes(hashlib.blake2b(str(value).encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class HyperLogLog:
+    """
+    Approximate number of distinct values (HyperLogLog), relative error is about 1.04 / sqrt(2 ** precision)
+    """
+
+    def __init__(self, precision: int = 12, registers: bytes = None):
+        """
+        :param precision: number of bits used for register index
+        :param registers: state of registers (new sketch if not given)
+        """
+        self.precision = precision
+        self.registers = bytearray(1 << precision) if registers is None else bytearray(registers)
+
+    def add(self, value: Any) -> None:
+        self.add_hash(hash64(value))
+
+    def add_hash(self, hashed: int) -> None:
+        index = hashed >> (64 - self.precision)
+        rest = hashed & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        if other.precision != self.precision:
+            raise ValueError("Sketches of different precision can not be merged")
+        return HyperLogLog(self.precision, bytes(max(a, b) for a, b in zip(self.registers, other.registers)))
+
+    def count(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros > 0:
+            # small range correction (linear counting)
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def to_dict(self) -> Mapping[str, Any]:
+        return {"precision": self.precision, "registers": base64.b64encode(bytes(self.registers)).decode('ascii')}
+
+    @staticmethod
+    def from_dict(data: Mapping[str, Any]) -> 'HyperLogLog':
+        return HyperLogLog(data["precision"], base64.b64decode(data["registers"]))
+
+
+class TopK:
+    """
+    Most frequent values - counters of at most 2 * capacity values, least frequent are pruned when it is exceeded.
+    Counts of values are lower bounds, exact as long as there are at most 2 * capacity distinct values.
+    """
+
+    def __init__(self, capacity: int = 100, counters: Sequence[Tuple[Any, int]] = None):
+        """
+        :param capacity: number of kept values
+        :param counters: pairs of value and its count (new sketch if not given)
+        """
+        self.capacity = capacity
+        self.counters = {} if counters is None else dict((value, count) for value, count in counters)
+
+    def add(self, value: Any, count: int = 1) -> None:
+        self.counters[value] = self.counters.get(value, 0) + count
+        if len(self.counters) > 2 * self.capacity:
+            self._prune()
+
+    def _prune(self) -> None:
+        self.counters = dict(self.top(self.capacity))
+
+    def merge(self, other: 'TopK') -> 'TopK':
+        ret = TopK(self.capacity, self.counters.items())
+        for value, count in other.counters.items():
+            ret.counters[value] = ret.counters.get(value, 0) + count
+        if len(ret.counters) > 2 * ret.capacity:
+            ret._prune()
+        return ret
+
+    def top(self, number: int) -> Sequence[Tuple[Any, int]]:
+        """
+        :param number: number of values
+        :return: most frequent values with their counts
+        """
+        return sorted(self.counters.items(), key=lambda x: x[1], reverse=True)[:number]
+
+    def to_dict(self) -> Mapping[str, Any]:
+        return {"capacity": self.capacity, "counters": [[value, count] for value, count in self.counters.items()]}
+
+    @staticmethod
+    def from_dict(data: Mapping[str, Any]) -> 'TopK':
+        return TopK(data["capacity"], data["counters"])
+
+
+class QuantileSketch:
+    """
+    Approximate quantiles (KLL sketch) - compactors of geometrically decreasing capacities,
+    item on level i stands for 2 ** i values
+    """
+
+    def __init__(self, k: int = 200, levels: Sequence[Sequence[float]] = None):
+        """
+        :param k: capacity of the top compactor, error is about 1.7 / k
+        :param levels: items of compactors (new sketch if not given)
+        """
+        self.k = k
+        self.levels = [[]] if levels is None else [list(level) for level in levels]
+
+    def _capacity(self, level: int) -> int:
+        return max(2, int(math.ceil(self.k * (2 / 3) ** (len(self.levels) - level - 1))))
+
+    def add(self, value: float) -> None:
+        self.levels[0].append(value)
+        if len(self.levels[0]) > self._capacity(0):
+            self._compress()
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            if len(self.levels[level]) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append([])
+                items = sorted(self.levels[level])
+                # odd item stays on its level so the total weight does not change
+                self.levels[level] = [items.pop()] if len(items) % 2 else []
+                self.levels[level + 1].extend(items[random.randint(0, 1)::2])
+            level += 1
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        ret = QuantileSketch(self.k, self.levels)
+        for level, items in enumerate(other.levels):
+            if level == len(ret.levels):
+                ret.levels.append([])
+            ret.levels[level].extend(items)
+        ret._compress()
+        return ret
+
+    def count(self) -> int:
+        return sum(len(items) << level for level, items in enumerate(self.levels))
+
+    def quantiles(self, fractions: Sequence[float]) -> Sequence[float]:
+        """
+        :param fractions: fractions (0 - 1) of values
+        :return: approximate quantiles (empty if there are no values)
+        """
+        weighted = sorted((item, 1 << level) for level, items in enumerate(self.levels) for item in items)
+        total = sum(weight for _, weight in weighted)
+        if total == 0:
+            return []
+        ret = []
+        for fraction in fractions:
+            cumulative = 0
+            for item, weight in weighted:
+                cumulative += weight
+                if cumulative >= fraction * total:
+                    ret.append(item)
+                    break
+        return ret
+
+    def histogram(self, minimum: float, maximum: float, buckets: int) -> Sequence[int]:
+        """
+        :param minimum: min of values
+        :param maximum: max of values (greater than min)
+        :param buckets: number of buckets
+        :return: approximate counts of values in equal-width buckets between min and max
+        """
+        counts = [0] * buckets
+        for level, items in enumerate(self.levels):
+            for item in items:
+                bucket = int((item - minimum) * buckets / (maximum - minimum))
+                counts[min(max(bucket, 0), buckets - 1)] += 1 << level
+        return counts
+
+    def to_dict(self) -> Mapping[str, Any]:
+        return {"k": self.k, "levels": self.levels}
+
+    @staticmethod
+    def from_dict(data: Mapping[str, Any]) -> 'QuantileSketch':
+        return QuantileSketch(data["k"], data["levels"])
+
+
+class BloomFilter:
+    """
+    Set membership with false positives (no false negatives), k bit positions per value derived from its 64-bit hash
+    """
+
+    def __init__(self, bits: int, hashes: int = 7, data: bytes = None):
+        """
+        :param bits: size of filter, about 10 bits per value give 1 % of false positives with 7 hashes
+        :param hashes: number of bit positions per value
+        :param data: state of filter (new filter if not given)
+        """
+        self.bits = bits
+        self.hashes = hashes
+        self.data = bytearray((bits + 7) // 8) if data is None else bytearray(data)
+
+    def _positions(self, hashed: int) -> Sequence[int]:
+        # double hashing - positions h1 + i * h2 behave like independent hashes
+        h1 = hashed & 0xffffffff
+        h2 = (hashed >> 32) | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def add(self, value: Any) -> None:
+        self.add_hash(hash64(value))
+
+    def add_hash(self, hashed: int) -> None:
+        for position in self._positions(hashed):
+            self.data[position >> 3] |= 1 << (position & 7)
+
+    def contains_hash(self, hashed: int) -> bool:
+        return all(self.data[position >> 3] & (1 << (position & 7)) for position in self._positions(hashed))
+
+    def __contains__(self, value: Any) -> bool:
+        return self.contains_hash(hash64(value))
+
+    def to_dict(self) -> Mapping[str, Any]:
+        return {"bits": self.bits, "hashes": self.hashes, "data": base64.b64encode(bytes(self.data)).decode('ascii')}
+
+    @staticmethod
+    def from_dict(data: Mapping[str, Any]) -> 'BloomFilter':
+        return BloomFilter(data["bits"], data["hashes"], base64.b64decode(data["data"]))
+
+
+class BottomK:
+    """
+    Hashes of distinct values with k smallest hashes (MinHash bottom-k sketch) - uniform sample of distinct values,
+    fraction of them present in other set estimates containment in that set
+    """
+
+    def __init__(self, k: int = 128, hashes: Sequence[int] = None):
+        """
+        :param k: number of kept hashes
+        :param hashes: kept hashes (new sketch if not given)
+        """
+        self.k = k
+        # max-heap of kept hashes (negated)
+        self._heap = [] if hashes is None else [-h for h in sorted(set(hashes))[:k]]
+        heapq.heapify(self._heap)
+        self._kept = set(-h for h in self._heap)
+
+    def add(self, value: Any) -> None:
+        self.add_hash(hash64(value))
+
+    def add_hash(self, hashed: int) -> None:
+        if hashed in self._kept:
+            return
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, -hashed)
+            self._kept.add(hashed)
+        elif hashed < -self._heap[0]:
+            self._kept.discard(-heapq.heappushpop(self._heap, -hashed))
+            self._kept.add(hashed)
+
+    @property
+    def hashes(self) -> Sequence[int]:
+        return sorted(self._kept)
+
+    def merge(self, other: 'BottomK') -> 'BottomK':
+        return BottomK(self.k, list(self._kept) + list(other._kept))
+
+    def count(self) -> int:
+        """
+        :return: estimated number of distinct values
+        """
+        if len(self._heap) < self.k:
+            return len(self._heap)
+        return int((self.k - 1) * 2 ** 64 / (-self._heap[0] + 1))
+
+    def to_dict(self) -> Mapping[str, Any]:
+        return {"k": self.k, "hashes": self.hashes}
+
+    @staticmethod
+    def from_dict(data: Mapping[str, Any]) -> 'BottomK':
+        return BottomK(data["k"], data["hashes"])
@@ -1,20 +1,76 @@
-from typing import Tuple, Type
+from typing import Tuple, Type, Iterator
 from dbexplorer.extracting.base_extractors import DbExtractor, TableExtractor
 import pyodbc
+import re
 from collections import defaultdict
 from dbexplorer.extracting.db_types import *
-from dbexplorer.extracting.common import check_result_empty, TOO_LONG_TEXT_WARNING, get_text_len
+from dbexplorer.extracting.common import check_result_empty, get_text_len, ColumnStats, \
+    get_max_min, fetch_in_batches, get_rows_sql, get_histograms, float_literal, HISTOGRAM_BUCKETS, \
+    get_unique_distinct_count, display_text, get_nulls_counts
+
+# sql types by codes used in DBC.COLUMNS
+TYPE_CODES = {
+    "A1": "ARRAY",
+    "AN": "MULTI-DIMENSIONAL ARRAY",
+    "AT": "TIME",
+    "BF": "BYTE",
+    "BO": "BLOB",
+    "BV": "VARBYTE",
+    "CF": "CHARACTER",
+    "CO": "CLOB",
+    "CV": "VARCHAR",
+    "D": "DECIMAL",
+    "DA": "DATE",
+    "DH": "INTERVAL DAY TO HOUR",
+    "DM": "INTERVAL DAY TO MINUTE",
+    "DS": "INTERVAL DAY TO SECOND",
+    "DY": "INTERVAL DAY",
+    "F": "FLOAT",
+    "HM": "INTERVAL HOUR TO MINUTE",
+    "HS": "INTERVAL HOUR TO SECOND",
+    "HR": "INTERVAL HOUR",
+    "I": "INTEGER",
+    "I1": "BYTEINT",
+    "I2": "SMALLINT",
+    "I8": "BIGINT",
+    "JN": "JSON",
+    "MI": "INTERVAL MINUTE",
+    "MO": "INTERVAL MONTH",
+    "MS": "INTERVAL MINUTE TO SECOND",
+    "N": "NUMBER",
+    "PD": "PERIOD(DATE)",
+    "PM": "PERIOD(TIMESTAMP WITH TIME ZONE)",
+    "PS": "PERIOD(TIMESTAMP)",
+    "PT": "PERIOD(TIME)",
+    "PZ": "PERIOD(TIME WITH TIME ZONE)",
+    "SC": "INTERVAL SECOND",
+    "SZ": "TIMESTAMP WITH TIME ZONE",
+    "TS": "TIMESTAMP",
+    "TZ": "TIME WITH TIME ZONE",
+    "UT": "UDT Type",
+    "XM": "XML",
+    "YM": "INTERVAL YEAR TO MONTH",
+    "YR": "INTERVAL YEAR",
+}
 
 
 class TeradataDbExtractor(DbExtractor):
 
+    # query band of sessions (name: value), used by workload management and for monitoring
+    SESSION_SETTINGS = {"ApplicationName": "dbexplorer"}
+    # load is not reported by a cheap statement (ResUsage tables need to be enabled), only latency is probed
+    LOAD_STATEMENT = None
+
     def __init__(self, server_address: str, port: int, db_name: str, user: str, password: str,
-                 extended: bool, top_number: int, schema: str, odbc_driver: str, max_text_len: str):
+                 extended: bool, top_number: int, schema: str, odbc_driver: str, max_text_len: str, **kwargs):
         super(TeradataDbExtractor, self).__init__(server_address, port, db_name, user, password, extended, top_number,
-                                                  schema, odbc_driver, max_text_len)
+                                                  schema, odbc_driver, max_text_len, **kwargs)
 
     def _get_tables_names(self) -> Sequence[str]:
-        qry = f"SELECT TableName FROM dbc.tables WHERE tablekind = 'T' and databasename='{self.db_name}';"
+        qry = f"""SELECT TableName FROM dbc.tables t WHERE tablekind = 'T' and databasename='{self.db_name}'
+                   {self.filters.tables_condition("TRIM(t.TableName)")}
+                   {self.filters.rows_condition('''(SELECT MAX(s.RowCount) FROM DBC.StatsV s
+                   WHERE s.DatabaseName = t.DatabaseName AND s.TableName = t.TableName)''')};"""
         cursor = self.db_connection.cursor()
         results = cursor.execute(qry)
         tables = []
@@ -22,11 +78,38 @@ class TeradataDbExtractor(DbExtractor):
             tables.append(table[0].strip())
         return tables
 
+    def _get_tables_rows_estimates(self) -> Mapping[str, int]:
+        cursor = self.db_connection.cursor()
+        cursor.execute(f"""SELECT TRIM(TableName), MAX(RowCount) FROM DBC.StatsV
+                           WHERE DatabaseName = '{self.db_name}' GROUP BY 1""")
+        return {name: int(rows) for name, rows in cursor.fetchall() if rows is not None}
+
     def connect(self, server_address: str, port: int, db_name: str, user: str, password: str) -> Any:
         pyodbc.pooling = False
         connection_string = f"DRIVER={{{self.odbc_driver}}};DBCNAME={server_address};UID={user};PWD={password}"
         return pyodbc.connect(connection_string, autocommit=True)
 
+    def _configure_session(self, connection: Any) -> Any:
+        cursor = connection.cursor()
+        # selects of read uncommitted transactions take access locks, so they do not wait for ETL write locks
+        # (Teradata has no snapshots, statements of a table are not run in one consistent transaction)
+        cursor.execute("SET SESSION CHARACTERISTICS AS TRANSACTION ISOLATION LEVEL READ UNCOMMITTED;")
+        if len(self.session_settings):
+            query_band = "".join(f"{name}={value};" for name, value in self.session_settings.items())
+            cursor.execute(f"SET QUERY_BAND = '{query_band}' FOR SESSION;")
+        return connection
+
+    def explain_cost(self, cursor: Any, sql: str) -> float:
+        cursor.execute("EXPLAIN " + sql.strip().rstrip(";"))
+        plan = " ".join([row[0] for row in cursor.fetchall()])
+        # e.g. "The total estimated time is 1 hour and 3.20 seconds."
+        match = re.search(r"total estimated time is ([^.]*(?:\.\d+)?)[^.]*\.", plan, re.IGNORECASE)
+        if match is None:
+            return None
+        units = {"hour": 3600, "minute": 60, "second": 1}
+        return sum(float(value) * units[unit] for value, unit in
+                   re.findall(r"([\d.]+) (hour|minute|second)", match.group(0)))
+
     @property
     def table_extractor_class(self) -> Type:
         return TeradataTableExtractor
@@ -35,10 +118,16 @@ class TeradataDbExtractor(DbExtractor):
 class TeradataTableExtractor(TableExtractor):
 
     def __init__(self, db_connection: Any, table_name: str, extended: bool, top_number: int, db_name: str,
-                 max_text_len: str):
+                 max_text_len: str, **kwargs):
         super(TeradataTableExtractor, self).__init__(db_connection, table_name, extended, top_number, db_name,
-                                                     max_text_len)
+                                                     max_text_len, **kwargs)
         self.rows_count = None
+        self._catalog_column_stats = None
+        self._catalog_rows_count = None
+        self._indexed_columns = None
+        self._unique_columns = None
+        # max lengths of texts found by grouping of text columns
+        self._text_lengths = {}
 
     def _map_sql_types(self, sql_type: str) -> ColumnType:
         types = {
@@ -60,12 +149,75 @@ class TeradataTableExtractor(TableExtractor):
         return types[sql_type] if sql_type in types else ColumnType.NONE
 
     def get_rows_count(self) -> int:
+        if self.rows_count is None and self.catalog_stats:
+            if self._catalog_column_stats is None:
+                self._catalog_column_stats = self._read_catalog_stats()
+            self.rows_count = self._catalog_rows_count
         if self.rows_count is None:
             cursor = self.db_connection.cursor()
             results = cursor.execute(f"select count(*) from {self.db_name}.{self.table_name}")
             self.rows_count = results.fetchone()[0]
         return self.rows_count
 
+    def _get_catalog_column_stats(self, column_name: str) -> ColumnStats:
+        """
+        Statistics of column collected by COLLECT STATISTICS, available only in catalog mode
+        :param column_name: name of column
+        :return: column statistics or None if there are no collected stats on this column
+        """
+        if not self.catalog_stats:
+            return None
+        if self._catalog_column_stats is None:
+            self._catalog_column_stats = self._read_catalog_stats()
+        return self._catalog_column_stats.get(column_name)
+
+    def _read_catalog_stats(self) -> Mapping[str, ColumnStats]:
+        # DBC.StatsV has no values of the collected histograms, so top values and quartiles are not in catalog stats
+        cursor = self.db_connection.cursor()
+        cursor.execute(f"""SELECT TRIM(ColumnName), RowCount, UniqueValueCount, NullCount FROM DBC.StatsV
+                           WHERE DatabaseName = '{self.db_name}' AND TableName = '{self.table_name}'""")
+        stats = {}
+        summary_rows_count = None
+        max_rows_count = None
+        for column_name, rows_count, unique_count, nulls_count in cursor.fetchall():
+            # summary statistics (no column) hold the row count of the table
+            if column_name is None:
+                summary_rows_count = rows_count
+                continue
+            if rows_count is not None and (max_rows_count is None or max_rows_count < rows_count):
+                max_rows_count = rows_count
+            # multi-column statistics do not describe a single column
+            if "," in column_name:
+                continue
+            stats[column_name] = ColumnStats(
+                null_fraction=None if not rows_count or nulls_count is None else float(nulls_count) / rows_count,
+                distinct_count=None if unique_count is None else int(unique_count))
+
+        rows_count = summary_rows_count if summary_rows_count is not None else max_rows_count
+        self._catalog_rows_count = None if rows_count is None else int(rows_count)
+        return stats
+
+    def _get_distinct_estimates(self) -> Mapping[str, float]:
+        if self._catalog_column_stats is None:
+            self._catalog_column_stats = self._read_catalog_stats()
+        return {name: stats.distinct_count for name, stats in self._catalog_column_stats.items()
+                if stats.distinct_count is not None}
+
+    def _get_indexed_columns(self) -> Mapping[str, str]:
+        """
+        Leading columns of indexes (primary and secondary) of the table
+        :return: index type by column name
+        """
+        if self._indexed_columns is None:
+            cursor = self.db_connection.cursor()
+            cursor.execute(f"""SELECT TRIM(ColumnName), IndexType FROM DBC.IndicesV
+                               WHERE DatabaseName = '{self.db_name}' AND TableName = '{self.table_name}'
+                               AND ColumnPosition = 1""")
+            self._indexed_columns = {}
+            for column_name, index_type in cursor.fetchall():
+                self._indexed_columns.setdefault(column_name, index_type)
+        return self._indexed_columns
+
     def get_columns_by_simple_types(self, columns_names: Sequence[str], columns_sql_types: Sequence[str]) \
             -> Mapping[str, Sequence[Mapping[str, str]]]:
         columns_by_simple_types = defaultdict(list)
@@ -96,96 +248,126 @@ class TeradataTableExtractor(TableExtractor):
     def _extract_column_names_and_types(self) -> Tuple[Sequence[str], Sequence[str]]:
         cursor = self.db_connection.cursor()
         cursor.execute(f"""select trim(ColumnName) AS colname, trim(ColumnType) AS coltype FROM DBC.COLUMNS 
-                            where DatabaseName = '{self.db_name}' and TableName = '{self.table_name}'""")
+                            where DatabaseName = '{self.db_name}' and TableName = '{self.table_name}'
+                            {self.filters.columns_condition("TRIM(ColumnName)")}
+                            {self._types_condition()}""")
         fetched = cursor.fetchall()
         return [info[0] for info in fetched], [self.convert_to_sql(info[1]) for info in fetched]
 
+    def _types_condition(self) -> str:
+        """
+        Types are stored as codes in DBC.COLUMNS, so type patterns are matched in python and rendered as list of codes
+        :return: condition to be appended to where clause (empty or starting with AND)
+        """
+        if not self.filters.has_types_filter():
+            return ""
+        if self.filters.matches_type("TD_ANYTYPE"):
+            codes = [code for code, sql_type in TYPE_CODES.items() if not self.filters.matches_type(sql_type)]
+            return "" if not len(codes) else " AND TRIM(ColumnType) NOT IN (" + ", ".join(
+                [f"'{code}'" for code in codes]) + ")"
+        codes = [code for code, sql_type in TYPE_CODES.items() if self.filters.matches_type(sql_type)]
+        return " AND TRIM(ColumnType) IN (" + ", ".join([f"'{code}'" for code in codes] or ["''"]) + ")"
+
+    def _get_nullable(self, columns: Sequence[Mapping[str, str]]) -> Mapping[str, bool]:
+        if not len(columns):
+            return {}
+        names = ", ".join([f"""'{c["name"]}'""" for c in columns])
+        cursor = self.db_connection.cursor()
+        cursor.execute(f"""select TRIM(ColumnName), NULLABLE from DBC.COLUMNS where DatabaseName = '{self.db_name}'
+                            and TableName = '{self.table_name}' and TRIM(ColumnName) in ({names});""")
+        return {name: nullable == 'Y' for name, nullable in cursor.fetchall()}
+
     @staticmethod
-    def convert_to_sql(db_type):
-        if db_type == "A1":
-            return "ARRAY"
-        elif db_type == "AN":
-            return "MULTI-DIMENSIONAL ARRAY"
-        elif db_type == "AT":
-            return "TIME"
-        elif db_type == "BF":
-            return "BYTE"
-        elif db_type == "BO":
-            return "BLOB"
-        elif db_type == "BV":
-            return "VARBYTE"
-        elif db_type == "CF":
-            return "CHARACTER"
-        elif db_type == "CO":
-            return "CLOB"
-        elif db_type == "CV":
-            return "VARCHAR"
-        elif db_type == "D":
-            return "DECIMAL"
-        elif db_type == "DA":
-            return "DATE"
-        elif db_type == "DH":
-            return "INTERVAL DAY TO HOUR"
-        elif db_type == "DM":
-            return "INTERVAL DAY TO MINUTE"
-        elif db_type == "DS":
-            return "INTERVAL DAY TO SECOND"
-        elif db_type == "DY":
-            return "INTERVAL DAY"
-        elif db_type == "F":
-            return "FLOAT"
-        elif db_type == "HM":
-            return "INTERVAL HOUR TO MINUTE"
-        elif db_type == "HS":
-            return "INTERVAL HOUR TO SECOND"
-        elif db_type == "HR":
-            return "INTERVAL HOUR"
-        elif db_type == "I":
-            return "INTEGER"
-        elif db_type == "I1":
-            return "BYTEINT"
-        elif db_type == "I2":
-            return "SMALLINT"
-        elif db_type == "I8":
-            return "BIGINT"
-        elif db_type == "JN":
-            return "JSON"
-        elif db_type == "MI":
-            return "INTERVAL MINUTE"
-        elif db_type == "MO":
-            return "INTERVAL MONTH"
-        elif db_type == "MS":
-            return "INTERVAL MINUTE TO SECOND"
-        elif db_type == "N":
-            return "NUMBER"
-        elif db_type == "PD":
-            return "PERIOD(DATE)"
-        elif db_type == "PM":
-            return "PERIOD(TIMESTAMP WITH TIME ZONE)"
-        elif db_type == "PS":
-            return "PERIOD(TIMESTAMP)"
-        elif db_type == "PT":
-            return "PERIOD(TIME)"
-        elif db_type == "PZ":
-            return "PERIOD(TIME WITH TIME ZONE)"
-        elif db_type == "SC":
-            return "INTERVAL SECOND"
-        elif db_type == "SZ":
-            return "TIMESTAMP WITH TIME ZONE"
-        elif db_type == "TS":
-            return "TIMESTAMP"
-        elif db_type == "TZ":
-            return "TIME WITH TIME ZONE"
-        elif db_type == "UT":
-            return "UDT Type"
-        elif db_type == "XM":
-            return "XML"
-        elif db_type == "YM":
-            return "INTERVAL YEAR TO MONTH"
-        elif db_type == "YR":
-            return "INTERVAL YEAR"
+    def _epoch_sql(value_sql: str, sql_type: str) -> str:
+        """
+        :param value_sql: sql expression of date or timestamp
+        :param sql_type: sql type of value
+        :return: sql expression of seconds since 1970-01-01
+        """
+        days_sql = f"(CAST({value_sql} AS DATE) - DATE '1970-01-01') * 86400.0"
+        if sql_type == "DATE":
+            return f"({days_sql})"
+        return f"({days_sql} + EXTRACT(HOUR FROM {value_sql}) * 3600 + EXTRACT(MINUTE FROM {value_sql}) * 60 " \
+               f"+ EXTRACT(SECOND FROM {value_sql}))"
+
+    def _get_bucket_sql(self, column: Column) -> str:
+        """
+        :param column: extracted extended column
+        :return: sql expression of histogram bucket number (0 - HISTOGRAM_BUCKETS), None if column has no histogram
+        """
+        if isinstance(column, ExtendedNumericColumn) and column.min is not None and column.min != column.max:
+            value_sql, min_sql, max_sql = f'CAST("{column.name}" AS FLOAT)', float_literal(column.min), \
+                                          float_literal(column.max)
+        elif isinstance(column, ExtendedDatetimeColumn) and column.sql_type in ("DATE", "TIMESTAMP") \
+                and column.min != "None" and column.min != column.max:
+            value_sql = self._epoch_sql(f'"{column.name}"', column.sql_type)
+            min_sql = self._epoch_sql(f"{column.sql_type} '{column.min}'", column.sql_type)
+            max_sql = self._epoch_sql(f"{column.sql_type} '{column.max}'", column.sql_type)
         else:
-            return "TD_ANYTYPE"
+            return None
+        return f"FLOOR(({value_sql} - {min_sql}) * {HISTOGRAM_BUCKETS} / ({max_sql} - {min_sql}))"
+
+    def _get_histograms(self, columns: Sequence[Column]) -> Mapping[str, Sequence[int]]:
+        buckets_sql = {c.name: self._get_bucket_sql(c) for c in columns}
+        return get_histograms({name: sql for name, sql in buckets_sql.items() if sql is not None},
+                              f"{self.db_name}.{self.table_name}", self.db_connection)
+
+    def _get_relation(self) -> str:
+        return f"{self.db_name}.{self.table_name}"
+
+    def _get_primary_key(self) -> Sequence[str]:
+        cursor = self.db_connection.cursor()
+        cursor.execute(f"""select TRIM(ColumnName) from DBC.IndicesV where DatabaseName = '{self.db_name}'
+                            and TableName = '{self.table_name}' and IndexType = 'K' order by ColumnPosition;""")
+        return [row[0] for row in cursor.fetchall()]
+
+    def _get_unique_columns(self) -> Sequence[str]:
+        if self._unique_columns is None:
+            # unique primary index, unique secondary index, primary key or unique constraint on single column
+            cursor = self.db_connection.cursor()
+            cursor.execute(f"""select TRIM(max(ColumnName)) from DBC.IndicesV where DatabaseName = '{self.db_name}'
+                                and TableName = '{self.table_name}' and UniqueFlag = 'Y'
+                                group by IndexNumber having count(*) = 1;""")
+            self._unique_columns = [row[0] for row in cursor.fetchall()]
+        return self._unique_columns
+
+    def _get_shard_column(self) -> str:
+        # rows are distributed by hash of primary index, so only ranges of the partitioning column (PPI)
+        # are read without full table scan
+        cursor = self.db_connection.cursor()
+        cursor.execute(f"""select ConstraintText from DBC.PartitioningConstraintsV
+                            where DatabaseName = '{self.db_name}' and TableName = '{self.table_name}';""")
+        for row in cursor.fetchall():
+            match = re.search(r'RANGE_N\s*\(\s*"?(\w+)"?', row[0] or "", re.IGNORECASE)
+            if match is not None:
+                return match.group(1)
+        return None
+
+    def _get_max_min(self, column_name: str) -> Tuple[Any, Any]:
+        return get_max_min([column_name], self._get_indexed_columns(), lambda name: f'max("{name}"), min("{name}")',
+                           f"{self.db_name}.{self.table_name}", self.db_connection)[column_name]
+
+    def _count_missing_values(self, column_name: str, referenced_table: str, referenced_column: str) -> int:
+        cursor = self.db_connection.cursor()
+        cursor.execute(f"""SELECT COUNT(*) FROM (
+                               SELECT DISTINCT t."{column_name}" FROM {self.db_name}.{self.table_name} t
+                           WHERE t."{column_name}" IS NOT NULL AND NOT EXISTS (
+                               SELECT 1 FROM {self.db_name}.{referenced_table} r
+                               WHERE r."{referenced_column}" = t."{column_name}")) AS missing;""")
+        return cursor.fetchone()[0]
+
+    def iter_rows(self, columns_names: Sequence[str], bounds: Sequence[Tuple[str, str, Any]] = (),
+                  distinct: bool = False, limit: int = None) -> Iterator[Sequence[Any]]:
+        sql, params = get_rows_sql(columns_names, f"{self.db_name}.{self.table_name}", bounds, '"{}"', '?', distinct)
+        if limit is not None:
+            sql = f"SELECT TOP {int(limit)} * FROM ({sql}) AS limited"
+        cursor = self.db_connection.cursor()
+        cursor.execute(sql, *params)
+        return fetch_in_batches(cursor)
+
+    @staticmethod
+    def convert_to_sql(db_type):
+        return TYPE_CODES.get(db_type, "TD_ANYTYPE")
 
     @staticmethod
     def _get_basic_columns(columns: Sequence[Mapping[str, str]]) -> Sequence[Column]:
@@ -195,21 +377,42 @@ class TeradataTableExtractor(TableExtractor):
         return ret
 
     def _are_texts_longer_than_max(self, column_name: str) -> bool:
+        if column_name in self._text_lengths:
+            max_len = self._text_lengths[column_name]
+            return max_len is not None and max_len > self.max_text_len
         max_len = get_text_len(column_name, self.db_name + "." + self.table_name, self.db_connection)
         return max_len is not None and max_len > self.max_text_len
 
     def _get_basic_text_columns(self, columns: Sequence[Mapping[str, str]]) -> Sequence[TextColumn]:
         ret = []
         cursor = self.db_connection.cursor()
+        unique = [c for c in columns if c["name"] in self._get_unique_columns()]
+        nullable = self._get_nullable(unique)
         for c in columns:
-            if self._are_texts_longer_than_max(c["name"]):
-                ret.append(TextColumn(c["name"], c["sql_type"], [TOO_LONG_TEXT_WARNING], []))
+            if c in unique and nullable.get(c["name"]) is False:
+                # every value occurs once, so any values are the most common ones
+                cursor.execute(f"""SELECT top {self.top_number} SUBSTR("{c["name"]}", 1, {self.max_text_len}),
+                                   CHARACTER_LENGTH("{c["name"]}") from {self.db_name}.{self.table_name};""")
+                result = cursor.fetchall()
+                ret.append(TextColumn(c["name"], c["sql_type"],
+                                      [display_text(r[0], r[1], self.max_text_len) for r in result],
+                                      [1 for _ in result]))
             else:
-                cursor.execute(f"""SELECT top {self.top_number}  "{c["name"]}", count(*) from {self.db_name}.{self.table_name}
-                            GROUP BY "{c["name"]}"
-                            ORDER BY count(*) DESC ;""")
+                # grouping by row hash, so spool does not depend on length of texts, only prefixes of the top
+                # values are displayed, max length of the column is computed in the same pass
+                # (HASHROW has 32 bits - counts of colliding texts are merged)
+                cursor.execute(f"""SELECT MIN(SUBSTR("{c["name"]}", 1, {self.max_text_len})), count(*),
+                                   MAX(CHARACTER_LENGTH("{c["name"]}")),
+                                   MAX(MAX(CHARACTER_LENGTH("{c["name"]}"))) OVER ()
+                                   from {self.db_name}.{self.table_name}
+                                   GROUP BY HASHROW("{c["name"]}")
+                                   QUALIFY ROW_NUMBER() OVER (ORDER BY count(*) DESC) <= {self.top_number}
+                                   ORDER BY count(*) DESC;""")
                 result = cursor.fetchall()
-                ret.append(TextColumn(c["name"], c["sql_type"], [r[0] for r in result], [r[1] for r in result]))
+                self._text_lengths[c["name"]] = result[0][3] if len(result) else None
+                ret.append(TextColumn(c["name"], c["sql_type"],
+                                      [display_text(r[0], r[2], self.max_text_len) for r in result],
+                                      [r[1] for r in result]))
         return ret
 
     def _get_basic_numeric_columns(self, columns: Sequence[Mapping[str, str]]) -> Sequence[NumericColumn]:
@@ -236,19 +439,15 @@ class TeradataTableExtractor(TableExtractor):
 
     def _get_basic_datetime_columns(self, columns: Sequence[Mapping[str, str]]) -> Sequence[DatetimeColumn]:
         ret = []
-        sql = ""
-        for i, c in enumerate(columns):
-            sql += f'max("{c["name"]}"), min("{c["name"]}")'
-            if i < len(columns) - 1:
-                sql += ", "
-        cursor = self.db_connection.cursor()
-        cursor.execute(f"""SELECT {sql} from {self.db_name}.{self.table_name};""")
-        result = cursor.fetchone()
+        # max and min of secondary indexed columns are read from (smaller) index subtable
+        result = get_max_min([c["name"] for c in columns], self._get_indexed_columns(),
+                             lambda name: f'max("{name}"), min("{name}")', f"{self.db_name}.{self.table_name}",
+                             self.db_connection)
 
-        for i, c in enumerate(columns):
+        for c in columns:
             ret.append(DatetimeColumn(c["name"], c["sql_type"],
-                                      str(result[2 * i]),
-                                      str(result[2 * i + 1])
+                                      str(result[c["name"]][0]),
+                                      str(result[c["name"]][1])
                                       ))
         return ret
 
@@ -271,43 +470,73 @@ class TeradataTableExtractor(TableExtractor):
 
     def _get_extended_columns(self, columns: Sequence[Mapping[str, str]]) -> Sequence[ExtendedColumn]:
         ret = []
+        nullable = self._get_nullable(columns)
+        columns_stats = {c["name"]: self._get_catalog_column_stats(c["name"]) for c in columns}
+        nulls_counts = get_nulls_counts([c["name"] for c in columns if nullable.get(c["name"], True)
+                                         and (columns_stats[c["name"]] is None
+                                              or columns_stats[c["name"]].null_fraction is None)],
+                                        self.IDENTIFIER_QUOTE, self._get_relation(), self.db_connection)
 
         for c in columns:
-            cursor = self.db_connection.cursor()
-
-            cursor.execute(f"""select NULLABLE from DBC.COLUMNS where DatabaseName = '{self.db_name}' 
-                                and TableName = '{self.table_name}' and ColumnName ='{c["name"]}'; """)
-            is_nullable = cursor.fetchone()[0] == 'Y'
+            is_nullable = nullable.get(c["name"], True)
 
-            cursor.execute(f"""select count(*) from {self.db_name}.{self.table_name} where "{c["name"]}" is NULL;""")
-            nulls_count = cursor.fetchone()[0]
-
-            if self._map_sql_types(c["sql_type"]) == ColumnType.TEXT and self._are_texts_longer_than_max(c["name"]):
-                distinct_count = None
+            stats = columns_stats[c["name"]]
+            if not is_nullable:
+                nulls_percent = 0
+            elif stats is not None and stats.null_fraction is not None:
+                nulls_percent = 100 * stats.null_fraction
+            else:
+                nulls_count = nulls_counts.get(c["name"], 0)
+                nulls_percent = 0 if self.get_rows_count() == 0 else (100 * nulls_count / self.get_rows_count())
+
+            if stats is not None and stats.distinct_count is not None:
+                distinct_count = stats.distinct_count
+            elif c["name"] in self._get_unique_columns():
+                distinct_count = get_unique_distinct_count(self.get_rows_count(),
+                                                           round(nulls_percent * self.get_rows_count() / 100))
             else:
-                cursor.execute(f"""SELECT COUNT(*) FROM 
-                                (SELECT DISTINCT "{c["name"]}" FROM {self.db_name}.{self.table_name}) AS temp;""")
-                distinct_count = cursor.fetchone()[0]
+                distinct_count = self._get_distinct_count(c, nulls_percent > 0)
 
             ret.append(ExtendedNoneTypeColumn(c["name"],
                                               c["sql_type"],
                                               is_nullable,
-                                              0 if self.get_rows_count() == 0 else (100 * nulls_count
-                                                                                    / self.get_rows_count()),
+                                              nulls_percent,
                                               distinct_count))
         return ret
 
+    def _get_distinct_count(self, column: Mapping[str, str], has_nulls: bool) -> int:
+        cursor = self.db_connection.cursor()
+        if self._map_sql_types(column["sql_type"]) == ColumnType.TEXT \
+                and self._are_texts_longer_than_max(column["name"]):
+            # long texts are counted by their row hashes, which are only 32 bits wide, so prefixes and lengths
+            # are compared as well - texts are counted once only if their hashes collide while they have the same
+            # prefix and length (null is counted as a distinct value as well)
+            cursor.execute(f"""SELECT COUNT(*) FROM
+                            (SELECT DISTINCT HASHROW("{column["name"]}"), CHARACTER_LENGTH("{column["name"]}"),
+                                             SUBSTR("{column["name"]}", 1, {self.max_text_len})
+                             FROM {self.db_name}.{self.table_name}) AS temp;""")
+        elif column["name"] in self._get_indexed_columns():
+            # GROUP BY is covered by secondary index subtable and aggregated locally on AMPs for primary index
+            cursor.execute(f"""SELECT COUNT(*) FROM
+                            (SELECT "{column["name"]}" FROM {self.db_name}.{self.table_name}
+                             GROUP BY "{column["name"]}") AS temp;""")
+        else:
+            cursor.execute(f"""SELECT COUNT(*) FROM
+                            (SELECT DISTINCT "{column["name"]}" FROM {self.db_name}.{self.table_name}) AS temp;""")
+        return cursor.fetchone()[0]
+
+    def _get_quartiles(self, column_name: str, count: int) -> Sequence[float]:
+        cursor = self.db_connection.cursor()
+        quartiles_sql = ", ".join(
+            [f'percentile_cont({q}) WITHIN GROUP (ORDER BY "{column_name}")' for q in [0.25, 0.5, 0.75]])
+        cursor.execute(f"""select {quartiles_sql} FROM {self.db_name}.{self.table_name}""")
+        return cursor.fetchone()
+
     def _get_extended_numeric_columns(self, columns: Sequence[Mapping[str, str]]) -> Sequence[ExtendedNumericColumn]:
         ret = []
-        for c in columns:
-            basic_numeric = self._get_basic_numeric_columns([{"name": c["name"], "sql_type": c["sql_type"]}])[0]
-            extended_stats = self._get_extended_columns([{"name": c["name"], "sql_type": c["sql_type"]}])[0]
-
-            cursor = self.db_connection.cursor()
-            quartiles_sql = ", ".join(
-                [f'percentile_cont({q}) WITHIN GROUP (ORDER BY "{c["name"]}")' for q in [0.25, 0.5, 0.75]])
-            cursor.execute(f"""select {quartiles_sql} FROM {self.db_name}.{self.table_name}""")
-            quartiles = cursor.fetchone()
+        for c, basic_numeric, extended_stats in zip(columns, self._get_basic_numeric_columns(columns),
+                                                    self._get_extended_columns(columns)):
+            quartiles = self._get_quartiles(c["name"], None)
 
             ret.append(ExtendedNumericColumn(c["name"], c["sql_type"],
                                              basic_numeric.max, basic_numeric.min, basic_numeric.mean,
@@ -319,9 +548,8 @@ class TeradataTableExtractor(TableExtractor):
 
     def _get_extended_text_columns(self, columns: Sequence[Mapping[str, str]]) -> Sequence[ExtendedTextColumn]:
         ret = []
-        for c in columns:
-            basic_text = self._get_basic_text_columns([{"name": c["name"], "sql_type": c["sql_type"]}])[0]
-            extended_stats = self._get_extended_columns([{"name": c["name"], "sql_type": c["sql_type"]}])[0]
+        for c, basic_text, extended_stats in zip(columns, self._get_basic_text_columns(columns),
+                                                  self._get_extended_columns(columns)):
             ret.append(ExtendedTextColumn(c["name"], c["sql_type"],
                                           basic_text.top,
                                           basic_text.top_values,
@@ -332,9 +560,8 @@ class TeradataTableExtractor(TableExtractor):
 
     def _get_extended_datetime_columns(self, columns: Sequence[Mapping[str, str]]) -> Sequence[ExtendedDatetimeColumn]:
         ret = []
-        for c in columns:
-            basic_datetime = self._get_basic_datetime_columns([{"name": c["name"], "sql_type": c["sql_type"]}])[0]
-            extended_stats = self._get_extended_columns([{"name": c["name"], "sql_type": c["sql_type"]}])[0]
+        for c, basic_datetime, extended_stats in zip(columns, self._get_basic_datetime_columns(columns),
+                                                     self._get_extended_columns(columns)):
             ret.append(ExtendedDatetimeColumn(c["name"], c["sql_type"],
                                               basic_datetime.max,
                                               basic_datetime.min,
@@ -0,0 +1,276 @@
+"""
+throttling of statements sent to a db server, so that profiling of production databases does not hurt them:
+at most a number of statements run at once on the server (shared by all extractors of the server in the process),
+statements scanning a table may be limited to a budget of rows per second (by catalog estimates of tables)
+
+A cheap probe statement is timed (and load of the server read where the db type reports it, e.g. active
+sessions or running threads) at most once per probe interval on a connection of its own. When the server
+is loaded, the number of concurrent statements is halved and new statements are paused with exponential backoff,
+it grows back by one with every probe of idle server. Statements are delayed only before they are sent,
+a running statement is never interrupted.
+"""
+
+import logging
+import re
+import threading
+import time
+from typing import Any, Callable, Mapping
+
+# without max load, the server is loaded when statements of other clients exceed this multiple of the lowest
+# observed number (but at least MIN_LOAD)
+LOAD_FACTOR = 2.0
+MIN_LOAD = 2
+# differences of latencies of probe below this are noise
+MIN_LATENCY = 0.005
+# first and max pause of statements (seconds) when server is loaded
+INITIAL_BACKOFF = 1.0
+MAX_BACKOFF = 60.0
+
+_throttles = {}
+_throttles_lock = threading.Lock()
+
+
+def get_throttle(server: str, **kwargs) -> 'ServerThrottle':
+    """
+    :param server: address (and port) of db server
+    :param kwargs: arguments of ServerThrottle, used if the server has no throttle yet
+    :return: throttle shared by all extractors of the server in this process
+    """
+    with _throttles_lock:
+        if server not in _throttles:
+            _throttles[server] = ServerThrottle(**kwargs)
+        return _throttles[server]
+
+
+def scans_table(sql: str, table_name: str) -> bool:
+    """
+    :param sql: statement
+    :param table_name: name of table
+    :return: if the statement reads the table (the table follows FROM or JOIN, quoted or qualified by schema)
+    """
+    pattern = r'\b(FROM|JOIN)\s+(?:(?:"[^"]*"|`[^`]*`|[\w$]+)\.)*["`]?' + re.escape(table_name) + r'["`]?(?![\w$])'
+    return re.search(pattern, sql, re.IGNORECASE) is not None
+
+
+class ServerThrottle:
+    """
+    Limits of statements sent to one db server, adapted to load of the server
+    """
+
+    def __init__(self, max_concurrency: int = 1, rows_per_second: float = None, max_load: float = None,
+                 latency_factor: float = 3.0, probe_interval: float = 10.0,
+                 connection_factory: Callable[[], Any] = None, probe_statement: str = "SELECT 1",
+                 load_statement: str = None):
+        """
+        :param max_concurrency: max number of statements running at once
+        :param rows_per_second: max estimated rows scanned per second (not limited if not given)
+        :param max_load: server is loaded when load statement gives more statements of other clients (relative
+        to the lowest observed load if not given)
+        :param latency_factor: server is loaded when probe statement takes this multiple of its lowest latency
+        :param probe_interval: min seconds between probes of load
+        :param connection_factory: function giving connection to server used by probes (not probed if not given)
+        :param probe_statement: cheap statement whose latency is measured
+        :param load_statement: statement giving number of running statements (sessions, threads) of server
+        in the last column of its first row (only latency is probed if not given)
+        """
+        self.max_concurrency = max(max_concurrency, 1)
+        self.limit = self.max_concurrency
+        self.rows_per_second = rows_per_second
+        self.max_load = max_load
+        self.latency_factor = latency_factor
+        self.probe_interval = probe_interval
+        self.connection_factory = connection_factory
+        self.probe_statement = probe_statement
+        self.load_statement = load_statement
+        self._condition = threading.Condition()
+        self._active = 0
+        self._paused_until = 0.0
+        self._backoff = INITIAL_BACKOFF
+        # time when the next statement scanning a table fits in the budget of rows
+        self._ready_at = 0.0
+        self._probe_lock = threading.Lock()
+        self._probe_connection = None
+        self._last_probe = None
+        self._min_latency = None
+        self._min_load = None
+        self.latency = None
+        self.load = None
+        self.statements = 0
+        self.backoffs = 0
+        self.waited = 0.0
+
+    def acquire(self) -> None:
+        """
+        Waiting until a statement can be sent (a slot of concurrent statements is free and server is not paused)
+        """
+        self._probe_if_due()
+        start = time.time()
+        with self._condition:
+            while self._active >= self.limit or time.time() < self._paused_until:
+                pause = self._paused_until - time.time()
+                self._condition.wait(pause if pause > 0 else None)
+            self._active += 1
+            self.statements += 1
+            self.waited += time.time() - start
+
+    def release(self) -> None:
+        with self._condition:
+            self._active -= 1
+            self._condition.notify_all()
+
+    def charge(self, rows: int) -> None:
+        """
+        Waiting until a statement scanning rows fits in the budget of rows per second
+        :param rows: estimated number of scanned rows
+        """
+        if self.rows_per_second is None or not rows:
+            return
+        with self._condition:
+            now = time.time()
+            wait = max(self._ready_at - now, 0)
+            self._ready_at = max(self._ready_at, now) + rows / self.rows_per_second
+            self.waited += wait
+        if wait:
+            time.sleep(wait)
+
+    def _probe_if_due(self) -> None:
+        if self.connection_factory is None:
+            return
+        if self._last_probe is not None and time.time() - self._last_probe < self.probe_interval:
+            return
+        # other statements do not wait for a running probe
+        if not self._probe_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_probe = time.time()
+            loaded = self._probe()
+        except Exception as e:
+            logging.warning(f'Probe of server load failed, throttle does not adapt to load: {e}')
+            self.connection_factory = None
+            return
+        finally:
+            self._probe_lock.release()
+
+        with self._condition:
+            if loaded:
+                self.limit = max(self.limit // 2, 1)
+                self._paused_until = time.time() + self._backoff
+                logging.warning(f'Server is loaded (probe latency {self.latency:.3f} s'
+                                + ("" if self.load is None else f", {self.load:.0f} statements of other clients")
+                                + f'), statements paused for {self._backoff:.1f} s, at most {self.limit} at once')
+                self._backoff = min(self._backoff * 2, MAX_BACKOFF)
+                self.backoffs += 1
+            else:
+                self.limit = min(self.limit + 1, self.max_concurrency)
+                self._backoff = INITIAL_BACKOFF
+            self._condition.notify_all()
+
+    def _probe(self) -> bool:
+        """
+        :return: if the server is loaded (latency of probe statement is inflated or other clients run too many
+        statements)
+        """
+        if self._probe_connection is None:
+            self._probe_connection = self.connection_factory()
+        cursor = self._probe_connection.cursor()
+        start = time.time()
+        cursor.execute(self.probe_statement)
+        cursor.fetchall()
+        self.latency = time.time() - start
+        if self.load_statement is not None:
+            cursor.execute(self.load_statement)
+            row = cursor.fetchone()
+            # statements of profiling and the probe itself are not load of other clients
+            self.load = max(float(row[-1]) - self._active - 1, 0)
+        cursor.close()
+        # statistics of server are kept until the end of transaction in some dbs
+        self._probe_connection.rollback()
+
+        self._min_latency = self.latency if self._min_latency is None else min(self._min_latency, self.latency)
+        loaded = self.latency > self.latency_factor * max(self._min_latency, MIN_LATENCY)
+        if self.load is not None:
+            self._min_load = self.load if self._min_load is None else min(self._min_load, self.load)
+            max_load = self.max_load if self.max_load is not None else LOAD_FACTOR * max(self._min_load, MIN_LOAD)
+            loaded = loaded or self.load > max_load
+        return loaded
+
+    def report(self) -> str:
+        """
+        :return: text report of statements, waiting and backoffs of the throttle
+        """
+        return f'Throttle: {self.statements} statements, {self.waited:.1f} s waited, {self.backoffs} backoffs ' \
+               f'because of load, at most {self.limit} of {self.max_concurrency} statements at once'
+
+
+class ThrottledCursor:
+    """
+    Cursor waiting for its throttle before every statement
+    """
+
+    def __init__(self, scope: 'ThrottleScope', cursor: Any):
+        self.scope = scope
+        self.cursor = cursor
+
+    def execute(self, sql: str, *args) -> Any:
+        scope = self.scope
+        if scope.table is not None and scans_table(sql, scope.table):
+            scope.throttle.charge(scope.estimates.get(scope.table) or 0)
+        scope.throttle.acquire()
+        try:
+            return self.cursor.execute(sql, *args)
+        finally:
+            scope.throttle.release()
+
+    def __getattr__(self, name: str) -> Any:
+        # fetch methods, description and other attributes of real cursor
+        return getattr(self.cursor, name)
+
+    def __iter__(self):
+        return iter(self.cursor)
+
+
+class ThrottledConnection:
+    """
+    Connection wrapper throttling statements sent to db
+    """
+
+    def __init__(self, db_connection: Any, scope: 'ThrottleScope'):
+        self.db_connection = db_connection
+        self.scope = scope
+
+    def cursor(self, *args, **kwargs) -> ThrottledCursor:
+        return ThrottledCursor(self.scope, self.db_connection.cursor(*args, **kwargs))
+
+    def __getattr__(self, name: str) -> Any:
+        # commit, rollback, close and other methods of real connection
+        return getattr(self.db_connection, name)
+
+
+class ThrottleScope:
+    """
+    Throttle of connections of one extractor - statements reading the table being extracted are charged
+    with its estimated rows (see DbExtractor throttle arguments)
+    """
+
+    def __init__(self, throttle: ServerThrottle):
+        """
+        :param throttle: throttle of the server (shared with other extractors)
+        """
+        self.throttle = throttle
+        # table being extracted and estimated rows counts of tables by name
+        self.table = None
+        self.estimates = {}
+
+    def wrap(self, db_connection: Any) -> ThrottledConnection:
+        """
+        :param db_connection: connection to db
+        :return: connection throttling its statements
+        """
+        return ThrottledConnection(db_connection, self)
+
+    def start(self, estimates: Mapping[str, int]) -> None:
+        """
+        :param estimates: catalog row counts by table name (tables without estimates may be missing)
+        """
+        self.estimates = estimates
+        self.table = None
@@ -0,0 +1,111 @@
+"""
+bloom filters of all values of low and medium cardinality columns, embedded in the report so that the browser
+can answer which columns may contain a searched value (not only the most common values of the report)
+
+Values are hashed by FNV-1a (32 bits, two offset bases) of their normalized lowercase form, which is simple
+to compute in the browser as well (see SearchModule).
+"""
+
+import logging
+import math
+from typing import Any, Mapping
+
+from dbexplorer.extracting.db_types import *
+from dbexplorer.extracting.keys import normalize_key
+from dbexplorer.extracting.sketches import BloomFilter
+
+FNV_PRIME = 16777619
+FNV_OFFSET_BASIS = 2166136261
+# offset basis of the second hash (double hashing needs two hashes)
+FNV_OFFSET_BASIS_2 = 3735928559
+
+
+def value_hash(value: Any, simple_type: int) -> int:
+    """
+    :param value: value of column
+    :param simple_type: ColumnType of column
+    :return: 64-bit hash of normalized value (two 32-bit FNV-1a hashes), as used by BloomFilter
+    """
+    h1, h2 = FNV_OFFSET_BASIS, FNV_OFFSET_BASIS_2
+    for byte in normalize_key(value, simple_type).lower().encode('utf-8'):
+        h1 = ((h1 ^ byte) * FNV_PRIME) & 0xffffffff
+        h2 = ((h2 ^ byte) * FNV_PRIME) & 0xffffffff
+    return (h2 << 32) | h1
+
+
+def filter_size(values: int, false_positives: float) -> Mapping[str, int]:
+    """
+    :param values: number of distinct values
+    :param false_positives: target rate of false positives
+    :return: optimal number of bits and hashes of bloom filter
+    """
+    bits = max(int(math.ceil(-values * math.log(false_positives) / math.log(2) ** 2)), 64)
+    hashes = max(int(round(bits / max(values, 1) * math.log(2))), 1)
+    return {"bits": bits, "hashes": min(hashes, 16)}
+
+
+class ValueFilters:
+    """
+    Building bloom filters of columns of profiled tables (one distinct scan per column, stopped by the db after max
+    distinct values) within a size budget of the whole report
+    """
+
+    def __init__(self, false_positives: float = 0.01, max_distinct: int = 100000, budget: int = 10 * 1024 * 1024):
+        """
+        :param false_positives: target rate of false positives of filters
+        :param max_distinct: columns with more distinct values get no filter (known by extended stats, unique
+        constraints or catalog estimates, such columns are not scanned)
+        :param budget: max total size of filters in bytes, columns over the budget get no filter
+        """
+        self.false_positives = false_positives
+        self.max_distinct = max_distinct
+        self.budget = budget
+        self.size = 0
+
+    def add_table(self, extractor: 'TableExtractor', table: Table) -> None:
+        """
+        Computing filters of numeric and text columns of profiled table (stored in table.value_filters)
+        :param extractor: extractor of the table
+        :param table: extracted table
+        """
+        if not table.rows_count:
+            return
+        estimates = None
+        unique_columns = extractor._get_unique_columns()
+        for column in table.columns:
+            simple_type = extractor._map_sql_types(column.sql_type)
+            if simple_type not in (ColumnType.NUMERIC, ColumnType.TEXT) or column.sql_type.lower() == "boolean":
+                continue
+            if isinstance(column, ExtendedColumn) and column.unique_number is not None:
+                distinct_count = column.unique_number
+            elif column.name in unique_columns:
+                distinct_count = table.rows_count
+            elif table.rows_count <= self.max_distinct:
+                distinct_count = table.rows_count
+            else:
+                if estimates is None:
+                    estimates = extractor._get_distinct_estimates()
+                distinct_count = estimates.get(column.name)
+            if distinct_count is not None and distinct_count > self.max_distinct:
+                continue
+            if self.size >= self.budget:
+                logging.warning(f'Size budget of value filters is exhausted, no filters after table {table.name}')
+                return
+
+            # values are read only up to max distinct, the filter is sized by the real number of their hashes
+            # (values equal after normalization have the same hash)
+            hashes = set()
+            rows = 0
+            for row in extractor.iter_rows([column.name], [(column.name, "IS NOT NULL", None)], distinct=True,
+                                           limit=self.max_distinct + 1):
+                hashes.add(value_hash(row[0], simple_type))
+                rows += 1
+            if not len(hashes) or rows > self.max_distinct:
+                continue
+            bloom = BloomFilter(**filter_size(len(hashes), self.false_positives))
+            if self.size + len(bloom.data) > self.budget:
+                continue
+            for hashed in hashes:
+                bloom.add_hash(hashed)
+            self.size += len(bloom.data)
+            table.value_filters[column.name] = bloom
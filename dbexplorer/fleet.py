@@ -0,0 +1,226 @@
+"""
+Fleet mode - profiling many servers concurrently from one configuration file, with a global cap of concurrent
+extractions and a cap per server. Every database (and schema) gets its own report, index.html lists all
+of them with status of extraction.
+
+Configuration file (JSON), options are named as command line arguments of dbexplorer, server options
+are defaults of its databases:
+
+    {
+        "concurrency": 8,
+        "per_server": 2,
+        "options": {"extended": true},
+        "servers": [
+            {"name": "pg-main", "database_type": "postgres", "server": "192.2.3.4", "port": 5432,
+             "user": "dbadmin", "password_env": "PG_MAIN_PASSWORD",
+             "databases": ["dvdrental", "sales"], "schemas": ["public", "staging"]},
+            {"name": "td", "database_type": "teradata", "server": "192.168.44.128", "user": "dbc",
+             "password": "dbc", "odbc_driver": "Teradata Database ODBC Driver 16.20", "databases": ["sample1"],
+             "options": {"catalog_stats": true}}
+        ]
+    }
+
+Passwords can be given directly or read from environment variables (password_env).
+"""
+
+import argparse
+import html
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Mapping, Sequence
+
+import simplejson as json
+
+from dbexplorer.config import create_extractor
+from dbexplorer.visualizing import DbVisualizer
+
+# keys of server configuration which are not options of extractor
+SERVER_KEYS = {"name", "databases", "schemas", "options", "password_env"}
+
+
+class FleetJob:
+    """
+    Extraction of a single database (and schema) of a server
+    """
+
+    def __init__(self, server: str, database: str, schema: str, options: Mapping[str, Any]):
+        """
+        :param server: name of server
+        :param database: database name
+        :param schema: schema name (None if not given)
+        :param options: options of extractor named as command line arguments
+        """
+        self.server = server
+        self.database = database
+        self.schema = schema
+        self.options = options
+        self.status = "waiting"
+        self.error = None
+        self.tables = None
+        self.seconds = None
+        self.report = None
+
+    @property
+    def name(self) -> str:
+        return "/".join(part for part in (self.server, self.database, self.schema) if part is not None)
+
+    def run(self, output_dir: str) -> None:
+        """
+        Extracting the database and writing its report, errors are recorded instead of raised
+        :param output_dir: directory of reports
+        """
+        self.status = "running"
+        start = time.time()
+        try:
+            extractor = create_extractor(self.options)
+            data = extractor.extract_to_dict()
+            self.tables = len(data["tables"])
+            self.report = re.sub(r"[^\w.-]+", "_", self.name) + ".html"
+            DbVisualizer(data, os.path.join(output_dir, self.report), extractor.memory).generate_report()
+            self.status = "done"
+        except Exception as e:
+            logging.exception(f'Extraction of {self.name} failed')
+            self.status = "failed"
+            self.error = str(e)
+        self.seconds = time.time() - start
+
+
+def create_jobs(config: Mapping) -> Sequence[FleetJob]:
+    """
+    :param config: configuration (see module docs)
+    :return: jobs of all databases and schemas of configured servers
+    """
+    jobs = []
+    for server in config["servers"]:
+        options = dict(config.get("options", {}))
+        options.update({key: value for key, value in server.items() if key not in SERVER_KEYS})
+        options.update(server.get("options", {}))
+        if "password_env" in server:
+            options["password"] = os.environ.get(server["password_env"])
+        name = server.get("name", server["server"])
+        for database in server.get("databases", [options.get("database_name")]):
+            for schema in server.get("schemas", [None]):
+                job_options = dict(options, database_name=database)
+                if schema is not None:
+                    job_options["schema"] = schema
+                jobs.append(FleetJob(name, database, schema, job_options))
+    return jobs
+
+
+class Fleet:
+    """
+    Running jobs concurrently - at most concurrency jobs at once and at most per_server jobs of a server,
+    so a slow server occupies only its own share of workers and jobs of other servers go on
+    """
+
+    def __init__(self, jobs: Sequence[FleetJob], concurrency: int, per_server: int):
+        """
+        :param jobs: jobs to be run
+        :param concurrency: max number of concurrent jobs
+        :param per_server: max number of concurrent jobs of a server
+        """
+        self.jobs = jobs
+        self.concurrency = concurrency
+        self.per_server = per_server
+        self._waiting = OrderedDict()
+        for job in jobs:
+            self._waiting.setdefault(job.server, deque()).append(job)
+        self._running = {server: 0 for server in self._waiting}
+        self._lock = threading.Lock()
+        self._finished = threading.Semaphore(0)
+
+    def _next_jobs(self) -> Sequence[FleetJob]:
+        # jobs of servers below their cap, round robin over servers
+        ret = []
+        for server, waiting in self._waiting.items():
+            while len(waiting) and self._running[server] < self.per_server:
+                ret.append(waiting.popleft())
+                self._running[server] += 1
+        return ret
+
+    def _run_job(self, executor: ThreadPoolExecutor, job: FleetJob, output_dir: str) -> None:
+        try:
+            job.run(output_dir)
+        finally:
+            with self._lock:
+                self._running[job.server] -= 1
+                jobs = self._next_jobs()
+            for next_job in jobs:
+                executor.submit(self._run_job, executor, next_job, output_dir)
+            self._finished.release()
+
+    def run(self, output_dir: str) -> None:
+        """
+        Running all jobs, reports and index.html are written to output directory
+        :param output_dir: directory of reports
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        with ThreadPoolExecutor(self.concurrency) as executor:
+            with self._lock:
+                jobs = self._next_jobs()
+            for job in jobs:
+                executor.submit(self._run_job, executor, job, output_dir)
+            for _ in self.jobs:
+                self._finished.acquire()
+        write_index(self.jobs, os.path.join(output_dir, "index.html"))
+
+
+def write_index(jobs: Sequence[FleetJob], out_path: str) -> None:
+    """
+    Writing index of reports of all servers
+    :param jobs: finished jobs
+    :param out_path: path of index file
+    """
+    rows = []
+    for job in jobs:
+        cells = [job.server, job.database, job.schema or "", job.status, "" if job.tables is None else job.tables,
+                 "" if job.seconds is None else f"{job.seconds:.1f}"]
+        cells = [html.escape(str(cell)) for cell in cells]
+        if job.report is not None:
+            cells[1] = f'<a href="{html.escape(job.report)}">{cells[1]}</a>'
+        if job.error is not None:
+            cells[3] += f"<br><small>{html.escape(job.error)}</small>"
+        rows.append("<tr>" + "".join(f"<td>{cell}</td>" for cell in cells) + "</tr>")
+
+    failed = sum(1 for job in jobs if job.status == "failed")
+    with open(out_path, 'w', encoding='utf-8') as fh:
+        fh.write(f"""<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Database explorer - fleet</title>
+<style>body {{ font-family: sans-serif; }} td, th {{ padding: 4px 12px; text-align: left; }}</style></head>
+<body>
+<h3>Databases: {len(jobs)}, failed: {failed}</h3>
+<table>
+<tr><th>Server</th><th>Database</th><th>Schema</th><th>Status</th><th>Tables</th><th>Seconds</th></tr>
+{chr(10).join(rows)}
+</table>
+</body>
+</html>
+""")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Database explorer fleet mode')
+    parser.add_argument('-c', '--config', help='Configuration file (JSON)', type=str, required=True)
+    parser.add_argument('-o', '--output_dir', help='Directory of reports', type=str, required=True)
+    parser.add_argument('-j', '--concurrency', help='Max number of concurrent extractions (overrides config)',
+                        type=int)
+    parser.add_argument('-ps', '--per_server', help='Max number of concurrent extractions of a server '
+                                                    '(overrides config)', type=int)
+    args = parser.parse_args()
+
+    with open(args.config, 'r', encoding='utf-8') as fh:
+        config = json.load(fh)
+    concurrency = args.concurrency or config.get("concurrency", 4)
+    per_server = args.per_server or config.get("per_server", 1)
+    fleet = Fleet(create_jobs(config), concurrency, per_server)
+    fleet.run(args.output_dir)
+
+
+if __name__ == "__main__":
+    main()
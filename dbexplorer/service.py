@@ -0,0 +1,318 @@
+"""
+Long-running profiling service. Keeps warm connections to configured databases, caches profiles of tables
+and serves them as JSON or rendered reports over HTTP.
+
+Configuration file (JSON) lists databases, options are named as command line arguments of dbexplorer:
+
+    {
+        "databases": {
+            "dvdrental": {"database_type": "postgres", "server": "192.2.3.4", "port": 5432,
+                          "database_name": "dvdrental", "user": "dbadmin", "password": "password",
+                          "extended": true, "pool_size": 2}
+        }
+    }
+
+Endpoints:
+
+    /                              names of configured databases
+    /<database>                    names of tables
+    /<database>/report             report of all tables
+    /<database>/<table>            profile of table as JSON
+    /<database>/<table>/report     report of table
+"""
+
+import argparse
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from socketserver import ThreadingMixIn
+from typing import Any, Callable, Mapping, Sequence, Tuple
+from urllib.parse import unquote
+
+import simplejson as json
+
+from dbexplorer.config import create_extractor
+from dbexplorer.extracting.base_extractors import DbExtractor
+from dbexplorer.visualizing import DbVisualizer
+
+
+class ExtractorPool:
+    """
+    Pool of extractors of a single database, each of them holds its own warm connection
+    """
+
+    def __init__(self, factory: Callable[[], DbExtractor], size: int):
+        """
+        :param factory: function creating connected extractor
+        :param size: max number of extractors (connections)
+        """
+        self._factory = factory
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self.size = size
+
+    @contextmanager
+    def extractor(self) -> DbExtractor:
+        """
+        Borrowing extractor, waits if all of them are in use. Transaction of its connection is ended before
+        it is returned to the pool, so idle connections do not hold snapshots and locks.
+        Extractor that raised an exception is dropped (its connection may be broken, it is closed) and replaced later.
+        """
+        extractor = self._acquire()
+        try:
+            yield extractor
+            extractor.end_transaction()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            try:
+                extractor.db_connection.close()
+            except Exception as e:
+                logging.warning('Failed to close connection of dropped extractor: ' + str(e))
+            raise
+        self._idle.put(extractor)
+
+    def _acquire(self) -> DbExtractor:
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            with self._lock:
+                create = self._created < self.size
+                if create:
+                    self._created += 1
+            if create:
+                try:
+                    return self._factory()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            # dropped extractors free place for new ones, so waiting is not infinite
+            try:
+                return self._idle.get(timeout=1)
+            except queue.Empty:
+                continue
+
+
+class ProfileCache:
+    """
+    LRU cache of table profiles with time of their extraction
+    """
+
+    def __init__(self, max_size: int):
+        """
+        :param max_size: max number of cached tables
+        """
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str]) -> Tuple[Mapping, float]:
+        """
+        :param key: database and table name
+        :return: profile and time of its extraction or None if not cached
+        """
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key: Tuple[str, str], profile: Mapping) -> None:
+        with self._lock:
+            self._entries[key] = (profile, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stale_keys(self, ttl: float) -> Sequence[Tuple[str, str]]:
+        """
+        :param ttl: time (in seconds) after which profile is stale
+        :return: keys of stale profiles, least recently used first
+        """
+        now = time.time()
+        with self._lock:
+            return [key for key, (_, extracted) in self._entries.items() if now - extracted > ttl]
+
+
+class ProfilingService:
+    """
+    Profiling tables on demand with pooled connections, profiles are cached and refreshed in background
+    """
+
+    def __init__(self, pools: Mapping[str, ExtractorPool], cache_size: int, ttl: float):
+        """
+        :param pools: extractor pools by database name
+        :param cache_size: max number of cached table profiles
+        :param ttl: time (in seconds) after which cached profiles are refreshed
+        """
+        self.pools = pools
+        self.cache = ProfileCache(cache_size)
+        self.ttl = ttl
+        self._tables_names = {}
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    def _lock(self, key: Tuple[str, str]) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def get_tables_names(self, database: str) -> Sequence[str]:
+        """
+        :param database: name of configured database
+        :return: names of tables (refreshed after ttl)
+        """
+        names, extracted = self._tables_names.get(database, (None, 0))
+        if names is None or time.time() - extracted > self.ttl:
+            with self.pools[database].extractor() as extractor:
+                names = extractor._get_tables_names()
+            self._tables_names[database] = (names, time.time())
+        return names
+
+    def get_table(self, database: str, table: str, refresh: bool = False) -> Mapping:
+        """
+        :param database: name of configured database
+        :param table: name of table
+        :param refresh: if cached profile should be ignored
+        :return: profile of table (as in report data), None if table is skipped because of its cost
+        """
+        key = (database, table)
+        cached = self.cache.get(key)
+        if cached is not None and not refresh:
+            return cached[0]
+        # the same table is profiled only once at a time
+        with self._lock(key):
+            # profile could be extracted by other thread while waiting for the lock
+            current = self.cache.get(key)
+            if current is not None and current is not cached:
+                return current[0]
+            with self.pools[database].extractor() as extractor:
+                table_info = extractor._get_table(table)
+            profile = None if table_info is None else table_info.to_dict()
+            self.cache.put(key, profile)
+            return profile
+
+    def get_report_data(self, database: str, tables: Sequence[str]) -> Mapping:
+        """
+        :param database: name of configured database
+        :param tables: names of tables
+        :return: data for visualizer
+        """
+        return {
+            "scheme": "SchemeName",
+            "database": database,
+            "tables": [profile for profile in [self.get_table(database, table) for table in tables]
+                       if profile is not None]
+        }
+
+    def refresh_stale(self) -> None:
+        for database, table in self.cache.stale_keys(self.ttl):
+            try:
+                self.get_table(database, table, refresh=True)
+            except Exception as e:
+                logging.warning(f'Failed to refresh table {table} of {database}: ' + str(e))
+
+    def start_refreshing(self, interval: float) -> None:
+        """
+        Starting background thread refreshing stale profiles
+        :param interval: time (in seconds) between checks
+        """
+        def refresh():
+            while True:
+                time.sleep(interval)
+                self.refresh_stale()
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    service = None
+
+    def do_GET(self) -> None:
+        parts = [unquote(p) for p in self.path.split('?')[0].split('/') if len(p)]
+        try:
+            if not len(parts):
+                return self._send_json(sorted(self.service.pools.keys()))
+            database = parts[0]
+            if database not in self.service.pools:
+                return self.send_error(404, f'Unknown database {database}')
+            tables = self.service.get_tables_names(database)
+            if len(parts) == 1:
+                return self._send_json(tables)
+            if len(parts) == 2 and parts[1] == 'report' and 'report' not in tables:
+                return self._send_report(self.service.get_report_data(database, tables))
+            # table names are checked against catalog as they are used in statements
+            table = parts[1]
+            if table not in tables or len(parts) > 3 or (len(parts) == 3 and parts[2] != 'report'):
+                return self.send_error(404, f'Unknown table {table}')
+            if len(parts) == 3:
+                return self._send_report(self.service.get_report_data(database, [table]))
+            return self._send_json(self.service.get_table(database, table))
+        except Exception as e:
+            logging.exception(e)
+            self.send_error(500, str(e))
+
+    def _send(self, content: str, content_type: str) -> None:
+        body = content.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, data: Any) -> None:
+        self._send(json.dumps(data, ensure_ascii=False, use_decimal=True, default=str),
+                   'application/json; charset=utf-8')
+
+    def _send_report(self, data: Mapping) -> None:
+        self._send(DbVisualizer(data, None).render(), 'text/html; charset=utf-8')
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+def create_service(config: Mapping, cache_size: int, ttl: float) -> ProfilingService:
+    """
+    :param config: configuration (see module docs)
+    :param cache_size: max number of cached table profiles
+    :param ttl: time (in seconds) after which cached profiles are refreshed
+    :return: profiling service
+    """
+    pools = {}
+    for name, options in config['databases'].items():
+        pools[name] = ExtractorPool(lambda options=options: create_extractor(options), options.get('pool_size', 1))
+    return ProfilingService(pools, cache_size, ttl)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Database explorer service')
+    parser.add_argument('-c', '--config', help='Configuration file (JSON)', type=str, required=True)
+    parser.add_argument('-H', '--host', help='Address to listen on', type=str, default='127.0.0.1')
+    parser.add_argument('-p', '--port', help='Port to listen on', type=int, default=8080)
+    parser.add_argument('-cs', '--cache_size', help='Max number of cached tables', type=int, default=1000)
+    parser.add_argument('-ttl', '--ttl', help='Seconds after which cached table is refreshed', type=float,
+                        default=3600)
+    parser.add_argument('-ri', '--refresh_interval', help='Seconds between checks for stale tables', type=float,
+                        default=60)
+    args = parser.parse_args()
+
+    with open(args.config, 'r', encoding='utf-8') as fh:
+        config = json.load(fh)
+    service = create_service(config, args.cache_size, args.ttl)
+    service.start_refreshing(args.refresh_interval)
+
+    ServiceRequestHandler.service = service
+    server = ThreadingHTTPServer((args.host, args.port), ServiceRequestHandler)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,45 @@
 /**
- * The class of all data needed to generate report. Data is generated as json in Python. Contains method for clearing empty tables.
+ * Column of report - a view of values of its group (consecutive columns of a table with the same keys),
+ * values are not copied to objects per statistic
+ * @property {string} type - type of column (numeric, character, datetime or undefined)
+ * @property {Array<string>} keys - keys of shown statistics
+ */
+class Column {
+	/**
+	 * Creates column
+	 * @param {object} view - type, shown keys and their positions in values of group
+	 * @param {Array<Array<object>>} values - values of group, one array per key of schema
+	 * @param {number} index - position of column in its group
+	 */
+	constructor(view, values, index) {
+		this.type = view.type;
+		this.keys = view.keys;
+		this.positions = view.positions;
+		this.values = values;
+		this.index = index;
+	}
+
+	/**
+	 * @param {number} i - position of shown key
+	 * @returns {object} value of the statistic
+	 */
+	value(i) {
+		return this.values[this.positions[i]][this.index];
+	}
+
+	/**
+	 * @param {string} key - key of statistic
+	 * @returns {object} value of the statistic, undefined if the column does not have it
+	 */
+	get(key) {
+		var i = this.keys.indexOf(key);
+		return i < 0 ? undefined : this.value(i);
+	}
+}
+
+/**
+ * The class of all data needed to generate report. Data is generated as columnar json in Python (schemas of columns
+ * and arrays of values per table). Contains method for clearing empty tables.
  */
 class Data {
 	constructor() {
@@ -7,21 +47,30 @@ class Data {
 	}
 	
 	/**
-	 * Delete unnecessary data from columns on empty tables. It leaves the name of the column and the SQL type. Changes 'distinct' column to empty string if is null
-	 * @param {Data} data - raport data in json.
-	 * @return {Data} Cleared data.
+	 * Decodes columns of tables from groups. Only the name of the column and the SQL type are shown for empty tables.
+	 * Changes 'distinct' values to empty string if they are null
+	 * @param {Data} data - raport data in columnar json.
+	 * @return {Data} Data with columns of tables.
 	 */
 	modifyTables(data) {
+		// views of schemas are shared by all their columns (full and for empty tables)
+		var views = data.schemas.map(schema => [false, true].map(empty => {
+			var positions = schema.keys.map((key, i) => i)
+				.filter(i => !empty || schema.keys[i] === 'Name' || schema.keys[i] === 'SQL Type');
+			return {type: schema.type, keys: positions.map(i => schema.keys[i]), positions: positions};
+		}));
 		data.tables.forEach(table => {
-			table.columns.forEach(column => {
-				if(table.records == 0) {
-					column.data = column.data.filter(data => data.key === 'Name' || data.key == 'SQL Type')
+			table.columns = [];
+			table.groups.forEach(group => {
+				var schema = data.schemas[group.schema];
+				var distinct = schema.keys.indexOf('Distinct');
+				if (distinct >= 0) {
+					group.values[distinct] = group.values[distinct].map(value => value === null ? '' : value);
+				}
+				var view = views[group.schema][table.records == 0 ? 1 : 0];
+				for (var i = 0; i < group.values[0].length; i++) {
+					table.columns.push(new Column(view, group.values, i));
 				}
-				column.data.forEach(data => {
-					if (data.key === 'Distinct' && data.value === null) {
-						data.value = '';
-					}
-				})
 			});
 		});
 		return data;
@@ -23,7 +23,7 @@ class SearchModule {
 	search() {
 		var type = this.controls.input.searchType.val();
 		var value = this.controls.input.searchValue.val();
-		if (type != 'column') {
+		if (type != 'column' && type != 'value') {
 			this.controls.input.matchingColumnsContainer.hide();
 		} else {
 			this.controls.input.matchingColumnsContainer.show();
@@ -80,31 +80,94 @@ class SearchModule {
 	}
 
 	/**
-	 * Filters tables by specified value
+	 * Filters tables by specified value - it is a part of reported statistics (e.g. the most common values)
+	 * or it may be contained in column according to its value filter (bloom filter of all values)
 	 * @param {string} value - search value
-	 * @return {Array<object>} - filtered by value tables as json data
+	 * @return {Array<object>} - filtered by value tables as json data, matching column names are in matchingColumns
 	 */
 	filterByValue(value) {
+		var hashes = this.valueHashes(value.replace(/ +$/, ''));
+		var numericHashes = isNaN(value) || value.trim() === '' ? null : this.valueHashes(this.normalizeNumber(Number(value)));
 		return this.data.tables.filter(table => {
-			return table.columns.some(column => {
-				return column.data.some(data => {
-					return data.value.toString().toLowerCase().indexOf(value) >= 0;
+			table.matchingColumns = new Set(table.columns.filter(column => {
+				var filter = (table.value_filters || {})[this.getColumnName(column)];
+				if (filter) {
+					var valueHashes = column.type === 'numeric' ? numericHashes : hashes;
+					if (valueHashes && this.mayContain(filter, valueHashes)) {
+						return true;
+					}
+				}
+				return column.keys.some((key, i) => {
+					var data = column.value(i);
+					return key !== 'Histogram' && data != null && data.toString().toLowerCase().indexOf(value) >= 0;
 				});
-			});
+			}).map(column => this.getColumnName(column)));
+			return table.matchingColumns.size > 0;
+		});
+	}
+
+	/**
+	 * Formats number as Python does for numeric values of filters (keys.normalize_key) - integers without fraction,
+	 * other numbers as Python repr (the shortest digits, exponent below 1e-4 as e-05)
+	 * @param {number} number
+	 * @return {string} - normalized number
+	 */
+	normalizeNumber(number) {
+		if (Number.isInteger(number)) {
+			return BigInt(number).toString();
+		}
+		var [mantissa, exponent] = number.toExponential().split('e');
+		exponent = Number(exponent);
+		if (exponent < -4 || exponent >= 16) {
+			return mantissa + 'e' + (exponent < 0 ? '-' : '+') + String(Math.abs(exponent)).padStart(2, '0');
+		}
+		return number.toString();
+	}
+
+	/**
+	 * Hashes of (lowercase) value as computed in Python (value_filters.value_hash) - FNV-1a hashes of UTF-8 bytes
+	 * with two offset bases
+	 * @param {string} value - normalized value
+	 * @return {Array<number>} - two 32-bit hashes
+	 */
+	valueHashes(value) {
+		var h1 = 2166136261;
+		var h2 = 3735928559;
+		new TextEncoder().encode(value).forEach(byte => {
+			h1 = Math.imul(h1 ^ byte, 16777619) >>> 0;
+			h2 = Math.imul(h2 ^ byte, 16777619) >>> 0;
 		});
+		return [h1, h2];
+	}
+
+	/**
+	 * Checks bloom filter of column (false positives are possible, false negatives are not)
+	 * @param {object} filter - bloom filter as json data (bits, hashes and base64 data)
+	 * @param {Array<number>} hashes - hashes of value
+	 * @return {boolean} - if the column may contain the value
+	 */
+	mayContain(filter, hashes) {
+		if (!filter.bytes) {
+			filter.bytes = Uint8Array.from(atob(filter.data), c => c.charCodeAt(0));
+		}
+		// double hashing as in sketches.BloomFilter
+		var step = (hashes[1] | 1) >>> 0;
+		for (var i = 0; i < filter.hashes; i++) {
+			var position = (hashes[0] + i * step) % filter.bits;
+			if (!(filter.bytes[position >> 3] & (1 << (position & 7)))) {
+				return false;
+			}
+		}
+		return true;
 	}
 
 	/**
 	 * Gets (creates if non existing) column name
-	 * @param {object} column - column as json data
+	 * @param {Column} column
 	 * @return {string} - column name
 	 */
 	getColumnName(column) {
-		if (!column.name) {
-			column.name = column.data.find(data => data.key == 'Name').value;
-		}
-		return column.name;
-		 
+		return column.get('Name');
 	}
 	
 }
\ No newline at end of file
@@ -10,9 +10,11 @@ class Table {
 	 */
 	constructor(table, controls) {
 		this.controls = controls;
+		this.matchingColumns = table.matchingColumns;
 		
 		var header = this.createHeader(table);
 		var body = this.createBody(table.columns);
+		body.append(this.createRelationships(table.relationships));
 
 		var collapseWrapper = this.createCollapseWrapper(table.name);
 		collapseWrapper.append(body);
@@ -61,7 +63,7 @@ class Table {
 	
 	/**
 	 * Creates table body - html tables (column sorted by type) with report data
-	 * @param {Array<object>} columns - table columns as json data
+	 * @param {Array<Column>} columns - table columns
 	 * @returns {object} table body - html table with report data
 	 */
 	createBody(columns) {
@@ -82,7 +84,7 @@ class Table {
 	
 	/**
 	 * Creates report for columns of specific type (numeric, character, date or other)
-	 * @param {Array<object>} columns - table columns of specific type as json data
+	 * @param {Array<Column>} columns - table columns of specific type
 	 * @param {string} header - header for table with typed columns report
 	 * @returns {object} table body - html div with report
 	 */
@@ -111,44 +113,101 @@ class Table {
 		return $('<div class="column-table"></div>').append(header, table);
 	}
 	
+	/**
+	 * Creates report of discovered foreign keys of table
+	 * @param {Array<object>} relationships - columns referencing other tables as json data
+	 * @returns {object} html div with report, nothing if there are no relationships
+	 */
+	createRelationships(relationships) {
+		if (!(relationships instanceof Array) || relationships.length == 0) {
+			return;
+		}
+		var thead = $('<thead class="thead-dark-other"></thead>').append(
+			'<tr><th>Column</th><th>References</th><th>Estimated containment</th><th>Verified</th></tr>');
+		var tbody = $('<tbody></tbody>');
+		relationships.forEach(relationship => {
+			var containment = (100 * parseFloat(relationship.containment)).toFixed(0);
+			var verified = relationship.verified == null ? 'not checked' : (relationship.verified ? 'yes' : 'no');
+			tbody.append(`<tr><td>${relationship.column}</td>
+				<td>${relationship.referenced_table}.${relationship.referenced_column}</td>
+				<td>${containment} %</td><td>${verified}</td></tr>`);
+		});
+		var table = $('<table class="table table-striped"></table>').append(thead, tbody);
+		var header = $('<h5 class="normal-text">Foreign keys</h5>');
+		return $('<div class="column-table"></div>').append(header, table);
+	}
+
 	/**
 	 * Creates data header for columns table report
-	 * @param {object} column - any column (as json data) of specific type
+	 * @param {Column} column - any column of specific type
 	 * @returns {object} thead with data headers
 	 */
 	createColumnTableHeader(column, header) {
 		var row = $('<tr></tr>');
-		column.data.forEach(function (data) {
-			row.append(`<th>${data.key}</th>`);
+		column.keys.forEach(function (key) {
+			row.append(`<th>${key}</th>`);
 		});
 		return $(`<thead class="thead-dark-${header.toLowerCase()}"></thead>`).append(row);
 	}
 	
 	/**
 	 * Checks whether the column should be shown
-	 * @param {object} column - column as json data
+	 * @param {Column} column
 	 * @returns {boolean} if the column should be shown
 	 */
 	showColumn(column) {
-		var showOnlyMatching = this.controls.input.searchType.val() === "column" && this.controls.input.matchingColumns.is(':checked');
+		var type = this.controls.input.searchType.val();
+		var showOnlyMatching = (type === "column" || type === "value") && this.controls.input.matchingColumns.is(':checked')
+			&& this.controls.input.searchValue.val().length > 0;
+		if (showOnlyMatching && type === "value") {
+			return this.matchingColumns instanceof Set && this.matchingColumns.has(this.getColumnName(column));
+		}
 		return !showOnlyMatching || this.getColumnName(column).toLowerCase().indexOf(controls.input.searchValue.val()) >= 0;
 	}
 	
 	/**
 	 * Creates report table row for column
-	 * @param {object} column - column as json data
+	 * @param {Column} column
 	 * @returns {object} html row with column data
 	 */
 	createColumnRow(column) {
 		var row = $('<tr></tr>');
-		column.data.forEach(data => {
-			var cssClass = this.getClass(data);
-			var value = data.value instanceof Array ? data.value.map(this.nullToString).join('</br>') : this.nullToString(data.value);
+		column.keys.forEach((key, i) => {
+			var data = column.value(i);
+			var cssClass = this.getClass(key, data);
+			var value;
+			if (key === 'Histogram') {
+				value = this.createSparkline(data);
+			} else {
+				value = data instanceof Array ? data.map(this.nullToString).join('</br>') : this.nullToString(data);
+			}
 			row.append(`<td class=${cssClass}>${value}</td>`);
 		});
 		return row;
 	}
 	
+	/**
+	 * Creates sparkline (svg bar chart) of histogram
+	 * @param {Array<number>} counts - counts of values in equal-width buckets between min and max
+	 * @returns {string} svg element, empty if there is no histogram
+	 */
+	createSparkline(counts) {
+		if (!(counts instanceof Array) || counts.length == 0) {
+			return '';
+		}
+		var barWidth = 3;
+		var height = 24;
+		var max = Math.max(...counts);
+		var bars = counts.map((count, i) => {
+			var barHeight = max > 0 ? Math.round(height * count / max) : 0;
+			if (count > 0 && barHeight == 0) {
+				barHeight = 1;
+			}
+			return `<rect x="${i * barWidth}" y="${height - barHeight}" width="${barWidth - 1}" height="${barHeight}"><title>${count}</title></rect>`;
+		});
+		return `<svg class="sparkline" width="${counts.length * barWidth}" height="${height}">${bars.join('')}</svg>`;
+	}
+	
 	/**
 	 * Collapsable wrapper for table report body
 	 * @param {string} tableName - table name
@@ -169,25 +228,23 @@ class Table {
 	
 	/**
 	 * Gets (creates if non existing) column name
-	 * @param {object} column - column as json data
+	 * @param {Column} column
 	 * @return {string} - column name
 	 */
 	getColumnName(column) {
-		if (!column.name) {
-			column.name = column.data.find(data => data.key == 'Name').value;
-		}
-		return column.name;
+		return column.get('Name');
 	}
 	
 	
 	/**
 	 * Gets styles for data
-	 * @param {object} data - key value data
+	 * @param {string} key - key of statistic
+	 * @param {object} data - value of statistic
 	 * @return {string} - css class name
 	 */
-	getClass(data) {
-		if (data.key === "Empty") {
-			var value = parseInt(data.value);
+	getClass(key, data) {
+		if (key === "Empty") {
+			var value = parseInt(data);
 			if (value < 10) {
 				return 'good';
 			} else if (value >= 50) {
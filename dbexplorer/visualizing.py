@@ -1,7 +1,9 @@
-from typing import Mapping
+from typing import Mapping, Iterator, Sequence, Any
 from os import path
 import simplejson as json
 
+from dbexplorer.extracting.memory import MemoryMonitor
+
 FLOAT_PRECISION = 3
 
 
@@ -20,6 +22,73 @@ def pretty_floats(obj):
     return obj
 
 
+def to_columnar(data: Mapping) -> Mapping:
+    """
+    Converting extracted db data (columns as lists of {"key": ..., "value": ...}) to columnar payload of report:
+    keys of every kind of column (type and keys) are stored once in schemas, consecutive columns of a table
+    with the same schema form a group with one array of values per key
+    {"schemas": [{"type": "numeric", "keys": ["Name", ...]}, ...],
+     "tables": [{"name": ..., "records": ..., "relationships": [...],
+                 "groups": [{"schema": 0, "values": [["id", "amount"], ["integer", "numeric"], ...]}, ...]}]}
+    :param data: extracted db data
+    :return: columnar payload
+    """
+    schemas = []
+    schema_indexes = {}
+    tables = [_to_columnar_table(table, schemas, schema_indexes) for table in data["tables"]]
+
+    ret = {key: value for key, value in data.items() if key != "tables"}
+    ret["schemas"] = schemas
+    ret["tables"] = tables
+    return ret
+
+
+def _to_columnar_table(table: Mapping, schemas: Sequence[Mapping], schema_indexes: Mapping) -> Mapping:
+    """
+    :param table: extracted table
+    :param schemas: schemas of columns found so far (new schemas of the table are appended)
+    :param schema_indexes: indexes of schemas by type and keys (new schemas of the table are added)
+    :return: columnar table (see to_columnar)
+    """
+    groups = []
+    for column in table["columns"]:
+        keys = tuple(item["key"] for item in column["data"])
+        schema = schema_indexes.get((column.get("type"), keys))
+        if schema is None:
+            schema = schema_indexes[(column.get("type"), keys)] = len(schemas)
+            schemas.append({"type": column.get("type"), "keys": list(keys)})
+        if not len(groups) or groups[-1]["schema"] != schema:
+            groups.append({"schema": schema, "values": [[] for _ in keys]})
+        for values, item in zip(groups[-1]["values"], column["data"]):
+            values.append(item["value"])
+    ret = {key: value for key, value in table.items() if key != "columns"}
+    ret["groups"] = groups
+    return ret
+
+
+def _dumps(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, use_decimal=True, separators=(',', ':'))
+
+
+def iter_columnar_json(data: Mapping) -> Iterator[str]:
+    """
+    Encoding columnar payload of report (see to_columnar, with pretty floats) in parts - tables are converted
+    and encoded one by one and schemas follow them, so neither the payload nor its JSON is kept in memory whole
+    :param data: extracted db data (tables may be any iterable, e.g. tables spilled to disk)
+    :return: iterator of parts of JSON
+    """
+    schemas = []
+    schema_indexes = {}
+    yield '{'
+    for key, value in data.items():
+        if key != "tables":
+            yield _dumps(key) + ':' + _dumps(pretty_floats(value)) + ','
+    yield '"tables":['
+    for i, table in enumerate(data["tables"]):
+        yield (',' if i else '') + _dumps(pretty_floats(_to_columnar_table(table, schemas, schema_indexes)))
+    yield '],"schemas":' + _dumps(schemas) + '}'
+
+
 class DbVisualizer:
     """
     Visualizing extracted database data as HTML file
@@ -27,17 +96,42 @@ class DbVisualizer:
 
     TEMPLATE_DIR = path.join(path.dirname(__file__))
 
-    def __init__(self, data: Mapping, out_path: str):
+    def __init__(self, data: Mapping, out_path: str, memory: MemoryMonitor = None):
         """
         :param data: extracted db data
-        :param out_path: output path of created file
+        :param out_path: output path of created file (may be None if report is only rendered)
+        :param memory: monitor memory of rendering is attributed to (not measured if not given)
         """
         self.data = data
         self.out_path = out_path
+        self.memory = memory
 
     def generate_report(self) -> None:
         """
-        creating report from data
+        creating report from data, the report is written in parts (payload table by table), so the whole HTML
+        is not kept in memory
+        """
+        if self.memory is None:
+            self._write_report()
+            return
+        with self.memory.phase("rendering"):
+            self._write_report()
+
+    def _write_report(self) -> None:
+        with open(self.out_path, 'w', encoding='utf-8') as fh:
+            for part in self._iter_report():
+                fh.write(part)
+
+    def render(self) -> str:
+        """
+        rendering report from data
+        :return: report as HTML
+        """
+        return "".join(self._iter_report())
+
+    def _iter_report(self) -> Iterator[str]:
+        """
+        :return: iterator of parts of report
         """
         template = DbVisualizer._get_template_file('template/template.html')
 
@@ -50,14 +144,13 @@ class DbVisualizer:
 
         styles = DbVisualizer._get_template_file('template/styles.css')
 
-        data_js = data_js.replace('{{data}}',
-                                  json.dumps(pretty_floats(self.data), ensure_ascii=False, use_decimal=True))
-
-        scripts = data_js + controls + table + results_module + search_module + app
+        before_scripts, after_scripts = template.replace('{{styles}}', styles).split('{{scripts}}', 1)
+        before_data, after_data = data_js.split('{{data}}', 1)
 
-        html = template.replace('{{scripts}}', scripts).replace('{{styles}}', styles)
-        with open(self.out_path, 'w', encoding='utf-8') as fh:
-            fh.write(html)
+        yield before_scripts + before_data
+        for part in iter_columnar_json(self.data):
+            yield part
+        yield after_data + controls + table + results_module + search_module + app + after_scripts
 
     @staticmethod
     def _get_template_file(file_path: str) -> str:
@@ -5,7 +5,10 @@ setup(name='dbexplorer',
       packages=find_packages(),
       entry_points={
           'console_scripts': [
-              'dbexplorer = dbexplorer.__main__:main'
+              'dbexplorer = dbexplorer.__main__:main',
+              'dbexplorer-service = dbexplorer.service:main',
+              'dbexplorer-fleet = dbexplorer.fleet:main',
+              'dbexplorer-distributed = dbexplorer.distributed:main'
           ]
       },
       install_requires=[
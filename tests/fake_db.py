@@ -0,0 +1,405 @@
+"""
+fake db (DB-API connection) answering statements of table extractors from in-memory model of tables, without
+db server - statements, table scans and round trips are counted per table, so regressions reintroducing
+per-column statements can be caught, e.g.:
+
+    tables = [FakeTable("orders", {"id": "integer", "note": "text"}, rows_count=1000, unique=["id"])]
+    counts = count_statements(PostgresLikeDbExtractor, tables, extended=True)
+    assert counts["orders"].statements <= 20
+
+Catalog statements (columns, nullability, unique columns, table names and row counts) are answered from the model.
+Statements reading table data are answered from rows of the model: aggregates (counts, nulls, distinct counts,
+min, max, mean, quantiles), groupings with the most common values and reads of rows. Conditions (WHERE) are not
+applied, statements which are not understood (histograms, quartiles by unions) return zeros or no rows.
+"""
+
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Mapping, Sequence, Tuple, Type
+
+from dbexplorer.extracting.dry_run import is_catalog_statement, select_arity
+
+if TYPE_CHECKING:
+    from dbexplorer.extracting.base_extractors import DbExtractor
+
+# generated values: every column (except unique ones) has this many distinct values and every n-th value is null
+# in nullable columns
+DISTINCT_VALUES = 10
+NULLS_EVERY = 10
+AGGREGATE = re.compile(r"^(approximate )?(count|min|max|avg|sum|percentile_cont|percentile_disc)\(|\bover \(\)$")
+
+
+class FakeTable:
+    """
+    Model of table - columns with sql types as given by db catalog (type codes for Teradata)
+    """
+
+    def __init__(self, name: str, columns: Mapping[str, str], rows_count: int = 0, not_null: Sequence[str] = (),
+                 unique: Sequence[str] = (), rows: Sequence[Sequence[Any]] = None):
+        """
+        :param name: name of table
+        :param columns: sql types by column name (in order of columns)
+        :param rows_count: number of rows in table (ignored if rows are given)
+        :param not_null: columns with NOT NULL constraint
+        :param unique: columns with single-column unique constraint (primary key, unique constraint or index)
+        :param rows: values of rows in order of columns (generated from sql types if not given)
+        """
+        self.name = name
+        self.columns = OrderedDict(columns)
+        self.not_null = set(not_null)
+        self.unique = list(unique)
+        if rows is None:
+            rows = [[self._generate_value(name, sql_type, i) for name, sql_type in self.columns.items()]
+                    for i in range(rows_count)]
+        self.rows = [dict(zip(self.columns, row)) for row in rows]
+        self.rows_count = len(self.rows)
+
+    def _generate_value(self, name: str, sql_type: str, number: int) -> Any:
+        """
+        :param name: column name
+        :param sql_type: sql type of column (type code for Teradata)
+        :param number: number of row
+        :return: value of column in the row
+        """
+        if name not in self.not_null and name not in self.unique and number % NULLS_EVERY == NULLS_EVERY - 1:
+            return None
+        if name not in self.unique:
+            number %= DISTINCT_VALUES
+        sql_type = sql_type.lower()
+        if sql_type == "boolean":
+            return number % 2 == 0
+        if re.search(r"date|time|^(da|ts|sz|tz|at)$", sql_type):
+            return datetime(2020, 1, 1) + timedelta(days=number)
+        if re.search(r"int|numeric|decimal|real|double|float|^(i|i1|i2|i8|d|f|n)$", sql_type):
+            return number
+        if re.search(r"char|text|enum|^(cv|cf|co)$", sql_type):
+            return f"{name} {number}"
+        return bytes([number % 256])
+
+
+class StatementCounts:
+    """
+    Counts of statements executed for a table
+    """
+
+    def __init__(self):
+        self.statements = 0
+        # statements reading table data (the others read db catalog)
+        self.scans = 0
+        # executions and fetches, each of them is a request to db server
+        self.round_trips = 0
+
+    def __repr__(self) -> str:
+        return f"StatementCounts(statements={self.statements}, scans={self.scans}, round_trips={self.round_trips})"
+
+
+class FakeCursor:
+    """
+    Cursor answering statements from model of tables of its connection
+    """
+
+    def __init__(self, connection: 'FakeConnection'):
+        self.connection = connection
+        self._rows = []
+        self._position = 0
+        self._table = None
+        self.description = None
+
+    def execute(self, sql: str, *args) -> 'FakeCursor':
+        self._table = self.connection.find_table(sql)
+        self.connection.record(self._table, sql)
+        self._rows = self.connection.answer(self._table, sql)
+        self._position = 0
+        self.description = [(None,) * 7] * select_arity(sql)
+        return self
+
+    def _fetch(self, size: int) -> Sequence[Sequence[Any]]:
+        self.connection.round_trip(self._table)
+        rows = self._rows[self._position:self._position + size]
+        self._position += len(rows)
+        return rows
+
+    def fetchone(self) -> Sequence[Any]:
+        rows = self._fetch(1)
+        return rows[0] if len(rows) else None
+
+    def fetchmany(self, size: int = 1) -> Sequence[Sequence[Any]]:
+        return self._fetch(size)
+
+    def fetchall(self) -> Sequence[Sequence[Any]]:
+        return self._fetch(len(self._rows))
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def close(self) -> None:
+        pass
+
+
+class FakeConnection:
+    """
+    DB-API connection to model of tables, counting statements per table
+    """
+
+    def __init__(self, tables: Sequence[FakeTable], latency: float = 0.0, version: str = "8.0.36"):
+        """
+        :param tables: model of tables
+        :param latency: simulated time (in seconds) of every round trip
+        :param version: version of server (SELECT VERSION())
+        """
+        self.tables = OrderedDict((table.name, table) for table in tables)
+        self.latency = latency
+        self.version = version
+        self.counts = OrderedDict()
+        self.statements = []
+
+    def cursor(self, name: str = None) -> FakeCursor:
+        return FakeCursor(self)
+
+    def commit(self) -> None:
+        pass
+
+    def rollback(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def find_table(self, sql: str) -> FakeTable:
+        """
+        :param sql: statement
+        :return: table the statement is about (read relation or table name literal of catalog statement)
+        """
+        names = "|".join(re.escape(name) for name in sorted(self.tables, key=len, reverse=True))
+        if not names:
+            return None
+        match = re.search(rf"""[.\s"'`]({names})[\s"'`;)]|[.\s"'`]({names})$""", sql)
+        return None if match is None else self.tables[match.group(1) or match.group(2)]
+
+    def round_trip(self, table: FakeTable) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+        self._counts(table).round_trips += 1
+
+    def _counts(self, table: FakeTable) -> StatementCounts:
+        return self.counts.setdefault(None if table is None else table.name, StatementCounts())
+
+    def record(self, table: FakeTable, sql: str) -> None:
+        counts = self._counts(table)
+        counts.statements += 1
+        if not is_catalog_statement(sql):
+            counts.scans += 1
+        self.statements.append((None if table is None else table.name, " ".join(sql.split())))
+        self.round_trip(table)
+
+    def answer(self, table: FakeTable, sql: str) -> Sequence[Sequence[Any]]:
+        """
+        :param table: table the statement is about
+        :param sql: statement
+        :return: rows of result
+        """
+        query = " ".join(sql.split()).lower()
+        if re.match(r"select version\(\)", query):
+            return [(self.version,)]
+        if not is_catalog_statement(sql):
+            try:
+                return TableData(table).answer(query)
+            except ValueError:
+                if re.search(r"\blimit\b|\btop\b|\bgroup by\b|\bunion\b", query):
+                    return []
+                return [tuple([0] * select_arity(sql))]
+
+        teradata = "dbc." in query
+        if select_arity(sql) == 2 and re.search(r"reltuples|table_rows|tbl_rows|rowcount", query):
+            # row counts of all tables
+            return [(t.name, t.rows_count) for t in self.tables.values()]
+        if table is None or re.search(r"information_schema\.tables|dbc\.tables", query):
+            return [(name,) for name in self.tables]
+        if re.search(r"indisunique|non_unique|uniqueflag", query):
+            return [(name,) for name in table.unique]
+        if re.search(r"information_schema\.columns|dbc\.columns", query):
+            yes, no = ("Y", "N") if teradata else ("YES", "NO")
+            columns = [(name, sql_type, no if name in table.not_null else yes)
+                       for name, sql_type in table.columns.items()
+                       if re.search(rf"'{re.escape(name.lower())}'", query)
+                       or not re.search(r"column_?name\s*=", query)]
+            if re.search(r"data_type|columntype", query):
+                return [(name, sql_type) for name, sql_type, _ in columns]
+            if select_arity(sql) == 1:
+                return [(nullable,) for _, _, nullable in columns]
+            return [(name, nullable) for name, _, nullable in columns]
+        return []
+
+    def report(self) -> str:
+        """
+        :return: text report of counts per table
+        """
+        return "\n".join(f"{table}: {counts.statements} statements, {counts.scans} scans, "
+                         f"{counts.round_trips} round trips" for table, counts in self.counts.items())
+
+
+class TableData:
+    """
+    Answering statements reading table data from rows of model of table
+    """
+
+    def __init__(self, table: FakeTable):
+        if table is None:
+            raise ValueError("Statement does not read a known table")
+        self.table = table
+        self.names = {name.lower(): name for name in table.columns}
+
+    def answer(self, query: str) -> Sequence[Sequence[Any]]:
+        """
+        :param query: normalized statement (lowercase, single spaces)
+        :return: rows of result
+        :raise ValueError: if the statement is not understood
+        """
+        query = re.sub(r'["`]', "", query).rstrip("; ")
+        if re.search(r"\bunion\b|\bcase\b", query):
+            raise ValueError("Statement is not supported")
+        recursive = re.match(r"with recursive .*?select (\S+) as v from", query)
+        if recursive:
+            # loose index scan, nulls are not counted
+            return [(len(set(self._values(recursive.group(1))) - {None}),)]
+        distinct = re.match(r"select count\(\*\) from \(select (?:distinct )?(.+?) from .*\) as temp$", query)
+        if distinct:
+            # null is counted as a distinct value as well
+            return [(len(set(self._values(distinct.group(1)))),)]
+
+        select = re.match(r"select (distinct )?(top (\d+) )?(.*)$", query)
+        if select is None:
+            raise ValueError("Statement is not supported")
+        items, rest = self._split_select(select.group(4))
+        limit = re.search(r"\blimit (\d+)$|\bqualify row_number\(\) over \(.*\) <= (\d+)", rest)
+        limit = int(select.group(3) or (limit and (limit.group(1) or limit.group(2))) or self.table.rows_count)
+        group_by = re.search(r"\bgroup by (.+?)(?: qualify| order by| limit|$)", rest)
+
+        if group_by:
+            groups = OrderedDict()
+            for row in self.table.rows:
+                groups.setdefault(self._value(group_by.group(1), row), []).append(row)
+            result = [tuple(self._item(item, rows) for item in items) for rows in groups.values()]
+            if re.search(r"\border by count\(\*\) desc", rest):
+                counts = [len(rows) for rows in groups.values()]
+                result = [row for _, row in sorted(zip(counts, result), key=lambda x: -x[0])]
+            return result[:limit]
+        if any(AGGREGATE.search(item) for item in items):
+            return [tuple(self._item(item, self.table.rows) for item in items)]
+        result = [tuple(self._value(item, row) for item in items) for row in self.table.rows]
+        if select.group(1):
+            result = list(OrderedDict.fromkeys(result))
+        return result[:limit]
+
+    @staticmethod
+    def _split_select(text: str) -> Tuple[Sequence[str], str]:
+        """
+        :param text: statement after select keyword
+        :return: items of select list and the rest of statement after from keyword
+        """
+        items, depth, start = [], 0, 0
+        for match in re.finditer(r"\(|\)|,| from ", text):
+            token = match.group(0)
+            if token == "(":
+                depth += 1
+            elif token == ")":
+                depth -= 1
+            elif depth == 0 and token == ",":
+                items.append(text[start:match.start()].strip())
+                start = match.end()
+            elif depth == 0:
+                items.append(text[start:match.start()].strip())
+                return items, text[match.end():]
+        raise ValueError("Statement without from")
+
+    def _values(self, expression: str) -> Sequence[Any]:
+        return [self._value(expression, row) for row in self.table.rows]
+
+    def _value(self, expression: str, row: Mapping[str, Any]) -> Any:
+        """
+        :param expression: expression of columns of one row
+        :param row: values by column name
+        :return: value of the expression
+        """
+        expression = expression.strip()
+        if expression in self.names:
+            return row[self.names[expression]]
+        if re.fullmatch(r"-?\d+(\.\d+)?", expression):
+            return float(expression) if "." in expression else int(expression)
+        function = re.fullmatch(r"(\w+)\((.+)\)", expression)
+        cast = re.fullmatch(r"(.+)::\w+|cast\((.+) as \w+\)", expression)
+        if cast:
+            value = self._value(cast.group(1) or cast.group(2), row)
+            return None if value is None else float(value)
+        if function and function.group(1) in ("left", "substr"):
+            arguments = function.group(2).rsplit(",", 1)
+            value = self._value(re.sub(r", 1$", "", arguments[0]), row)
+            return None if value is None else str(value)[:int(arguments[1])]
+        if function and function.group(1) in ("length", "char_length", "character_length", "characters"):
+            value = self._value(function.group(2), row)
+            return None if value is None else len(str(value))
+        if function and function.group(1) in ("md5", "hashrow"):
+            return self._value(function.group(2), row)
+        raise ValueError(f"Expression {expression} is not supported")
+
+    def _item(self, item: str, rows: Sequence[Mapping[str, Any]]) -> Any:
+        """
+        :param item: item of select list of aggregating statement
+        :param rows: rows of the group (all rows if the statement does not group)
+        :return: value of the item
+        """
+        window = re.fullmatch(r"\w+\((.+)\) over \(\)", item)
+        if window:
+            # aggregate of aggregates over all groups (max of max or min of min)
+            return self._item(window.group(1), self.table.rows)
+        nulls = re.fullmatch(r"count\(\*\) - count\((.+)\)", item)
+        if nulls:
+            return sum(1 for row in rows if self._value(nulls.group(1), row) is None)
+        if item == "count(*)":
+            return len(rows)
+        aggregate = re.fullmatch(r"(?:approximate )?(count|min|max|avg|sum)\((distinct )?(.+)\)", item)
+        percentile = re.fullmatch(r"(?:approximate )?percentile_(cont|disc)\(([\d.]+)\) within group "
+                                  r"\(order by (.+)\)", item)
+        if aggregate is None and percentile is None:
+            return self._value(item, rows[0]) if len(rows) else None
+
+        values = [v for v in (self._value((aggregate or percentile).group(3), row) for row in rows) if v is not None]
+        if percentile:
+            values = sorted(values)
+            if not len(values):
+                return None
+            position = float(percentile.group(2)) * (len(values) - 1)
+            lower = values[int(position)]
+            if percentile.group(1) == "disc" or position == int(position):
+                return lower
+            return lower + (values[int(position) + 1] - lower) * (position - int(position))
+        function = aggregate.group(1)
+        if function == "count":
+            return len(set(values)) if aggregate.group(2) else len(values)
+        if not len(values):
+            return None
+        if function == "avg":
+            return sum(values) / len(values)
+        return {"min": min, "max": max, "sum": sum}[function](values)
+
+
+def count_statements(extractor_class: Type['DbExtractor'], tables: Sequence[FakeTable], extended: bool,
+                     latency: float = 0.0, **kwargs) -> Mapping[str, StatementCounts]:
+    """
+    Extracting model of tables with given extractor
+    :param extractor_class: extractor of db type (dialect of statements)
+    :param tables: model of tables
+    :param extended: if the info should be in the extended form
+    :param latency: simulated time (in seconds) of every round trip
+    :param kwargs: additional arguments of extractor
+    :return: counts of statements by table name (None for statements not about a single table)
+    """
+    connection = FakeConnection(tables, latency)
+    extractor = extractor_class(server_address=None, port=None, db_name="fake", user=None, password=None,
+                                extended=extended, top_number=5, schema="public", odbc_driver=None, max_text_len=100,
+                                connection=connection, **kwargs)
+    for _ in extractor.iter_tables():
+        pass
+    return connection.counts
@@ -0,0 +1,74 @@
+"""
+statements per table must not grow with the number of columns, except the statements per column listed
+in PER_COLUMN - tables of 2 to 32 columns are extracted from fake db by every dialect, in basic and extended mode
+"""
+
+import pytest
+
+from fake_db import FakeTable, count_statements
+from dbexplorer.extracting.mysql import MysqlDbExtractor
+from dbexplorer.extracting.postgres_like import PostgresLikeDbExtractor
+from dbexplorer.extracting.redshift import RedshiftDbExtractor
+from dbexplorer.extracting.teradata import TeradataDbExtractor
+
+COLUMNS_COUNTS = [2, 8, 32]
+# max statements per table (catalog reads included) by extended mode, statements per column not counted
+MAX_STATEMENTS = {False: 8, True: 16}
+# statements per column still issued, by extended mode and kind of column: top values of text columns,
+# distinct counts (and quartiles of numeric columns) in extended mode
+PER_COLUMN = {
+    False: {"text": 1},
+    True: {"numeric": 2, "datetime": 1, "text": 2, "other": 1},
+}
+# Redshift reads distinct counts and quartiles by aggregates of all columns
+REDSHIFT_PER_COLUMN = {
+    False: {"text": 1},
+    True: {"text": 1},
+}
+
+# sql types of columns by kind of column and dialect (type codes for Teradata)
+SQL_TYPES = {
+    "numeric": {"postgres": ["integer", "numeric"], "mysql": ["int", "decimal"], "teradata": ["I", "D"]},
+    "datetime": {"postgres": ["timestamp without time zone", "date"], "mysql": ["datetime", "date"],
+                 "teradata": ["TS", "DA"]},
+    "text": {"postgres": ["text", "character varying"], "mysql": ["text", "varchar"], "teradata": ["CV", "CF"]},
+    "other": {"postgres": ["bytea"], "mysql": ["blob"], "teradata": ["BO"]},
+}
+
+EXTRACTORS = {
+    "postgres": (PostgresLikeDbExtractor, "postgres"),
+    "redshift": (RedshiftDbExtractor, "postgres"),
+    "mysql": (MysqlDbExtractor, "mysql"),
+    "teradata": (TeradataDbExtractor, "teradata"),
+}
+
+CASES = [
+    pytest.param(db_type, extended, kind, id=f"{db_type}-{'extended' if extended else 'basic'}-{kind}")
+    for db_type in EXTRACTORS
+    for extended in [False, True]
+    for kind in SQL_TYPES
+]
+
+
+def fake_table(db_type: str, kind: str, columns_count: int) -> FakeTable:
+    sql_types = SQL_TYPES[kind][EXTRACTORS[db_type][1]]
+    columns = {f"column_{i}": sql_types[i % len(sql_types)] for i in range(columns_count)}
+    return FakeTable("orders", columns, rows_count=100)
+
+
+@pytest.mark.parametrize("db_type, extended, kind", CASES)
+def test_statements_per_table_are_bounded(db_type, extended, kind):
+    per_column = (REDSHIFT_PER_COLUMN if db_type == "redshift" else PER_COLUMN)[extended].get(kind, 0)
+    statements = {}
+    for columns_count in COLUMNS_COUNTS:
+        counts = count_statements(EXTRACTORS[db_type][0], [fake_table(db_type, kind, columns_count)], extended)
+        statements[columns_count] = counts["orders"].statements
+        assert statements[columns_count] <= MAX_STATEMENTS[extended] + per_column * columns_count, \
+            f"{columns_count} columns"
+
+    # growth with the number of columns is exactly the statements per column
+    fewest = COLUMNS_COUNTS[0]
+    for columns_count in COLUMNS_COUNTS[1:]:
+        assert statements[columns_count] - statements[fewest] == per_column * (columns_count - fewest), \
+            f"{columns_count} columns"
+